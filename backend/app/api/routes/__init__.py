@@ -1,5 +1,6 @@
 """API routes package."""
 
+from . import admin
 from . import calibration
 from . import formulation
 from . import payment
@@ -0,0 +1,130 @@
+"""
+Admin API endpoints.
+Dataset snapshot status, on-demand reloads, cache metrics and bulk catalog imports.
+"""
+
+from fastapi import APIRouter, File, Form, Header, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from pathlib import Path
+from typing import Optional
+import hmac
+import tempfile
+
+from app.config import settings
+from app.core.dataset_reloader import dataset_reloader, DATASETS
+from app.core.physio_rag import physio_rag
+from app.chemistry.catalog_import import import_manager, detect_format
+
+router = APIRouter()
+
+
+class ReloadRequest(BaseModel):
+    """Request to rebuild dataset snapshots."""
+    datasets: Optional[list[str]] = Field(None, description="ingredients, ifra, physio_rules (default: all)")
+    force: bool = Field(default=False, description="Rebuild even if file content is unchanged")
+
+
+class ReloadResponse(BaseModel):
+    """Which datasets were swapped, plus the resulting status."""
+    reloaded: dict[str, bool]
+    datasets: dict[str, dict]
+
+
+def _check_admin(token: Optional[str]):
+    """Require the admin token; without a configured token the admin API is disabled."""
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin API is disabled (no admin token configured)")
+    if token is None or not hmac.compare_digest(token.encode(), settings.admin_token.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.get("/datasets")
+async def dataset_status(x_admin_token: Optional[str] = Header(None)):
+    """Current version and reload status of each dataset snapshot."""
+    _check_admin(x_admin_token)
+    return dataset_reloader.status()
+
+
+@router.post("/reload", response_model=ReloadResponse)
+async def reload_datasets(request: ReloadRequest, x_admin_token: Optional[str] = Header(None)):
+    """
+    Rebuild dataset snapshots from disk and swap them in.
+
+    The rebuild runs in a worker thread; requests keep being served from the
+    previous snapshots until the new ones are installed.
+    """
+    _check_admin(x_admin_token)
+    unknown = [name for name in request.datasets or [] if name not in DATASETS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown datasets: {', '.join(unknown)}")
+
+    reloaded = await run_in_threadpool(dataset_reloader.reload, request.datasets, request.force)
+    return ReloadResponse(reloaded=reloaded, datasets=dataset_reloader.status())
+
+
+@router.get("/caches")
+async def cache_stats(x_admin_token: Optional[str] = Header(None)):
+    """Hit rates and sizes of the in-process query caches."""
+    _check_admin(x_admin_token)
+    return {"physio_query": physio_rag.query_cache_stats()}
+
+
+@router.get("/embedding")
+async def embedding_stats(x_admin_token: Optional[str] = Header(None)):
+    """Micro-batching histograms of the query embedder (null when batching is off)."""
+    _check_admin(x_admin_token)
+    return {"batcher": physio_rag.embedding_batcher_stats()}
+
+
+@router.post("/imports", status_code=202)
+async def start_import(
+    file: UploadFile = File(...),
+    mode: str = Form("merge", pattern="^(merge|replace)$"),
+    persist: bool = Form(False),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Bulk import a supplier catalog (CSV or NDJSON) in the background.
+
+    The upload is spooled to disk in chunks and processed by a background
+    job; poll GET /imports/{job_id} for progress. The catalog keeps serving
+    the previous snapshot until the import completes. The result is only
+    written to data/ingredients.json when persist is true.
+    """
+    _check_admin(x_admin_token)
+    try:
+        fmt = detect_format(file.filename or "")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Disk writes go to the threadpool so a large upload never blocks the event loop
+    tmp = await run_in_threadpool(tempfile.NamedTemporaryFile, delete=False, suffix=f".{fmt}")
+    try:
+        while chunk := await file.read(1 << 20):
+            await run_in_threadpool(tmp.write, chunk)
+    except BaseException:
+        await run_in_threadpool(tmp.close)
+        Path(tmp.name).unlink(missing_ok=True)
+        raise
+    await run_in_threadpool(tmp.close)
+
+    job = import_manager.start(Path(tmp.name), fmt, mode=mode, persist=persist, cleanup=True)
+    return job.to_dict()
+
+
+@router.get("/imports")
+async def list_imports(x_admin_token: Optional[str] = Header(None)):
+    """Recent import jobs, oldest first."""
+    _check_admin(x_admin_token)
+    return [job.to_dict() for job in import_manager.jobs()]
+
+
+@router.get("/imports/{job_id}")
+async def get_import(job_id: str, x_admin_token: Optional[str] = Header(None)):
+    """Progress and throughput of one import job."""
+    _check_admin(x_admin_token)
+    job = import_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job.to_dict()
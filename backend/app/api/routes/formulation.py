@@ -3,16 +3,27 @@ Formulation API endpoints.
 Handles perfume formula generation, IFRA validation, and physiological analysis.
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
+from functools import lru_cache
 from typing import Optional
+import base64
+import hashlib
+import json
 import uuid
 
 from app.core.ai_service import ai_analyzer
 from app.core.aether_agent import create_agent, AetherAgent
-from app.chemistry.ifra_validator import ifra_validator
-from app.chemistry.molecular_calc import calculate_logp, get_full_properties
-from app.chemistry.ingredient_db import ingredient_db
+from app.chemistry.ifra_validator import ifra_validator, IFRAReport
+from app.chemistry.ifra_batch import iter_validate_batch
+from app.chemistry.ifra_session import validation_sessions, ValidationSession
+from app.chemistry.ifra_correction import correct_formula
+from app.chemistry.molecular_calc import (
+    MolecularProperties, get_full_properties, aiter_properties_batch
+)
+from app.chemistry.ingredient_db import ingredient_db, CatalogSnapshot
 from app.neuro.eeg_simulator import eeg_simulator
 from app.neuro.ph_analyzer import ph_analyzer
 from app.config import settings
@@ -59,6 +70,7 @@ class FormulaResponse(BaseModel):
     sustainability_score: float
     ifra_compliant: bool
     ifra_report: Optional[dict] = None
+    ifra_corrections: list[dict] = []
     physio_corrections_applied: list[str]
     emotional_profile: Optional[dict] = None
 
@@ -78,6 +90,91 @@ class ValidationResponse(BaseModel):
     allergen_total: float
     max_allergen_limit: float
     summary: str
+    legal_categories: list[str] = []
+
+
+class BatchIngredient(BaseModel):
+    """Ingredient line of an archived formula."""
+    name: str
+    concentration: float
+    cas: Optional[str] = None
+
+
+class BatchFormula(BaseModel):
+    """One formula of a batch validation request."""
+    id: Optional[str] = None
+    ingredients: list[BatchIngredient]
+
+
+class BatchValidationRequest(BaseModel):
+    """Request for validating many formulas against IFRA standards."""
+    formulas: list[BatchFormula] = Field(..., min_length=1, max_length=settings.ifra_batch_max_size)
+    product_category: str = Field(default="cat1", pattern="^(cat1|cat2)$")
+
+
+class BatchValidationResult(ValidationResponse):
+    """One NDJSON line of a batch validation, tagged with its input position."""
+    index: int
+    id: Optional[str] = None
+
+
+class CorrectionIngredient(BatchIngredient):
+    """Ingredient line for correction; note_type groups it in the pyramid."""
+    note_type: Optional[str] = None
+
+
+class CorrectionRequest(BaseModel):
+    """Request to correct a formula to its nearest IFRA-compliant version."""
+    ingredients: list[CorrectionIngredient] = Field(..., min_length=1)
+    product_category: str = Field(default="cat1", pattern="^(cat1|cat2)$")
+    preserve_pyramid: bool = True
+    limit_allergen_load: bool = False  # Also enforce the total allergen load (a warning otherwise)
+
+
+class CorrectionResponse(ValidationResponse):
+    """Corrected formula and its validation."""
+    ingredients: list[dict]
+    adjustments: list[dict]
+    compliant_before: bool
+
+
+class ValidationSessionRequest(BaseModel):
+    """Request to open an incremental validation session."""
+    ingredients: list[BatchIngredient]
+    product_category: str = Field(default="cat1", pattern="^(cat1|cat2)$")
+
+
+class ValidationSessionResponse(ValidationResponse):
+    """Full validation state of a session."""
+    session_id: str
+    standards_version: str
+    ingredients: list[dict]
+
+
+class SessionChange(BaseModel):
+    """One ingredient edit: an absolute concentration, a delta, or a removal."""
+    name: str
+    concentration: Optional[float] = Field(None, ge=0)
+    delta: Optional[float] = None
+    cas: Optional[str] = None
+    remove: bool = False
+
+
+class SessionPatchRequest(BaseModel):
+    """Edits to apply to a validation session."""
+    changes: list[SessionChange] = Field(..., min_length=1)
+
+
+class SessionPatchResponse(BaseModel):
+    """Violations changed by a session edit."""
+    session_id: str
+    added: list[dict]
+    updated: list[dict]
+    resolved: list[dict]
+    declarations: dict[str, list[dict]]
+    allergen_total: float
+    critical_count: int
+    compliant: bool
 
 
 class EEGSimulationRequest(BaseModel):
@@ -122,6 +219,44 @@ class MolecularAnalysisResponse(BaseModel):
     error_message: Optional[str] = None
 
 
+class BatchMolecularAnalysisRequest(BaseModel):
+    """Request for batch molecular property analysis."""
+    smiles: list[str] = Field(..., min_length=1, max_length=settings.molecular_batch_max_size)
+
+
+class BatchMolecularAnalysisResult(MolecularAnalysisResponse):
+    """One NDJSON line of a batch analysis, tagged with its input position."""
+    index: int
+
+
+class SimilarityRequest(BaseModel):
+    """Request for structurally similar catalog ingredients."""
+    smiles: Optional[str] = Field(None, min_length=1, description="Query molecule SMILES")
+    ingredient_id: Optional[str] = Field(None, description="Catalog ingredient to find substitutes for")
+    k: int = Field(default=5, ge=1, le=100)
+    min_similarity: float = Field(default=0.0, ge=0.0, le=1.0)
+    exclude_allergens: bool = False
+    exclude_ifra_restricted: bool = False
+
+
+class SimilarIngredient(BaseModel):
+    """A catalog ingredient with its Tanimoto similarity to the query."""
+    id: str
+    name: str
+    smiles: str
+    similarity: float
+    note_type: str
+    family: str
+    allergen: bool
+    ifra_restricted: bool
+
+
+class SimilarityResponse(BaseModel):
+    """Structural similarity search result."""
+    query_smiles: str
+    results: list[SimilarIngredient]
+
+
 # ============== Endpoints ==============
 
 @router.post("/generate", response_model=FormulaResponse)
@@ -170,16 +305,18 @@ async def generate_formula(request: FormulationRequest):
             formula_data = result.get("formula", {})
             recommendation = result.get("recommendation", {})
 
-            # Build ingredients with RDKit calculations
+            # Build ingredients with precomputed catalog descriptors
             ingredients = []
-            for ing in formula_data.get("ingredients", []):
+            llm_ingredients = formula_data.get("ingredients", [])
+            matches = ingredient_db.resolve_names([ing.get("name", "Unknown") for ing in llm_ingredients])
+            for ing, resolved in zip(llm_ingredients, matches):
                 name = ing.get("name", "Unknown")
-                smiles = _find_smiles_for_ingredient(name)
-                mol_props = get_full_properties(smiles) if smiles else None
+                match = resolved.ingredient if resolved else None
+                mol_props = match.properties if match else None
 
                 ingredients.append(Ingredient(
                     name=name,
-                    smiles=smiles or "",
+                    smiles=match.smiles if match else "",
                     concentration=ing.get("percentage", 5.0),
                     note_type=ing.get("note_type", "middle"),
                     logp=mol_props.logp if mol_props and mol_props.logp else 0.0,
@@ -189,11 +326,8 @@ async def generate_formula(request: FormulationRequest):
                     sustainability_score=8
                 ))
 
-            # IFRA validation
-            ifra_report = ifra_validator.validate_formula([
-                {"name": i.name, "concentration": i.concentration}
-                for i in ingredients
-            ])
+            # IFRA validation, correcting the formula if it fails
+            ifra_report, ifra_corrections = _validate_and_correct(ingredients)
 
             # Calculate note pyramid
             note_pyramid = _calculate_note_pyramid(ingredients)
@@ -213,6 +347,7 @@ async def generate_formula(request: FormulationRequest):
                     "allergens_to_declare": ifra_report.allergens_to_declare,
                     "total_allergen_load": ifra_report.total_allergen_load
                 },
+                ifra_corrections=ifra_corrections,
                 physio_corrections_applied=formula_data.get("physio_adjustments", []),
                 emotional_profile=emotional_profile
             )
@@ -245,29 +380,28 @@ def _generate_local_formula(
         arousal=arousal
     )
 
-    # Convert to response format with RDKit enrichment
+    # Convert to response format using descriptors precomputed at catalog load
     ingredients = []
     for fi in formula.ingredients:
         ing = fi.ingredient
-        mol_props = get_full_properties(ing.smiles)
+        mol_props = ing.properties
+        has_props = mol_props is not None and mol_props.valid
 
         ingredients.append(Ingredient(
             name=ing.name,
             smiles=ing.smiles,
             concentration=fi.concentration,
             note_type=ing.note_type,
-            logp=mol_props.logp if mol_props.valid else ing.logp,
-            molecular_weight=mol_props.molecular_weight if mol_props.valid else ing.molecular_weight,
+            logp=mol_props.logp if has_props else ing.logp,
+            molecular_weight=mol_props.molecular_weight if has_props else ing.molecular_weight,
             is_sustainable=ing.is_sustainable,
             source=ing.source,
             sustainability_score=ing.sustainability_score
         ))
 
-    # IFRA validation
-    ifra_report = ifra_validator.validate_formula([
-        {"name": i.name, "concentration": i.concentration}
-        for i in ingredients
-    ])
+    # IFRA validation, correcting the formula if it fails
+    ifra_report, ifra_corrections = _validate_and_correct(ingredients)
+    note_pyramid = _calculate_note_pyramid(ingredients) if ifra_corrections else formula.note_pyramid
 
     # Generate name based on emotional quadrant
     formula_name = _generate_formula_name(valence, arousal, request.prompt)
@@ -277,7 +411,7 @@ def _generate_local_formula(
         name=formula_name,
         description=formula.description or "A personalized fragrance crafted for your unique chemistry.",
         ingredients=ingredients,
-        note_pyramid=formula.note_pyramid,
+        note_pyramid=note_pyramid,
         longevity_score=_estimate_longevity(ingredients),
         projection_score=_estimate_projection(ingredients),
         sustainability_score=formula.sustainability_score,
@@ -287,49 +421,220 @@ def _generate_local_formula(
             "allergens_to_declare": ifra_report.allergens_to_declare,
             "total_allergen_load": ifra_report.total_allergen_load
         },
+        ifra_corrections=ifra_corrections,
         physio_corrections_applied=formula.corrections_applied,
         emotional_profile=emotional_profile
     )
 
 
+def _validate_and_correct(ingredients: list[Ingredient]) -> tuple[IFRAReport, list[dict]]:
+    """
+    Validate a generated formula and, if it has critical violations, cap
+    the offending materials at their IFRA limits.
+
+    Only restrictions and prohibitions are corrected; the rest of the
+    formula is left as generated (no pyramid rebalancing, and the total
+    allergen load stays a warning). Corrected concentrations are written
+    back to the ingredient models, and banned ingredients or ingredients
+    corrected to 0% are dropped from the list.
+
+    Returns:
+        (IFRA report of the final formula, list of adjustments)
+    """
+    data = [
+        {"name": i.name, "concentration": i.concentration, "note_type": i.note_type}
+        for i in ingredients
+    ]
+    report = ifra_validator.validate_formula(data)
+    if report.is_compliant or not settings.ifra_auto_correct:
+        return report, []
+
+    correction = correct_formula(data, preserve_pyramid=False)
+    removed = {a["name"] for a in correction.adjustments if a["removed"]}
+    ingredients[:] = [i for i in ingredients if i.name not in removed]
+    for ing, corrected in zip(ingredients, correction.ingredients):
+        ing.concentration = corrected["concentration"]
+    return correction.report, correction.adjustments
+
+
 @router.post("/validate", response_model=ValidationResponse)
 async def validate_formula(request: ValidationRequest):
     """
     Validate a formula against IFRA safety standards.
 
     Uses the full IFRA 51st Amendment database for compliance checking.
+    The formula is checked against every product category in one pass;
+    legal_categories lists the ones it is compliant for.
     """
     ingredients_data = [
         {"name": ing.name, "concentration": ing.concentration}
         for ing in request.ingredients
     ]
 
-    report = ifra_validator.validate_formula(
-        ingredients_data,
-        product_category=request.product_category
-    )
+    result = ifra_validator.validate_all_categories(ingredients_data)
+    report = result.reports.get(request.product_category)
+    if report is None:
+        raise HTTPException(status_code=400, detail=f"Unknown product category: {request.product_category}")
 
-    violations = [
-        {
-            "ingredient": v.ingredient_name,
-            "type": v.violation_type,
-            "current": v.current_concentration,
-            "max_allowed": v.max_allowed,
-            "severity": v.severity,
-            "recommendation": v.recommendation
-        }
-        for v in report.violations
+    return ValidationResponse(legal_categories=result.legal_categories, **_validation_fields(report))
+
+
+@router.post("/validate/batch")
+async def validate_formulas_batch(request: BatchValidationRequest):
+    """
+    Validate a batch of formulas against IFRA standards.
+
+    Formulas are validated in vectorized chunks and streamed back as NDJSON,
+    one line per formula in input order.
+    """
+    formulas = [
+        [ing.model_dump() for ing in formula.ingredients]
+        for formula in request.formulas
     ]
+    if request.product_category not in ifra_validator.snapshot().compiled.categories:
+        raise HTTPException(status_code=400, detail=f"Unknown product category: {request.product_category}")
+
+    def stream():
+        for index, report, legal in iter_validate_batch(formulas, request.product_category):
+            result = BatchValidationResult(
+                index=index,
+                id=request.formulas[index].id,
+                legal_categories=legal,
+                **_validation_fields(report)
+            )
+            yield result.model_dump_json() + "\n"
+
+    # Sync generator: Starlette iterates it in the threadpool
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.post("/correct", response_model=CorrectionResponse)
+async def correct_formula_endpoint(request: CorrectionRequest):
+    """
+    Correct a formula to the nearest IFRA-compliant concentrations.
+
+    Solves a relative least-squares projection onto the per-material maxima
+    (and the total allergen limit if limit_allergen_load is set), keeping
+    the note-pyramid shares unless preserve_pyramid is false. Banned
+    ingredients and ingredients corrected to 0% are removed.
+    """
+    data = [ing.model_dump() for ing in request.ingredients]
+    try:
+        before = ifra_validator.validate_formula(data, request.product_category)
+        correction = correct_formula(
+            data, request.product_category, request.preserve_pyramid, request.limit_allergen_load
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return CorrectionResponse(
+        ingredients=correction.ingredients,
+        adjustments=correction.adjustments,
+        compliant_before=before.is_compliant,
+        **_validation_fields(correction.report)
+    )
+
+
+@router.post("/validate/sessions", response_model=ValidationSessionResponse)
+async def create_validation_session(request: ValidationSessionRequest):
+    """
+    Open an incremental validation session for interactive editing.
+
+    The session caches each ingredient's compliance contribution; edits sent
+    with PATCH re-check only the edited ingredients.
+    """
+    try:
+        session = validation_sessions.create(
+            [ing.model_dump() for ing in request.ingredients],
+            product_category=request.product_category
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _session_response(session)
+
+
+@router.get("/validate/sessions/{session_id}", response_model=ValidationSessionResponse)
+async def get_validation_session(session_id: str):
+    """Full validation report of a session's current formula."""
+    return _session_response(_get_session(session_id))
+
+
+@router.patch("/validate/sessions/{session_id}", response_model=SessionPatchResponse)
+async def patch_validation_session(session_id: str, request: SessionPatchRequest):
+    """
+    Apply ingredient edits to a session.
+
+    Returns only the violations that appeared, changed or cleared, plus the
+    edited ingredients' allergen declarations and the running totals.
+    """
+    session = _get_session(session_id)
+    try:
+        delta = session.apply([change.model_dump() for change in request.changes])
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Ingredient not in session: {e.args[0]}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return SessionPatchResponse(
+        session_id=session.id,
+        added=[_violation_dict(v) for v in delta.added],
+        updated=[_violation_dict(v) for v in delta.updated],
+        resolved=[_violation_dict(v) for v in delta.resolved],
+        declarations=delta.declarations,
+        allergen_total=delta.total_allergen_load,
+        critical_count=delta.critical_count,
+        compliant=delta.is_compliant
+    )
+
+
+@router.delete("/validate/sessions/{session_id}")
+async def delete_validation_session(session_id: str):
+    """Close a validation session."""
+    if not validation_sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail="Validation session not found")
+    return {"deleted": session_id}
+
+
+def _get_session(session_id: str) -> ValidationSession:
+    session = validation_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Validation session not found")
+    return session
+
+
+def _session_response(session: ValidationSession) -> ValidationSessionResponse:
+    return ValidationSessionResponse(
+        session_id=session.id,
+        standards_version=session.snapshot.version,
+        ingredients=session.ingredients(),
+        **_validation_fields(session.report())
+    )
+
+
+def _violation_dict(v) -> dict:
+    return {
+        "ingredient": v.ingredient_name,
+        "type": v.violation_type,
+        "current": v.current_concentration,
+        "max_allowed": v.max_allowed,
+        "severity": v.severity,
+        "recommendation": v.recommendation
+    }
+
+
+def _validation_fields(report: IFRAReport) -> dict:
+    """Map an IFRA report to ValidationResponse fields."""
+    violations = [_violation_dict(v) for v in report.violations]
 
     warnings = [v["recommendation"] for v in violations if v["severity"] == "warning"]
 
-    return ValidationResponse(
+    return dict(
         compliant=report.is_compliant,
         violations=violations,
         warnings=warnings,
         allergens_to_declare=report.allergens_to_declare,
         allergen_total=report.total_allergen_load,
-        max_allergen_limit=1.0,
+        max_allergen_limit=report.max_allergen_load,
         summary=report.summary
     )
 
@@ -408,42 +713,166 @@ async def analyze_molecule(request: MolecularAnalysisRequest):
 
     Returns LogP, molecular weight, volatility classification, and more.
     """
-    props = get_full_properties(request.smiles)
-
-    return MolecularAnalysisResponse(
-        smiles=props.smiles,
-        valid=props.valid,
-        logp=props.logp,
-        molecular_weight=props.molecular_weight,
-        volatility_class=props.volatility_class,
-        tpsa=props.tpsa,
-        error_message=props.error_message
+    props = await run_in_threadpool(get_full_properties, request.smiles)
+
+    return MolecularAnalysisResponse(**_analysis_fields(props))
+
+
+@router.post("/molecular-analysis/batch")
+async def analyze_molecules_batch(request: BatchMolecularAnalysisRequest):
+    """
+    Analyze a list of SMILES strings in the molecular worker pool.
+
+    Streams NDJSON, one line per molecule in input order. Molecules that
+    fail to parse are reported with valid=false and an error_message
+    without aborting the rest of the batch.
+    """
+    async def stream():
+        async for index, props in aiter_properties_batch(request.smiles):
+            result = BatchMolecularAnalysisResult(index=index, **_analysis_fields(props))
+            yield result.model_dump_json() + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.post("/similar", response_model=SimilarityResponse)
+async def find_similar_ingredients(request: SimilarityRequest):
+    """
+    Find catalog ingredients structurally similar to a molecule.
+
+    Query by SMILES or by catalog ingredient_id (the ingredient itself is
+    excluded). Useful for substituting allergens or IFRA-restricted materials.
+    """
+    catalog = ingredient_db.snapshot()
+    exclude_ids = set()
+    if request.ingredient_id:
+        source = catalog.get_by_id(request.ingredient_id)
+        if source is None:
+            raise HTTPException(status_code=404, detail="Ingredient not found")
+        query_smiles = source.smiles
+        exclude_ids.add(source.id)
+    elif request.smiles:
+        query_smiles = request.smiles
+    else:
+        raise HTTPException(status_code=400, detail="Provide smiles or ingredient_id")
+
+    try:
+        matches = await run_in_threadpool(
+            catalog.find_similar,
+            query_smiles,
+            k=request.k,
+            exclude_ids=exclude_ids,
+            exclude_allergens=request.exclude_allergens,
+            exclude_restricted=request.exclude_ifra_restricted,
+            min_similarity=request.min_similarity
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return SimilarityResponse(
+        query_smiles=query_smiles,
+        results=[
+            SimilarIngredient(
+                id=ing.id,
+                name=ing.name,
+                smiles=ing.smiles,
+                similarity=score,
+                note_type=ing.note_type,
+                family=ing.family,
+                allergen=ing.allergen,
+                ifra_restricted=ing.ifra_restricted
+            )
+            for ing, score in matches
+        ]
     )
 
 
 @router.get("/ingredients")
 async def list_ingredients(
-    note_type: Optional[str] = None,
+    request: Request,
+    response: Response,
+    note_type: Optional[list[str]] = Query(None),
+    family: Optional[list[str]] = Query(None),
+    source: Optional[list[str]] = Query(None),
+    descriptor: Optional[list[str]] = Query(None),
+    sustainability_tier: Optional[list[str]] = Query(None),
+    allergen: Optional[bool] = None,
     sustainable_only: bool = False,
-    family: Optional[str] = None
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None
 ):
     """
     List available fragrance ingredients from database.
 
-    Filters available: note_type (top/middle/base), sustainable_only, family
+    Filters: note_type (top/middle/base), family, source, descriptor,
+    sustainability_tier (high/medium/low), allergen, sustainable_only.
+    Repeat a list filter to match any of its values; different filters are
+    combined with AND.
+
+    Without limit or cursor the response is the full list of matching
+    ingredients, as before. Passing either returns a page instead:
+    {items, facets, total, next_cursor}, where facets are disjunctive counts
+    and next_cursor is only valid for the catalog version it was issued
+    against (a reload in between answers 409). Responses carry an ETag and
+    honour If-None-Match.
     """
-    ingredients = ingredient_db.get_all()
+    selections = {
+        "note_type": note_type or [],
+        "family": family or [],
+        "source": source or [],
+        "descriptor": descriptor or [],
+        "sustainability_tier": sustainability_tier or [],
+        "allergen": [] if allergen is None else [str(allergen).lower()],
+        "sustainable": ["true"] if sustainable_only else [],
+    }
+
+    catalog = ingredient_db.snapshot()
+    paged = limit is not None or cursor is not None
+    after = _decode_listing_cursor(cursor, catalog.version) if cursor else -1
+    if paged and limit is None:
+        limit = 50
+
+    etag = _listing_etag(catalog.version, selections, limit, after)
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+    facets = catalog.facets
+    bits = facets.filter(selections)
+    payloads = _listing_payloads(catalog)
+    if not paged:
+        return [payloads[row] for row in facets.rows(bits)]
 
-    if note_type:
-        ingredients = [i for i in ingredients if i.note_type == note_type.lower()]
+    rows = facets.rows(bits, after=after, limit=limit + 1)
+    next_cursor = _encode_listing_cursor(catalog.version, rows[limit - 1]) if len(rows) > limit else None
 
-    if sustainable_only:
-        ingredients = [i for i in ingredients if i.is_sustainable]
+    return {
+        "items": [payloads[row] for row in rows[:limit]],
+        "facets": facets.counts(selections),
+        "total": bits.bit_count(),
+        "next_cursor": next_cursor
+    }
+
+
+# ============== Helper Functions ==============
+
+def _analysis_fields(props: MolecularProperties) -> dict:
+    """Select the molecular-analysis response fields from calculated properties."""
+    return {
+        "smiles": props.smiles,
+        "valid": props.valid,
+        "logp": props.logp,
+        "molecular_weight": props.molecular_weight,
+        "volatility_class": props.volatility_class,
+        "tpsa": props.tpsa,
+        "error_message": props.error_message
+    }
 
-    if family:
-        ingredients = [i for i in ingredients if i.family.lower() == family.lower()]
 
-    return [
+@lru_cache(maxsize=2)
+def _listing_payloads(catalog: CatalogSnapshot) -> tuple[dict, ...]:
+    """Serialized /ingredients rows for a catalog snapshot, in facet row order."""
+    return tuple(
         {
             "id": i.id,
             "name": i.name,
@@ -456,19 +885,57 @@ async def list_ingredients(
             "sustainability_score": i.sustainability_score,
             "descriptors": i.descriptors
         }
-        for i in ingredients
-    ]
+        for i in catalog.get_all()
+    )
 
 
-# ============== Helper Functions ==============
+def _encode_listing_cursor(catalog_version: str, row: int) -> str:
+    """Opaque /ingredients cursor: the last row served, bound to a catalog version."""
+    return base64.urlsafe_b64encode(f"{catalog_version}:{row}".encode()).decode().rstrip("=")
 
-def _find_smiles_for_ingredient(name: str) -> Optional[str]:
-    """Find SMILES string for an ingredient by name."""
-    name_lower = name.lower()
-    for ing in ingredient_db.get_all():
-        if ing.name.lower() in name_lower or name_lower in ing.name.lower():
-            return ing.smiles
-    return None
+
+def _decode_listing_cursor(cursor: str, catalog_version: str) -> int:
+    """
+    Row position encoded in an /ingredients cursor.
+
+    Raises:
+        HTTPException: 400 for a malformed cursor, 409 when it was issued
+            against a different catalog version
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        version, _, row = raw.rpartition(":")
+        after = int(row)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if version != catalog_version:
+        raise HTTPException(
+            status_code=409,
+            detail="Cursor is from an older catalog version; restart from the first page"
+        )
+    return after
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header (list, W/ or *) with an ETag."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def _listing_etag(catalog_version: str, selections: dict, limit: Optional[int], after: int) -> str:
+    """Stable ETag for an /ingredients page: catalog version plus normalized query."""
+    normalized = {facet: sorted(v.lower() for v in values) for facet, values in selections.items()}
+    key = json.dumps([catalog_version, normalized, limit, after], sort_keys=True)
+    return '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
 
 
 def _calculate_note_pyramid(ingredients: list[Ingredient]) -> dict:
@@ -0,0 +1,64 @@
+"""
+Allergy filtering for the ingredient catalog.
+
+A user's allergies are compiled into one alternation regex, so each
+ingredient name is scanned once regardless of how many allergies are listed.
+The resulting safe pool is split by note type for formula generation.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+
+def normalize_allergies(allergies: Optional[Iterable[str]]) -> frozenset[str]:
+    """Lower-case and deduplicate allergy names, dropping blanks."""
+    if not allergies:
+        return frozenset()
+    return frozenset(a.strip().lower() for a in allergies if a and a.strip())
+
+
+def compile_allergies(allergies: frozenset[str]) -> Optional[re.Pattern]:
+    """
+    Compile normalized allergies into a single substring matcher.
+
+    Returns:
+        Pattern matching any allergy inside a lower-cased name, or None
+    """
+    if not allergies:
+        return None
+    # Longest first so overlapping names prefer the most specific match
+    terms = sorted(allergies, key=lambda a: (-len(a), a))
+    return re.compile("|".join(re.escape(term) for term in terms))
+
+
+@dataclass(frozen=True)
+class SafePool:
+    """Ingredients safe for one allergy combination, shared across requests."""
+    allergies: frozenset[str]
+    ingredients: tuple
+    by_note_type: dict[str, tuple] = field(default_factory=dict)
+
+    def note_type(self, note_type: str) -> tuple:
+        """Safe ingredients of one note type (top, middle, base)."""
+        return self.by_note_type.get(note_type, ())
+
+
+def build_safe_pool(ingredients: list, allergies: frozenset[str]) -> SafePool:
+    """Filter ingredients whose names contain none of the allergies."""
+    pattern = compile_allergies(allergies)
+    if pattern is None:
+        safe = tuple(ingredients)
+    else:
+        search = pattern.search
+        safe = tuple(ing for ing in ingredients if search(ing.name.lower()) is None)
+
+    by_note_type: dict[str, list] = {}
+    for ing in safe:
+        by_note_type.setdefault(ing.note_type, []).append(ing)
+
+    return SafePool(
+        allergies=allergies,
+        ingredients=safe,
+        by_note_type={note: tuple(items) for note, items in by_note_type.items()}
+    )
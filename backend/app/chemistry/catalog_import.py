@@ -0,0 +1,385 @@
+"""
+Bulk catalog import from supplier files.
+
+Rows are streamed from CSV or NDJSON and validated one at a time. Molecular
+descriptors are computed in the worker process pool, and the merged catalog
+is written to ingredients.json and installed as a new snapshot. Queries keep
+hitting the previous snapshot until the swap.
+
+CLI (from backend/):
+    python -m app.chemistry.catalog_import suppliers.csv [--replace] [--dry-run]
+"""
+
+import argparse
+import csv
+import json
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import IO, Iterator, Optional
+
+from app.chemistry.molecular_calc import iter_properties_batch
+from app.chemistry.ingredient_db import (
+    ingredient_db,
+    CatalogSnapshot,
+    Ingredient,
+    write_catalog_json,
+)
+
+NOTE_TYPES = {"top", "middle", "base"}
+NOTE_TYPE_ALIASES = {"heart": "middle"}
+MAX_REPORTED_ERRORS = 100
+
+_TRUE = {"1", "true", "yes", "y", "t"}
+_FALSE = {"0", "false", "no", "n", "f", ""}
+
+
+@dataclass
+class ImportJob:
+    """Progress and outcome of one bulk import."""
+    id: str
+    source: str
+    mode: str  # "merge" or "replace"
+    status: str = "pending"  # pending, reading, computing, indexing, done, failed
+    rows_read: int = 0
+    rows_valid: int = 0
+    rows_invalid: int = 0
+    descriptors_done: int = 0
+    descriptors_total: int = 0
+    descriptors_reused: int = 0
+    catalog_size: Optional[int] = None
+    catalog_version: Optional[str] = None
+    errors: list[dict] = field(default_factory=list)
+    error: Optional[str] = None
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.time()) - self.started_at
+
+    @property
+    def rows_per_second(self) -> float:
+        return round(self.rows_read / self.elapsed, 1) if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["elapsed"] = round(self.elapsed, 3)
+        data["rows_per_second"] = self.rows_per_second
+        return data
+
+    def _record_error(self, line: int, message: str):
+        self.rows_invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+
+def iter_rows(stream: IO[str], fmt: str) -> Iterator[tuple[int, dict]]:
+    """
+    Stream raw records from a CSV or NDJSON text stream.
+
+    Yields:
+        (line number, record dict); NDJSON lines that fail to parse yield
+        a record with a "__error__" key
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "ndjson":
+        for line_num, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                record = {"__error__": f"Invalid JSON: {e}"}
+            if not isinstance(record, dict):
+                record = {"__error__": "Expected a JSON object"}
+            yield line_num, record
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def _text(record: dict, key: str, required: bool = False) -> Optional[str]:
+    value = record.get(key)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            raise ValueError(f"Missing {key}")
+        return None
+    return str(value).strip()
+
+
+def _number(record: dict, key: str, cast=float):
+    value = record.get(key)
+    if value is None or value == "":
+        return None
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {key}: {value!r}")
+
+
+def _flag(record: dict, key: str) -> bool:
+    value = record.get(key)
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower() if value is not None else ""
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError(f"Invalid {key}: {value!r}")
+
+
+def _list(record: dict, key: str) -> list[str]:
+    value = record.get(key)
+    if not value:
+        return []
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
+    # CSV cells: "woody;warm" or "woody|warm"
+    return [v.strip() for v in str(value).replace("|", ";").split(";") if v.strip()]
+
+
+def validate_row(record: dict) -> Ingredient:
+    """
+    Validate one supplier record and build an Ingredient.
+
+    logp and molecular_weight are optional; they are replaced by calculated
+    values when the SMILES is valid. A "heart" note_type is stored as
+    "middle". The SMILES itself is checked later, when descriptors are
+    computed (see run_import).
+
+    Raises:
+        ValueError: With a message describing the first problem found
+    """
+    if "__error__" in record:
+        raise ValueError(record["__error__"])
+
+    note_type = (_text(record, "note_type", required=True) or "").lower()
+    note_type = NOTE_TYPE_ALIASES.get(note_type, note_type)
+    if note_type not in NOTE_TYPES:
+        raise ValueError(f"Invalid note_type: {note_type!r}")
+
+    score = _number(record, "sustainability_score", int)
+    if score is not None and not 0 <= score <= 10:
+        raise ValueError(f"sustainability_score out of range: {score}")
+
+    return Ingredient(
+        id=_text(record, "id", required=True),
+        name=_text(record, "name", required=True),
+        smiles=_text(record, "smiles", required=True),
+        note_type=note_type,
+        family=(_text(record, "family", required=True) or "").lower(),
+        logp=_number(record, "logp") or 0.0,
+        molecular_weight=_number(record, "molecular_weight") or 0.0,
+        is_sustainable=_flag(record, "is_sustainable"),
+        source=(_text(record, "source") or "synthetic").lower(),
+        sustainability_score=score or 0,
+        ifra_restricted=_flag(record, "ifra_restricted"),
+        allergen=_flag(record, "allergen"),
+        max_concentration=_number(record, "max_concentration"),
+        descriptors=_list(record, "descriptors"),
+        origin=_text(record, "origin"),
+        latin_name=_text(record, "latin_name"),
+        cas=_text(record, "cas"),
+        synonyms=_list(record, "synonyms")
+    )
+
+
+def detect_format(filename: str) -> str:
+    """Pick the import format from a file name."""
+    suffix = Path(filename).suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".ndjson", ".jsonl"):
+        return "ndjson"
+    raise ValueError(f"Cannot infer import format from {filename!r}; use .csv or .ndjson")
+
+
+def run_import(
+    job: ImportJob,
+    stream: IO[str],
+    fmt: str,
+    persist: bool = True,
+    install: bool = True
+) -> Optional[CatalogSnapshot]:
+    """
+    Run an import to completion, updating job progress as it goes.
+
+    Args:
+        job: Job record to update
+        stream: Text stream of CSV or NDJSON rows
+        fmt: "csv" or "ndjson"
+        persist: Write the merged catalog to ingredients.json
+        install: Swap the new snapshot into ingredient_db
+
+    Returns:
+        The new catalog snapshot, or None if the import failed
+    """
+    try:
+        # 1. Stream and validate rows
+        job.status = "reading"
+        imported: dict[str, Ingredient] = {}
+        lines: dict[str, int] = {}
+        for line, record in iter_rows(stream, fmt):
+            job.rows_read += 1
+            try:
+                ing = validate_row(record)
+            except ValueError as e:
+                job._record_error(line, str(e))
+                continue
+            imported[ing.id] = ing
+            lines[ing.id] = line
+            job.rows_valid += 1
+
+        if not imported:
+            raise ValueError("No valid rows to import")
+
+        # 2. Descriptors: reuse the current snapshot's for unchanged SMILES
+        job.status = "computing"
+        base = ingredient_db.snapshot()
+        known = {ing.smiles: ing.properties for ing in base.get_all() if ing.properties is not None}
+        pending: list[Ingredient] = []
+        for ing in imported.values():
+            props = known.get(ing.smiles)
+            if props is not None:
+                ing.properties = props
+                job.descriptors_reused += 1
+            else:
+                pending.append(ing)
+
+        job.descriptors_total = len(pending)
+        for index, props in iter_properties_batch([ing.smiles for ing in pending]):
+            pending[index].properties = props
+            job.descriptors_done += 1
+
+        # Rows whose SMILES does not parse never reach the catalog
+        for ing in list(imported.values()):
+            props = ing.properties
+            if props is None or not props.valid:
+                del imported[ing.id]
+                job.rows_valid -= 1
+                reason = props.error_message if props is not None and props.error_message else "Invalid SMILES"
+                job._record_error(lines[ing.id], f"{reason}: {ing.smiles!r}")
+                continue
+            ing.logp = props.logp
+            ing.molecular_weight = props.molecular_weight
+
+        if not imported:
+            raise ValueError("No valid rows to import")
+
+        # 3. Merge and build the new snapshot (old one keeps serving)
+        job.status = "indexing"
+        if job.mode == "replace":
+            merged = list(imported.values())
+        else:
+            merged = {ing.id: ing for ing in base.get_all()}
+            merged.update(imported)
+            merged = list(merged.values())
+
+        if persist:
+            version = write_catalog_json(merged)
+        else:
+            version = f"import-{job.id}"
+        snapshot = CatalogSnapshot(merged, version=version, source="import")
+        if install:
+            ingredient_db.install(snapshot)
+
+        job.catalog_size = len(snapshot)
+        job.catalog_version = version
+        job.status = "done"
+        return snapshot
+
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+        return None
+    finally:
+        job.finished_at = time.time()
+
+
+class ImportManager:
+    """Runs imports in background threads and keeps their progress records."""
+
+    def __init__(self, max_jobs: int = 50):
+        self._jobs: dict[str, ImportJob] = {}
+        self._max_jobs = max_jobs
+        self._lock = threading.Lock()  # One import at a time
+
+    def start(self, path: Path, fmt: str, mode: str = "merge", persist: bool = False, cleanup: bool = False) -> ImportJob:
+        """
+        Start importing a file in a background thread.
+
+        Args:
+            path: CSV or NDJSON file
+            fmt: "csv" or "ndjson"
+            mode: "merge" (upsert by id) or "replace"
+            persist: Also write the merged catalog to ingredients.json
+                (otherwise it only lives in memory until the next reload)
+            cleanup: Delete the file when the import finishes
+        """
+        job = ImportJob(id=uuid.uuid4().hex[:12], source=path.name, mode=mode)
+        self._jobs[job.id] = job
+        while len(self._jobs) > self._max_jobs:
+            self._jobs.pop(next(iter(self._jobs)))
+
+        def work():
+            with self._lock:
+                try:
+                    with open(path, "r", encoding="utf-8", newline="") as f:
+                        run_import(job, f, fmt, persist=persist)
+                finally:
+                    if cleanup:
+                        path.unlink(missing_ok=True)
+
+        threading.Thread(target=work, name=f"catalog-import-{job.id}", daemon=True).start()
+        return job
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> list[ImportJob]:
+        return list(self._jobs.values())
+
+
+# Singleton instance
+import_manager = ImportManager()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import a supplier catalog (CSV or NDJSON)")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=("csv", "ndjson"), default=None)
+    parser.add_argument("--replace", action="store_true", help="Replace the catalog instead of merging")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and compute without writing ingredients.json")
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path.name)
+    job = ImportJob(id="cli", source=args.path.name, mode="replace" if args.replace else "merge")
+
+    done = threading.Event()
+
+    def report():
+        while not done.wait(2.0):
+            print(f"[{job.status}] rows={job.rows_read} invalid={job.rows_invalid} "
+                  f"descriptors={job.descriptors_done}/{job.descriptors_total} "
+                  f"({job.rows_per_second} rows/s)", flush=True)
+
+    threading.Thread(target=report, daemon=True).start()
+    with open(args.path, "r", encoding="utf-8", newline="") as f:
+        run_import(job, f, fmt, persist=not args.dry_run, install=False)
+    done.set()
+
+    summary = job.to_dict()
+    summary["errors"] = summary["errors"][:10]
+    print(json.dumps(summary, indent=2))
+    if job.status != "done":
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
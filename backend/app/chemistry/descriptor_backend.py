@@ -0,0 +1,178 @@
+"""
+Pluggable molecular descriptor backends.
+
+The backend is chosen once per process: RDKit when it is installed, otherwise
+a pure-Python fallback built on smiles_lite. Detection only checks whether the
+rdkit package exists, so RDKit-less serverless cold starts never attempt (and
+fail) an import.
+"""
+
+import importlib.util
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from app.config import settings
+from app.chemistry import smiles_lite
+
+
+class DescriptorBackend(ABC):
+    """
+    Interface for molecular descriptor calculation.
+
+    Backends parse a SMILES string into an opaque molecule object once and
+    compute every descriptor from that object.
+    """
+
+    name: str = "base"
+
+    def warm(self):
+        """Import heavy dependencies ahead of the first calculation."""
+
+    @abstractmethod
+    def parse(self, smiles: str):
+        """Parse SMILES into a molecule object, or None if invalid."""
+
+    def canonical_smiles(self, mol, smiles: str) -> str:
+        """Return a canonical key for the parsed molecule."""
+        return smiles
+
+    @abstractmethod
+    def descriptors(self, mol) -> dict:
+        """
+        Compute raw descriptors for a parsed molecule.
+
+        Returns:
+            Dict with logp, molecular_weight, tpsa, num_rotatable_bonds,
+            num_h_donors and num_h_acceptors
+        """
+
+    @abstractmethod
+    def morgan_bits(self, mol, radius: int, n_bits: int) -> list[int]:
+        """Return the on-bit positions of a Morgan (ECFP-like) fingerprint."""
+
+
+class RDKitBackend(DescriptorBackend):
+    """Descriptor backend using RDKit (Crippen logP, exact TPSA)."""
+
+    name = "rdkit"
+
+    def __init__(self):
+        self._chem = None
+
+    def warm(self):
+        if self._chem is None:
+            from rdkit import Chem
+            from rdkit.Chem import Descriptors, Crippen, rdMolDescriptors, rdFingerprintGenerator
+            self._fingerprint_generators = {}
+            self._rd_fingerprint = rdFingerprintGenerator
+            self._descriptors = Descriptors
+            self._crippen = Crippen
+            self._rd_descriptors = rdMolDescriptors
+            self._chem = Chem
+
+    def parse(self, smiles: str):
+        self.warm()
+        return self._chem.MolFromSmiles(smiles)
+
+    def canonical_smiles(self, mol, smiles: str) -> str:
+        return self._chem.MolToSmiles(mol)
+
+    def descriptors(self, mol) -> dict:
+        return {
+            "logp": self._crippen.MolLogP(mol),
+            "molecular_weight": self._descriptors.MolWt(mol),
+            "tpsa": self._descriptors.TPSA(mol),
+            "num_rotatable_bonds": self._rd_descriptors.CalcNumRotatableBonds(mol),
+            "num_h_donors": self._rd_descriptors.CalcNumHBD(mol),
+            "num_h_acceptors": self._rd_descriptors.CalcNumHBA(mol),
+        }
+
+    def morgan_bits(self, mol, radius: int, n_bits: int) -> list[int]:
+        key = (radius, n_bits)
+        generator = self._fingerprint_generators.get(key)
+        if generator is None:
+            generator = self._rd_fingerprint.GetMorganGenerator(radius=radius, fpSize=n_bits)
+            self._fingerprint_generators[key] = generator
+        return list(generator.GetFingerprint(mol).GetOnBits())
+
+
+class PurePythonBackend(DescriptorBackend):
+    """
+    Dependency-free fallback using atom-contribution estimates.
+
+    Molecular weight matches RDKit's MolWt (isotope labels included); logP
+    uses Wildman-Crippen atom types and agrees with RDKit to within a few
+    hundredths for the catalog molecules, except where RDKit perceives
+    aromaticity in Kekulé-drawn rings. Charged species and explicit hydrogen
+    atoms are estimated less accurately (e.g. [NH4+] -1.09 vs RDKit 0.38).
+    """
+
+    name = "python"
+
+    def parse(self, smiles: str):
+        try:
+            return smiles_lite.parse_smiles(smiles)
+        except smiles_lite.SmilesParseError:
+            return None
+
+    def descriptors(self, mol) -> dict:
+        return {
+            "logp": smiles_lite.crippen_logp(mol),
+            "molecular_weight": smiles_lite.molecular_weight(mol),
+            "tpsa": smiles_lite.tpsa(mol),
+            "num_rotatable_bonds": smiles_lite.num_rotatable_bonds(mol),
+            "num_h_donors": smiles_lite.num_h_donors(mol),
+            "num_h_acceptors": smiles_lite.num_h_acceptors(mol),
+        }
+
+    def morgan_bits(self, mol, radius: int, n_bits: int) -> list[int]:
+        return smiles_lite.morgan_bits(mol, radius, n_bits)
+
+
+_BACKENDS = {
+    RDKitBackend.name: RDKitBackend,
+    PurePythonBackend.name: PurePythonBackend,
+}
+
+_backend: Optional[DescriptorBackend] = None
+_backend_lock = threading.Lock()
+
+
+def rdkit_available() -> bool:
+    """Check whether RDKit is installed without importing it."""
+    return importlib.util.find_spec("rdkit") is not None
+
+
+def _detect_backend() -> DescriptorBackend:
+    requested = settings.descriptor_backend.lower()
+    if requested == "auto":
+        requested = RDKitBackend.name if rdkit_available() else PurePythonBackend.name
+    elif requested == RDKitBackend.name and not rdkit_available():
+        requested = PurePythonBackend.name
+
+    backend_cls = _BACKENDS.get(requested)
+    if backend_cls is None:
+        raise ValueError(f"Unknown descriptor backend: {settings.descriptor_backend}")
+    return backend_cls()
+
+
+def get_descriptor_backend() -> DescriptorBackend:
+    """Get the process-wide descriptor backend, detecting it on first call."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _detect_backend()
+    return _backend
+
+
+def set_descriptor_backend(name: str) -> DescriptorBackend:
+    """Force a specific backend ("rdkit" or "python"); mainly for benchmarks."""
+    global _backend
+    backend_cls = _BACKENDS.get(name)
+    if backend_cls is None:
+        raise ValueError(f"Unknown descriptor backend: {name}")
+    with _backend_lock:
+        _backend = backend_cls()
+    return _backend
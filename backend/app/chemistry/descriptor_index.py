@@ -0,0 +1,86 @@
+"""
+Inverted index over ingredient scent descriptors and families.
+
+Terms map to the catalog rows that carry them, and a trigram index over the
+term vocabulary resolves partial matches ("wood" -> "woody") without scanning
+every ingredient, preserving the substring semantics of the original filters.
+"""
+
+from typing import Iterable
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class DescriptorIndex:
+    """
+    Term -> rows postings for the "descriptor" and "family" fields.
+
+    Rows follow the order of the ingredient list the index was built from.
+    """
+
+    FIELDS = ("descriptor", "family")
+
+    def __init__(self, ingredients: list):
+        self.postings: dict[str, dict[str, frozenset[int]]] = {}
+        self.trigrams: dict[str, dict[str, frozenset[str]]] = {}
+
+        for field in self.FIELDS:
+            postings: dict[str, set[int]] = {}
+            for row, ing in enumerate(ingredients):
+                terms = ing.descriptors if field == "descriptor" else (ing.family,)
+                for term in terms:
+                    postings.setdefault(term.lower(), set()).add(row)
+
+            grams: dict[str, set[str]] = {}
+            for term in postings:
+                for gram in _trigrams(term):
+                    grams.setdefault(gram, set()).add(term)
+
+            self.postings[field] = {t: frozenset(rows) for t, rows in postings.items()}
+            self.trigrams[field] = {g: frozenset(terms) for g, terms in grams.items()}
+
+    def matching_terms(self, query: str, field: str = "descriptor") -> list[str]:
+        """Vocabulary terms of a field containing the query as a substring."""
+        query = query.lower()
+        postings = self.postings[field]
+        if len(query) < 3:
+            # Too short for trigrams; the vocabulary is far smaller than the catalog
+            return [t for t in postings if query in t]
+
+        candidates = None
+        grams = self.trigrams[field]
+        for gram in _trigrams(query):
+            terms = grams.get(gram)
+            if terms is None:
+                return []
+            candidates = terms if candidates is None else candidates & terms
+        return [t for t in candidates if query in t]
+
+    def match_rows(self, query: str, fields: Iterable[str] = ("descriptor",)) -> set[int]:
+        """Rows with a term containing the query in any of the given fields."""
+        rows: set[int] = set()
+        for field in fields:
+            postings = self.postings[field]
+            for term in self.matching_terms(query, field):
+                rows |= postings[term]
+        return rows
+
+    def search(self, queries: Iterable[str], fields: Iterable[str] = ("descriptor",)) -> list[tuple[int, int]]:
+        """
+        Rank rows by how many query terms they match.
+
+        Args:
+            queries: Query terms (substring semantics, case-insensitive)
+            fields: Fields to match against
+
+        Returns:
+            List of (row, match_count), highest count first, then catalog order
+        """
+        fields = tuple(fields)
+        counts: dict[int, int] = {}
+        for query in dict.fromkeys(q.lower() for q in queries if q):
+            for row in self.match_rows(query, fields):
+                counts[row] = counts.get(row, 0) + 1
+        return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
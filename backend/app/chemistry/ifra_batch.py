@@ -0,0 +1,295 @@
+"""
+Vectorized IFRA validation for batches of formulas.
+
+A batch is held as a COO concentration matrix (formulas x distinct materials)
+and each material is resolved once against the compiled standards into a
+flat table of checks (restricted limit, phototoxicity limits, allergen
+thresholds) with one limit column per product category. Expanding the
+nonzeros against their material's checks gives a (pairs x categories)
+matrix of limits for the whole batch; violations, declaration flags and
+per-formula allergen loads are NumPy comparisons and bincounts over it.
+Reports are identical to IFRAValidator.validate_formula.
+"""
+
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.chemistry.ifra_validator import (
+    ifra_validator,
+    IFRAReport,
+    IFRAViolation,
+    StandardsSnapshot,
+    build_report,
+)
+from app.chemistry.ifra_matcher import CompiledStandards
+
+KIND_RESTRICTED = 0
+KIND_PHOTOTOXIC = 1
+KIND_ALLERGEN = 2
+
+
+@dataclass
+class FormulaBatch:
+    """Formulas as a COO concentration matrix over the distinct materials in the batch."""
+    rows: np.ndarray  # Formula index of each entry
+    cols: np.ndarray  # Material index of each entry
+    values: np.ndarray  # Concentration (%) of each entry
+    ingredients: list[dict]  # Source ingredient dict of each entry
+    materials: list[tuple[str, Optional[str]]]  # (name, cas) per material
+    n_formulas: int
+
+    @classmethod
+    def from_formulas(cls, formulas: list[list[dict]]) -> "FormulaBatch":
+        """
+        Build the matrix from formulas given as ingredient dict lists.
+
+        Entries keep formula order, and repeated ingredients stay separate
+        entries, matching the per-formula validator.
+        """
+        material_ids: dict[tuple[str, Optional[str]], int] = {}
+        materials: list[tuple[str, Optional[str]]] = []
+        rows: list[int] = []
+        cols: list[int] = []
+        values: list[float] = []
+        ingredients: list[dict] = []
+        for row, formula in enumerate(formulas):
+            for ing in formula:
+                name = ing.get('name', '')
+                cas = ing.get('cas') or None
+                key = (name.lower(), cas)
+                col = material_ids.get(key)
+                if col is None:
+                    col = material_ids[key] = len(materials)
+                    materials.append((name, cas))
+                rows.append(row)
+                cols.append(col)
+                values.append(ing.get('concentration', 0))
+                ingredients.append(ing)
+
+        return cls(
+            rows=np.asarray(rows, dtype=np.int64),
+            cols=np.asarray(cols, dtype=np.int64),
+            values=np.asarray(values, dtype=np.float64),
+            ingredients=ingredients,
+            materials=materials,
+            n_formulas=len(formulas),
+        )
+
+
+@dataclass
+class _CheckTable:
+    """Standards checks per material, in CSR layout, with limits per product category."""
+    starts: np.ndarray  # Material i's checks are starts[i]:starts[i + 1]
+    kinds: np.ndarray
+    entries: np.ndarray  # Entry index into the kind's entry list
+    limits: np.ndarray  # (checks x categories)
+
+    @classmethod
+    def build(cls, compiled: CompiledStandards, materials: list[tuple[str, Optional[str]]]) -> "_CheckTable":
+        starts = [0]
+        kinds: list[int] = []
+        entries: list[int] = []
+        for name, cas in materials:
+            matches = compiled.match(name, cas)
+            if matches.restricted is not None:
+                kinds.append(KIND_RESTRICTED)
+                entries.append(matches.restricted)
+            kinds.extend([KIND_PHOTOTOXIC] * len(matches.phototoxic))
+            entries.extend(matches.phototoxic)
+            kinds.extend([KIND_ALLERGEN] * len(matches.allergens))
+            entries.extend(matches.allergens)
+            starts.append(len(kinds))
+
+        kinds = np.asarray(kinds, dtype=np.int8)
+        entries = np.asarray(entries, dtype=np.int64)
+        limits = np.empty((len(kinds), len(compiled.categories)), dtype=np.float64)
+        for kind, table in ((KIND_RESTRICTED, compiled.restricted_limits),
+                            (KIND_PHOTOTOXIC, compiled.phototoxic_limits),
+                            (KIND_ALLERGEN, compiled.allergen_thresholds)):
+            rows = kinds == kind
+            limits[rows] = table[entries[rows]]
+        return cls(starts=np.asarray(starts, dtype=np.int64), kinds=kinds, entries=entries, limits=limits)
+
+
+class BatchValidation:
+    """
+    Result of validating a batch of formulas against every product category.
+
+    Per-formula arrays (compliance, critical_count, declaration_count,
+    total_allergen_load) are (formulas x categories) and computed up front;
+    full IFRAReport objects are built on demand from the flagged pairs.
+    """
+
+    def __init__(self, batch: FormulaBatch, snapshot: StandardsSnapshot):
+        self.batch = batch
+        self.version = snapshot.version
+        self.compiled = compiled = snapshot.compiled
+        self.categories = compiled.categories
+        self._checks = checks = _CheckTable.build(compiled, batch.materials)
+        n, n_categories = batch.n_formulas, len(self.categories)
+
+        # Expand every matrix entry against its material's checks
+        counts = np.diff(checks.starts)[batch.cols]
+        entry = np.repeat(np.arange(len(batch.cols)), counts)
+        first = np.cumsum(counts) - counts
+        check = checks.starts[batch.cols][entry] + (np.arange(len(entry)) - np.repeat(first, counts))
+
+        formula = batch.rows[entry]
+        conc = batch.values[entry][:, None]
+        kind = checks.kinds[check][:, None]
+        limit = checks.limits[check]
+
+        banned = (kind != KIND_PHOTOTOXIC) & (limit == 0)
+        over = (((kind == KIND_RESTRICTED) & (limit != 0)) | (kind == KIND_PHOTOTOXIC)) & (conc > limit)
+        declare = (kind == KIND_ALLERGEN) & (limit != 0) & (conc >= limit)
+        violation = banned | over
+
+        # Per (formula, category) sums via bincount over flattened cell ids
+        cell = formula[:, None] * n_categories + np.arange(n_categories)
+        size = n * n_categories
+        weights = np.broadcast_to(conc, declare.shape)
+        self.critical_count = np.bincount(cell[violation], minlength=size).reshape(n, n_categories)
+        self.declaration_count = np.bincount(cell[declare], minlength=size).reshape(n, n_categories)
+        self.total_allergen_load = np.bincount(
+            cell[declare], weights=weights[declare], minlength=size
+        ).reshape(n, n_categories)
+        self.compliance = self.critical_count == 0
+        self.over_allergen_limit = self.total_allergen_load > compiled.allergen_totals
+
+        # Flagged pairs, grouped by formula (entries are already in formula order)
+        flagged = np.flatnonzero((violation | declare).any(axis=1))
+        self._entry = entry[flagged]
+        self._check = check[flagged]
+        self._banned = banned[flagged]
+        self._declare = declare[flagged]
+        self._violation = violation[flagged]
+        self._bounds = np.searchsorted(formula[flagged], np.arange(n + 1))
+
+    def __len__(self) -> int:
+        return self.batch.n_formulas
+
+    def legal_categories(self, index: int) -> list[str]:
+        """Product categories a formula is compliant for."""
+        return [category for category, legal in zip(self.categories, self.compliance[index]) if legal]
+
+    def report(self, index: int, product_category: str = "cat1") -> IFRAReport:
+        """Full report for one formula of the batch in one product category."""
+        batch, checks, compiled = self.batch, self._checks, self.compiled
+        column = compiled.category_index(product_category)
+        violations: list[IFRAViolation] = []
+        allergens_to_declare: list[dict] = []
+        total_allergen_load = 0.0
+
+        for i in range(self._bounds[index], self._bounds[index + 1]):
+            if not (self._declare[i, column] or self._violation[i, column]):
+                continue
+            ing = batch.ingredients[int(self._entry[i])]
+            name = ing.get('name', '')
+            concentration = ing.get('concentration', 0)
+            check = int(self._check[i])
+            kind = int(checks.kinds[check])
+            entry = int(checks.entries[check])
+            limit = float(checks.limits[check, column])
+
+            if self._declare[i, column]:
+                allergen = compiled.allergen_entries[entry]
+                allergens_to_declare.append({
+                    "name": name,
+                    "cas": allergen.get('cas'),
+                    "concentration": concentration,
+                    "threshold": limit
+                })
+                total_allergen_load += concentration
+            elif kind == KIND_PHOTOTOXIC:
+                phototox = compiled.phototoxic_entries[entry]
+                violations.append(IFRAViolation(
+                    ingredient_name=name,
+                    cas_number=None,
+                    violation_type="phototoxicity",
+                    current_concentration=concentration,
+                    max_allowed=limit,
+                    severity="critical",
+                    recommendation=f"Reduce {name} to max {limit}% for phototoxicity. {phototox.get('reason', '')}"
+                ))
+            elif kind == KIND_ALLERGEN:
+                violations.append(IFRAViolation(
+                    ingredient_name=name,
+                    cas_number=compiled.allergen_entries[entry].get('cas'),
+                    violation_type="banned",
+                    current_concentration=concentration,
+                    max_allowed=0,
+                    severity="critical",
+                    recommendation=f"Remove {name} - banned allergen"
+                ))
+            else:
+                restricted = compiled.restricted_entries[entry]
+                banned = self._banned[i, column]
+                violations.append(IFRAViolation(
+                    ingredient_name=name,
+                    cas_number=restricted.get('cas'),
+                    violation_type="banned" if banned else "over_limit",
+                    current_concentration=concentration,
+                    max_allowed=0 if banned else limit,
+                    severity="critical",
+                    recommendation=(f"Remove {name} - banned under IFRA. {restricted.get('reason', '')}" if banned
+                                    else f"Reduce {name} to max {limit}%. {restricted.get('reason', '')}")
+                ))
+
+        return build_report(
+            violations,
+            allergens_to_declare,
+            total_allergen_load,
+            float(compiled.allergen_totals[column]),
+            product_category
+        )
+
+    def reports(self, product_category: str = "cat1") -> Iterator[IFRAReport]:
+        """Reports for every formula in one product category, in batch order."""
+        for index in range(len(self)):
+            yield self.report(index, product_category)
+
+
+def validate_batch(
+    formulas: list[list[dict]],
+    snapshot: Optional[StandardsSnapshot] = None
+) -> BatchValidation:
+    """
+    Validate many formulas at once, against every product category.
+
+    Args:
+        formulas: Formulas as lists of dicts with 'name', 'concentration', optional 'cas'
+        snapshot: Standards to validate against (default: the current snapshot)
+
+    Returns:
+        BatchValidation with per-formula compliance arrays and reports
+    """
+    snapshot = snapshot or ifra_validator.snapshot()
+    return BatchValidation(FormulaBatch.from_formulas(formulas), snapshot)
+
+
+def iter_validate_batch(
+    formulas: list[list[dict]],
+    product_category: str = "cat1",
+    chunk_size: Optional[int] = None
+) -> Iterator[tuple[int, IFRAReport, list[str]]]:
+    """
+    Validate formulas in vectorized chunks, yielding reports as each chunk finishes.
+
+    All chunks use the standards snapshot current at the first chunk.
+
+    Yields:
+        (index in formulas, IFRAReport for product_category, legal categories)
+
+    Raises:
+        ValueError: If the product category is not in the standards
+    """
+    chunk_size = chunk_size or settings.ifra_batch_chunk_size
+    snapshot = ifra_validator.snapshot()
+    snapshot.compiled.category_index(product_category)
+    for start in range(0, len(formulas), chunk_size):
+        result = validate_batch(formulas[start:start + chunk_size], snapshot)
+        for offset, report in enumerate(result.reports(product_category)):
+            yield start + offset, report, result.legal_categories(offset)
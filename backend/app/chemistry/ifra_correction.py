@@ -0,0 +1,329 @@
+"""
+Automatic IFRA correction of formula concentrations.
+
+Finds the compliant concentration vector nearest to the original formula,
+measuring each change relative to the material's original concentration:
+
+    minimize    sum_i (x_i - x0_i)^2 / x0_i
+    subject to  0 <= x_i <= min(u_i, x0_i)    per-material IFRA maxima
+                sum_i a_i x_i <= L            total allergen load (optional)
+                S_g(x) = r_g * S(x)           note-pyramid ratios kept
+
+u_i is the tightest restricted / phototoxicity limit matching material i
+(0 if banned), a_i the number of declarable allergens it matches, and r_g
+the original share of note group g. A correction never raises a
+material, so the freed share is not pushed onto other materials. Counting
+every allergen regardless of its declaration threshold makes the load
+constraint conservative; it is only a warning in the validator, so it is
+enforced only on request.
+
+Weighting by 1/x0_i makes a note group shrink proportionally (every free
+member by the same factor) instead of losing the same amount from each
+member, which would drive its smaller materials to zero.
+
+The QP is solved in its dual: x(y) = clip(x0 - x0 * C^T y, 0, u) with at
+most five multipliers (note-group rows and the allergen row), found by a
+damped semismooth Newton method. Everything is batched over formulas with
+NumPy, so one call corrects a single formula or a whole archive.
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from app.chemistry.ifra_matcher import CategoryLimits, CompiledStandards, NameMatches
+from app.chemistry.ifra_validator import ifra_validator, IFRAReport, StandardsSnapshot
+
+NOTE_GROUPS = {"top": 0, "middle": 1, "heart": 1, "base": 2}
+OTHER_GROUP = 3
+N_GROUPS = 4
+N_ROWS = N_GROUPS + 1  # One pyramid row per note group, then the allergen row
+
+_TOLERANCE = 1e-10
+_MAX_ITERATIONS = 50
+_MAX_BACKTRACKS = 30
+_RIDGE = 1e-6
+
+
+def material_bounds(compiled: CompiledStandards, limits: CategoryLimits, match: NameMatches) -> tuple[float, int]:
+    """
+    Concentration ceiling and allergen weight of one material.
+
+    Returns:
+        (max concentration, or inf if unrestricted; number of declarable allergens matched)
+    """
+    upper = np.inf
+    if match.restricted is not None:
+        upper = min(upper, limits.restricted[match.restricted])
+    for entry in match.phototoxic:
+        upper = min(upper, limits.phototoxic[entry])
+    weight = 0
+    for entry in match.allergens:
+        if limits.allergen_thresholds[entry] == 0:
+            upper = 0.0  # Banned allergen
+        else:
+            weight += 1
+    return upper, weight
+
+
+@dataclass
+class CorrectionResult:
+    """Outcome of correcting one formula."""
+    ingredients: list[dict]  # Input dicts with corrected concentrations
+    adjustments: list[dict]  # {"name", "from", "to", "removed"} for every changed ingredient
+    report: IFRAReport  # Validation of the corrected formula
+    iterations: int = 0
+    residual: float = 0.0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.adjustments)
+
+
+@dataclass
+class _Problem:
+    """Padded (formulas x max ingredients) arrays of a batch."""
+    x0: np.ndarray
+    upper: np.ndarray
+    weight: np.ndarray
+    group: np.ndarray  # -1 for padding
+    allergen_limit: np.ndarray  # (formulas,)
+    pyramid: bool = True
+    rows: np.ndarray = field(init=False)  # (formulas, N_ROWS, max ingredients)
+
+    def __post_init__(self):
+        m, n = self.x0.shape
+        self.rows = np.zeros((m, N_ROWS, n))
+        if not self.pyramid:
+            return
+
+        members = self.group[:, None, :] == np.arange(N_GROUPS)[None, :, None]  # (m, G, n)
+        share = np.einsum('mgn,mn->mg', members, self.x0)
+        # Groups that cannot hold anything drop out of the ratio constraints
+        eligible = np.einsum('mgn,mn->mg', members, np.minimum(self.upper, 1.0)) > 0
+        share = np.where(eligible, share, 0.0)
+        total = share.sum(axis=1, keepdims=True)
+        ratio = np.divide(share, total, out=np.zeros_like(share), where=total > 0)
+
+        # Row g: S_g(x) - r_g * S(x) over the eligible groups
+        members &= eligible[:, :, None]
+        rows = members - ratio[:, :, None] * members.any(axis=1)[:, None, :]
+        rows[~eligible] = 0.0
+        # The rows sum to zero; drop the last eligible one to keep them independent
+        last = N_GROUPS - 1 - np.argmax(eligible[:, ::-1], axis=1)
+        rows[np.arange(m), last] = 0.0
+        self.rows[:, :N_GROUPS] = rows
+
+
+def _solve(problem: _Problem, with_allergen: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Damped semismooth Newton on the dual.
+
+    Returns:
+        (x, iterations per formula, max constraint residual per formula)
+    """
+    C = problem.rows.copy()
+    C[with_allergen, N_ROWS - 1] = problem.weight[with_allergen]
+    b = np.zeros(C.shape[:2])
+    b[with_allergen, N_ROWS - 1] = problem.allergen_limit[with_allergen]
+    x0 = problem.x0
+    upper = np.minimum(problem.upper, x0)
+    m = x0.shape[0]
+    # Metric weights: materials move in proportion to their concentration
+    w = np.maximum(x0, 0.0)
+    inverse_w = np.divide(1.0, w, out=np.zeros_like(w), where=w > 0)
+
+    def primal(y):
+        z = x0 - w * np.einsum('mkn,mk->mn', C, y)
+        return z, np.clip(z, 0.0, upper)
+
+    def dual(y, x):
+        distance = 0.5 * ((x - x0) ** 2 * inverse_w).sum(axis=1)
+        return distance + (y * (np.einsum('mkn,mn->mk', C, x) - b)).sum(axis=1)
+
+    y = np.zeros((m, N_ROWS))
+    iterations = np.zeros(m, dtype=np.int64)
+    z, x = primal(y)
+    scale = np.maximum(1.0, np.abs(x0).sum(axis=1))
+    for _ in range(_MAX_ITERATIONS):
+        F = np.einsum('mkn,mn->mk', C, x) - b
+        residual = np.abs(F).max(axis=1)
+        active = residual > _TOLERANCE * scale
+        if not active.any():
+            break
+        iterations += active
+
+        free = (z > 0.0) & (z < upper)
+        H = np.einsum('mkn,mn,mjn->mkj', C, free * w, C) + _RIDGE * np.eye(N_ROWS)
+        d = np.linalg.solve(H, F[:, :, None])[:, :, 0]
+        d[~active] = 0.0
+
+        # Backtracking on the (concave) dual objective
+        q = dual(y, x)
+        slope = (d * F).sum(axis=1)
+        step = np.ones(m)
+        pending = active.copy()
+        y_new, z_new, x_new = y.copy(), z.copy(), x.copy()
+        for _ in range(_MAX_BACKTRACKS):
+            y_try = y + step[:, None] * d
+            z_try, x_try = primal(y_try)
+            accept = pending & (dual(y_try, x_try) >= q + 1e-4 * step * slope - 1e-15 * scale)
+            y_new[accept], z_new[accept], x_new[accept] = y_try[accept], z_try[accept], x_try[accept]
+            pending &= ~accept
+            if not pending.any():
+                break
+            step = np.where(pending, step / 2, step)
+        y, z, x = y_new, z_new, x_new
+
+    residual = np.abs(np.einsum('mkn,mn->mk', C, x) - b).max(axis=1)
+    return x, iterations, residual
+
+
+def project(problem: _Problem) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Nearest feasible concentrations for every formula of a batch."""
+    m = problem.x0.shape[0]
+    x, iterations, residual = _solve(problem, np.zeros(m, dtype=bool))
+
+    # The allergen constraint is either slack or active at the optimum
+    over = (problem.weight * x).sum(axis=1) > problem.allergen_limit
+    if over.any():
+        x_over, it_over, res_over = _solve(problem, over)
+        x[over], iterations[over], residual[over] = x_over[over], iterations[over] + it_over[over], res_over[over]
+        # Absorb solver tolerance so the load check cannot trip on rounding
+        load = (problem.weight * x).sum(axis=1)
+        shrink = over & (load > problem.allergen_limit)
+        if shrink.any():
+            x[shrink] *= (problem.allergen_limit[shrink] / load[shrink])[:, None]
+    return x, iterations, residual
+
+
+def _build_problem(
+    formulas: list[list[dict]],
+    snapshot: StandardsSnapshot,
+    product_category: str,
+    preserve_pyramid: bool,
+    limit_allergen_load: bool
+) -> _Problem:
+    compiled = snapshot.compiled
+    limits = compiled.limits(compiled.category_index(product_category))
+    m = len(formulas)
+    n = max((len(f) for f in formulas), default=0)
+
+    x0 = np.zeros((m, n))
+    upper = np.zeros((m, n))
+    weight = np.zeros((m, n))
+    group = np.full((m, n), -1, dtype=np.int64)
+    for row, formula in enumerate(formulas):
+        for col, ing in enumerate(formula):
+            match = compiled.match(ing.get('name', ''), ing.get('cas'))
+            upper[row, col], weight[row, col] = material_bounds(compiled, limits, match)
+            x0[row, col] = ing.get('concentration', 0)
+            group[row, col] = NOTE_GROUPS.get((ing.get('note_type') or '').lower(), OTHER_GROUP)
+
+    return _Problem(
+        x0=x0,
+        upper=upper,
+        weight=weight,
+        group=group,
+        allergen_limit=np.full(m, limits.allergen_total if limit_allergen_load else np.inf),
+        pyramid=preserve_pyramid,
+    )
+
+
+def correct_batch(
+    formulas: list[list[dict]],
+    product_category: str = "cat1",
+    preserve_pyramid: bool = True,
+    limit_allergen_load: bool = False,
+    decimals: int = 4,
+    snapshot: Optional[StandardsSnapshot] = None
+) -> list[CorrectionResult]:
+    """
+    Correct many formulas to their nearest IFRA-compliant concentrations.
+
+    Args:
+        formulas: Formulas as lists of dicts with 'name', 'concentration',
+            optional 'cas' and 'note_type' (top/middle/heart/base)
+        product_category: Product category key, e.g. "cat1"
+        preserve_pyramid: Keep each note group's share of the formula
+        limit_allergen_load: Also bring the total allergen load under its
+            limit (a validator warning, not a compliance failure)
+        decimals: Corrected concentrations are rounded down to this many places
+        snapshot: Standards to correct against (default: the current snapshot)
+
+    Returns:
+        One CorrectionResult per formula, in input order
+
+    Raises:
+        ValueError: If the product category is not in the standards
+    """
+    snapshot = snapshot or ifra_validator.snapshot()
+    problem = _build_problem(formulas, snapshot, product_category, preserve_pyramid, limit_allergen_load)
+
+    # Formulas already within every bound skip the solver. Banned materials
+    # are flagged even at 0%; they and materials corrected down to 0% are
+    # removed from the corrected formula.
+    present = problem.group >= 0
+    banned = present & (problem.upper == 0)
+    load = (problem.weight * problem.x0).sum(axis=1)
+    needs = (problem.x0 > problem.upper).any(axis=1) | banned.any(axis=1) | (load > problem.allergen_limit)
+
+    x = problem.x0.copy()
+    iterations = np.zeros(len(formulas), dtype=np.int64)
+    residual = np.zeros(len(formulas))
+    if needs.any():
+        sub = _Problem(
+            x0=problem.x0[needs],
+            upper=problem.upper[needs],
+            weight=problem.weight[needs],
+            group=problem.group[needs],
+            allergen_limit=problem.allergen_limit[needs],
+            pyramid=preserve_pyramid,
+        )
+        x[needs], iterations[needs], residual[needs] = project(sub)
+        # Materials the solver left in place must not show up as adjustments;
+        # the ones it moved are rounded down so rounding never crosses a limit
+        untouched = np.abs(x - problem.x0) <= _TOLERANCE * np.maximum(1.0, problem.x0)
+        x[untouched] = problem.x0[untouched]
+        moved = needs[:, np.newaxis] & ~untouched
+        scale = 10.0 ** decimals
+        x[moved] = np.floor(x[moved] * scale) / scale
+
+    results = []
+    for row, formula in enumerate(formulas):
+        corrected = []
+        adjustments = []
+        for col, ing in enumerate(formula):
+            ing = dict(ing)
+            if needs[row] and (banned[row, col] or x[row, col] != problem.x0[row, col]):
+                value = float(x[row, col])
+                removed = bool(banned[row, col] or value <= 0)
+                adjustments.append({
+                    "name": ing.get('name', ''),
+                    "from": ing.get('concentration', 0),
+                    "to": value,
+                    "removed": removed
+                })
+                if removed:
+                    continue
+                ing['concentration'] = value
+            corrected.append(ing)
+        results.append(CorrectionResult(
+            ingredients=corrected,
+            adjustments=adjustments,
+            report=snapshot.validate(corrected, product_category),
+            iterations=int(iterations[row]),
+            residual=float(residual[row]),
+        ))
+    return results
+
+
+def correct_formula(
+    ingredients: list[dict],
+    product_category: str = "cat1",
+    preserve_pyramid: bool = True,
+    limit_allergen_load: bool = False
+) -> CorrectionResult:
+    """Correct one formula; see correct_batch."""
+    return correct_batch([ingredients], product_category, preserve_pyramid, limit_allergen_load)[0]
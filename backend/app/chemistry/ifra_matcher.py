@@ -0,0 +1,252 @@
+"""
+Compiled IFRA standards lookups.
+
+The standards are compiled once per dataset version into hash maps (exact
+name and CAS) and two-way substring matchers, so validating a formula is
+linear in the number of ingredients instead of ingredients x standards.
+
+The substring semantics mirror the original validator: a standard matches an
+ingredient name when either string contains the other. Forward containment
+(standard inside the name) uses an Aho-Corasick automaton; reverse
+containment (name inside a standard) searches one joined string of all
+standard names.
+"""
+
+from bisect import bisect_right
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from app.config import settings
+
+_SEPARATOR = "\x00"
+
+
+class SubstringMatcher:
+    """Finds which patterns occur in a text, and which patterns contain it."""
+
+    def __init__(self, patterns: list[str]):
+        self.patterns = patterns
+
+        # Aho-Corasick automaton: goto transitions, failure links, outputs
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[int]] = [[]]
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(pattern_id)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+        # Joined haystack for reverse containment
+        self._haystack = _SEPARATOR.join(patterns)
+        self._starts: list[int] = []
+        offset = 0
+        for pattern in patterns:
+            self._starts.append(offset)
+            offset += len(pattern) + 1
+
+    def within(self, text: str) -> set[int]:
+        """IDs of patterns that occur inside the text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: set[int] = set(out[0])  # Empty patterns match everything
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+    def containing(self, text: str) -> set[int]:
+        """IDs of patterns that contain the text."""
+        if not text:
+            return set(range(len(self.patterns)))
+        found: set[int] = set()
+        haystack, starts = self._haystack, self._starts
+        pos = haystack.find(text)
+        while pos != -1:
+            pattern_id = bisect_right(starts, pos) - 1
+            found.add(pattern_id)
+            # Skip to the next pattern; one hit per pattern is enough
+            next_start = starts[pattern_id + 1] if pattern_id + 1 < len(starts) else len(haystack)
+            pos = haystack.find(text, next_start)
+        return found
+
+    def match(self, text: str) -> list[int]:
+        """IDs of patterns related to the text either way, in pattern order."""
+        return sorted(self.within(text) | self.containing(text))
+
+
+@dataclass(frozen=True)
+class CategoryLimits:
+    """One product category's column of the limit tables, as plain lists for scalar lookups."""
+    restricted: list[float]
+    phototoxic: list[float]
+    allergen_thresholds: list[float]
+    allergen_total: float
+
+
+@dataclass(frozen=True)
+class NameMatches:
+    """Standards entries (as indexes into CompiledStandards' entry lists) that apply to one ingredient."""
+    restricted: Optional[int]
+    phototoxic: tuple[int, ...]
+    allergens: tuple[int, ...]
+
+
+class CompiledStandards:
+    """
+    Indexed form of an IFRA standards dataset.
+
+    Entries keep the dataset's order, and duplicate names resolve the way a
+    name-keyed dict would: the last entry wins but keeps the first position.
+
+    Limits are held as dense (entries x product categories) tables. A value
+    missing for a category falls back to the cat1 value; allergen thresholds
+    fall back to the category's allergen_declaration_threshold first, except
+    that an allergen banned in cat1 (threshold 0) stays banned everywhere.
+    """
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.categories: list[str] = list(data.get('product_categories') or {"cat1": {}})
+        self._category_index = {category: i for i, category in enumerate(self.categories)}
+
+        restricted = {s['name'].lower(): s for s in data.get('restricted_substances', [])}
+        allergens = {a['name'].lower(): a for a in data.get('allergens_declaration_required', [])}
+        phototoxic = {p['name'].lower(): p for p in data.get('phototoxicity_limits', [])}
+
+        self.restricted_entries = list(restricted.values())
+        self.allergen_entries = list(allergens.values())
+        self.phototoxic_entries = list(phototoxic.values())
+
+        self.restricted: dict[str, int] = {name: i for i, name in enumerate(restricted)}
+        self.restricted_by_cas: dict[str, int] = {
+            s['cas']: i for i, s in enumerate(self.restricted_entries) if s.get('cas')
+        }
+        self.allergen_by_cas: dict[str, int] = {
+            a['cas']: i for i, a in enumerate(self.allergen_entries) if a.get('cas')
+        }
+        self.allergen_matcher = SubstringMatcher(list(allergens))
+        self.phototoxic_matcher = SubstringMatcher(list(phototoxic))
+
+        # Dense per-category limit tables
+        self.restricted_limits = self._limit_table(self.restricted_entries, 'max_concentration', 0)
+        self.phototoxic_limits = self._limit_table(self.phototoxic_entries, 'max_concentration', 100)
+        self.allergen_thresholds = np.array(
+            [[self._allergen_threshold(a, category) for category in self.categories] for a in self.allergen_entries],
+            dtype=np.float64
+        ).reshape(len(self.allergen_entries), len(self.categories))
+        self.allergen_totals = np.array([self._allergen_total(category) for category in self.categories])
+        self._columns = [
+            CategoryLimits(
+                restricted=self.restricted_limits[:, i].tolist(),
+                phototoxic=self.phototoxic_limits[:, i].tolist(),
+                allergen_thresholds=self.allergen_thresholds[:, i].tolist(),
+                allergen_total=float(self.allergen_totals[i]),
+            )
+            for i in range(len(self.categories))
+        ]
+
+        self.lookup = lru_cache(maxsize=settings.ifra_match_cache_size)(self._lookup)
+
+    def _limit_table(self, entries: list[dict], prefix: str, default: float) -> np.ndarray:
+        table = [
+            [entry.get(f'{prefix}_{category}', entry.get(f'{prefix}_cat1', default)) for category in self.categories]
+            for entry in entries
+        ]
+        return np.array(table, dtype=np.float64).reshape(len(entries), len(self.categories))
+
+    def _allergen_threshold(self, allergen: dict, category: str) -> float:
+        key = f'threshold_{category}'
+        if key in allergen:
+            return allergen[key]
+        cat1 = allergen.get('threshold_cat1', 0.001)
+        if cat1 == 0:
+            return 0
+        declaration = self.data.get('product_categories', {}).get(category, {}).get('allergen_declaration_threshold')
+        return cat1 if declaration is None else declaration
+
+    def _allergen_total(self, category: str) -> float:
+        limits = self.data.get('total_allergen_limits', {})
+        # Keys are "<category>_<label>", e.g. "cat1_leave_on"
+        for key, value in limits.items():
+            if key == category or key.startswith(f'{category}_'):
+                return value.get('max_total_percentage', 1.0)
+        if category != 'cat1':
+            return self._allergen_total('cat1')
+        return 1.0
+
+    def category_index(self, category: str) -> int:
+        """
+        Column of a product category in the limit tables.
+
+        Raises:
+            ValueError: If the category is not in the dataset
+        """
+        try:
+            return self._category_index[category]
+        except KeyError:
+            raise ValueError(f"Unknown product category: {category}") from None
+
+    def limits(self, column: int) -> CategoryLimits:
+        """Limits of the category at a table column (see category_index)."""
+        return self._columns[column]
+
+    def _lookup(self, name_lower: str) -> NameMatches:
+        return NameMatches(
+            restricted=self.restricted.get(name_lower),
+            phototoxic=tuple(self.phototoxic_matcher.match(name_lower)),
+            allergens=tuple(self.allergen_matcher.match(name_lower)),
+        )
+
+    def match(self, name: str, cas: Optional[str] = None) -> NameMatches:
+        """
+        Standards entries for an ingredient, by name and optionally CAS number.
+
+        A CAS number adds exact restricted/allergen hits that the name alone
+        would miss (e.g. trade names).
+        """
+        matches = self.lookup(name.lower())
+        if not cas:
+            return matches
+
+        restricted = matches.restricted
+        if restricted is None:
+            restricted = self.restricted_by_cas.get(cas)
+        allergens = matches.allergens
+        by_cas = self.allergen_by_cas.get(cas)
+        if by_cas is not None and by_cas not in allergens:
+            allergens = allergens + (by_cas,)
+        if restricted == matches.restricted and allergens is matches.allergens:
+            return matches
+        return NameMatches(restricted=restricted, phototoxic=matches.phototoxic, allergens=allergens)
+
+    def first_phototoxic_within(self, name_lower: str) -> Optional[int]:
+        """First phototoxicity entry (dataset order) whose name occurs inside the given name."""
+        ids = self.phototoxic_matcher.within(name_lower)
+        return min(ids) if ids else None
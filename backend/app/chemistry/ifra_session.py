@@ -0,0 +1,277 @@
+"""
+Incremental IFRA validation sessions for interactive formula editing.
+
+A session pins one standards snapshot and product category, matches each
+ingredient against the standards once, and caches its compliance
+contribution (violations and allergen declarations) plus the running
+allergen total. An edit re-checks only the edited ingredient and returns
+the violations that appeared, changed or cleared, so the cost of an edit
+does not grow with the formula.
+"""
+
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.config import settings
+from app.chemistry.ifra_validator import (
+    ifra_validator,
+    IFRAReport,
+    IFRAViolation,
+    IngredientCheck,
+    StandardsSnapshot,
+    build_report,
+    check_ingredient,
+)
+
+TOTAL_ALLERGENS = "Total Allergens"
+
+
+def _violation_key(violation: IFRAViolation) -> tuple:
+    # The recommendation names the ingredient, limit and reason but not the concentration
+    return (violation.ingredient_name, violation.violation_type, violation.recommendation)
+
+
+@dataclass
+class SessionDelta:
+    """Changes produced by one batch of edits."""
+    added: list[IFRAViolation] = field(default_factory=list)
+    updated: list[IFRAViolation] = field(default_factory=list)  # Still violating, new concentration
+    resolved: list[IFRAViolation] = field(default_factory=list)
+    declarations: dict[str, list[dict]] = field(default_factory=dict)  # Ingredient -> its declarations now
+    total_allergen_load: float = 0.0
+    critical_count: int = 0
+
+    @property
+    def is_compliant(self) -> bool:
+        return self.critical_count == 0
+
+
+class ValidationSession:
+    """
+    Cached IFRA validation state of one formula being edited.
+
+    Ingredients are keyed by lower-cased name. All methods are thread-safe.
+    """
+
+    def __init__(
+        self,
+        ingredients: list[dict],
+        product_category: str = "cat1",
+        snapshot: Optional[StandardsSnapshot] = None
+    ):
+        """
+        Args:
+            ingredients: List of dicts with 'name', 'concentration', optional 'cas'
+            product_category: Product category key, e.g. "cat1"
+            snapshot: Standards to validate against (default: the current snapshot)
+
+        Raises:
+            ValueError: On an unknown category or duplicate ingredient names
+        """
+        self.id = uuid.uuid4().hex
+        self.snapshot = snapshot or ifra_validator.snapshot()
+        self.product_category = product_category
+        self._compiled = self.snapshot.compiled
+        self._limits = self._compiled.limits(self._compiled.category_index(product_category))
+        self._lock = threading.Lock()
+
+        self._ingredients: dict[str, dict] = {}
+        self._checks: dict[str, IngredientCheck] = {}
+        self._loads: dict[str, float] = {}
+        self._critical: dict[str, int] = {}
+        self.total_allergen_load = 0.0
+        self.critical_count = 0
+        self.touched_at = time.time()
+
+        for ing in ingredients:
+            key = ing.get('name', '').lower()
+            if key in self._ingredients:
+                raise ValueError(f"Duplicate ingredient: {ing.get('name')}")
+            self._store(key, dict(ing))
+
+    def _store(self, key: str, ing: Optional[dict]) -> Optional[IngredientCheck]:
+        """Replace one ingredient's cached contribution; returns the previous check."""
+        previous = self._checks.get(key)
+        self.total_allergen_load -= self._loads.get(key, 0.0)
+        self.critical_count -= self._critical.get(key, 0)
+        if ing is None:
+            for cache in (self._ingredients, self._checks, self._loads, self._critical):
+                cache.pop(key, None)
+            return previous
+
+        match = self._compiled.match(ing.get('name', ''), ing.get('cas'))
+        check = check_ingredient(self._compiled, self._limits, ing, match)
+        self._ingredients[key] = ing
+        self._checks[key] = check
+        self._loads[key] = check.allergen_load
+        self._critical[key] = sum(v.severity == "critical" for v in check.violations)
+        self.total_allergen_load += self._loads[key]
+        self.critical_count += self._critical[key]
+        return previous
+
+    def _load_violation(self) -> Optional[IFRAViolation]:
+        max_total = self._limits.allergen_total
+        if self.total_allergen_load <= max_total:
+            return None
+        return IFRAViolation(
+            ingredient_name=TOTAL_ALLERGENS,
+            cas_number=None,
+            violation_type="allergen_load",
+            current_concentration=self.total_allergen_load,
+            max_allowed=max_total,
+            severity="warning",
+            recommendation=f"Total allergen load {self.total_allergen_load:.2f}% exceeds {max_total}% recommendation"
+        )
+
+    def apply(self, changes: list[dict]) -> SessionDelta:
+        """
+        Apply ingredient edits and return only what changed.
+
+        Each change has 'name' and one of: 'concentration' (absolute),
+        'delta' (added to the current concentration) or 'remove': true.
+        Unknown names with a concentration are added to the formula.
+
+        Raises:
+            KeyError: If a delta or removal names an ingredient not in the session
+            ValueError: If a concentration would become negative
+        """
+        with self._lock:
+            self.touched_at = time.time()
+
+            # Resolve every edit before touching the cache, so a bad edit changes nothing
+            staged: dict[str, Optional[dict]] = {}
+            for change in changes:
+                name = change.get('name', '')
+                key = name.lower()
+                current = staged[key] if key in staged else self._ingredients.get(key)
+
+                if change.get('remove'):
+                    if current is None:
+                        raise KeyError(name)
+                    staged[key] = None
+                    continue
+
+                if change.get('concentration') is not None:
+                    concentration = change['concentration']
+                elif change.get('delta') is not None:
+                    if current is None:
+                        raise KeyError(name)
+                    concentration = current.get('concentration', 0) + change['delta']
+                else:
+                    raise ValueError(f"No concentration or delta for {name}")
+                if concentration < 0:
+                    raise ValueError(f"Concentration of {name} cannot be negative")
+
+                ing = dict(current) if current else {'name': name}
+                ing['concentration'] = concentration
+                if change.get('cas'):
+                    ing['cas'] = change['cas']
+                staged[key] = ing
+
+            delta = SessionDelta()
+            load_before = self._load_violation()
+            for key, ing in staged.items():
+                name = (ing or self._ingredients.get(key) or {}).get('name', key)
+                previous = self._store(key, ing)
+                current = self._checks.get(key)
+                self._diff(previous, current, delta)
+                delta.declarations[name] = current.declarations if current else []
+
+            self._diff_load(load_before, self._load_violation(), delta)
+            delta.total_allergen_load = self.total_allergen_load
+            delta.critical_count = self.critical_count
+            return delta
+
+    @staticmethod
+    def _diff(previous: Optional[IngredientCheck], current: Optional[IngredientCheck], delta: SessionDelta):
+        before = {_violation_key(v): v for v in (previous.violations if previous else [])}
+        after = {_violation_key(v): v for v in (current.violations if current else [])}
+        for key, violation in after.items():
+            old = before.get(key)
+            if old is None:
+                delta.added.append(violation)
+            elif old.current_concentration != violation.current_concentration:
+                delta.updated.append(violation)
+        delta.resolved.extend(v for key, v in before.items() if key not in after)
+
+    @staticmethod
+    def _diff_load(before: Optional[IFRAViolation], after: Optional[IFRAViolation], delta: SessionDelta):
+        if before is None and after is not None:
+            delta.added.append(after)
+        elif before is not None and after is None:
+            delta.resolved.append(before)
+        elif after is not None and before.current_concentration != after.current_concentration:
+            delta.updated.append(after)
+
+    def report(self) -> IFRAReport:
+        """
+        Full report of the current formula, identical to validate_formula's.
+
+        Also resynchronizes the running allergen total with an exact sum.
+        """
+        with self._lock:
+            self.touched_at = time.time()
+            violations = []
+            allergens_to_declare = []
+            total_allergen_load = 0.0
+            for check in self._checks.values():
+                violations.extend(check.violations)
+                for declaration in check.declarations:
+                    allergens_to_declare.append(declaration)
+                    total_allergen_load += declaration["concentration"]
+            self.total_allergen_load = total_allergen_load
+
+            return build_report(
+                violations,
+                allergens_to_declare,
+                total_allergen_load,
+                self._limits.allergen_total,
+                self.product_category
+            )
+
+    def ingredients(self) -> list[dict]:
+        """Current ingredient list, in insertion order."""
+        with self._lock:
+            return [dict(ing) for ing in self._ingredients.values()]
+
+
+class ValidationSessionStore:
+    """In-memory sessions with idle expiry and a size cap (oldest evicted first)."""
+
+    def __init__(self, ttl: Optional[float] = None, max_sessions: Optional[int] = None):
+        self._sessions: dict[str, ValidationSession] = {}
+        self._ttl = ttl or settings.ifra_session_ttl
+        self._max_sessions = max_sessions or settings.ifra_session_max
+        self._lock = threading.Lock()
+
+    def create(self, ingredients: list[dict], product_category: str = "cat1") -> ValidationSession:
+        session = ValidationSession(ingredients, product_category)
+        with self._lock:
+            self._prune()
+            self._sessions[session.id] = session
+            while len(self._sessions) > self._max_sessions:
+                oldest = min(self._sessions.values(), key=lambda s: s.touched_at)
+                del self._sessions[oldest.id]
+        return session
+
+    def get(self, session_id: str) -> Optional[ValidationSession]:
+        session = self._sessions.get(session_id)
+        if session is None or time.time() - session.touched_at > self._ttl:
+            return None
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _prune(self):
+        cutoff = time.time() - self._ttl
+        for session_id in [sid for sid, s in self._sessions.items() if s.touched_at < cutoff]:
+            del self._sessions[session_id]
+
+
+# Singleton instance
+validation_sessions = ValidationSessionStore()
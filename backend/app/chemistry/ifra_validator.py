@@ -1,13 +1,24 @@
 """
 IFRA Compliance Validator.
 Validates fragrance formulas against IFRA 51st Amendment standards.
+
+Standards are held as an immutable StandardsSnapshot that can be reloaded
+from ifra_standards.json and swapped in while the process is running. Each
+snapshot carries the standards compiled into name/CAS indexes and substring
+matchers (see ifra_matcher), built once per dataset version, plus dense
+per-category limit tables for every product category in the dataset.
 """
 
+import hashlib
 import json
-from dataclasses import dataclass
+import threading
+import time
+from dataclasses import dataclass, field
 from typing import Optional
 
 from app.config import settings
+from app.core.knowledge_pack import load_pack
+from app.chemistry.ifra_matcher import CategoryLimits, CompiledStandards, NameMatches
 
 
 @dataclass
@@ -31,6 +42,207 @@ class IFRAReport:
     total_allergen_load: float
     product_category: str
     summary: str
+    max_allergen_load: float = 1.0
+
+
+@dataclass
+class MultiCategoryReport:
+    """Reports for one formula across every product category."""
+    reports: dict[str, IFRAReport]
+    legal_categories: list[str]
+
+
+@dataclass(frozen=True)
+class StandardsSnapshot:
+    """Immutable, versioned copy of the IFRA standards dataset."""
+    version: str
+    data: dict
+    compiled: CompiledStandards
+    loaded_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def build(cls, data: dict, version: str) -> "StandardsSnapshot":
+        """Compile a standards dataset into a snapshot."""
+        return cls(version=version, data=data, compiled=CompiledStandards(data))
+
+    def validate(self, ingredients: list[dict], product_category: str = "cat1") -> IFRAReport:
+        """Validate a formula against these standards (see IFRAValidator.validate_formula)."""
+        compiled = self.compiled
+        column = compiled.category_index(product_category)
+        matches = [compiled.match(ing.get('name', ''), ing.get('cas')) for ing in ingredients]
+        return IFRAValidator._evaluate(compiled, ingredients, matches, column)
+
+
+_EMPTY_STANDARDS = {
+    "product_categories": {"cat1": {}, "cat2": {}},
+    "restricted_substances": [],
+    "allergens_declaration_required": [],
+    "phototoxicity_limits": [],
+}
+
+
+def build_report(
+    violations: list[IFRAViolation],
+    allergens_to_declare: list[dict],
+    total_allergen_load: float,
+    max_total: float,
+    product_category: str
+) -> IFRAReport:
+    """
+    Finish a report: add the total allergen load check, compliance and summary.
+
+    Args:
+        violations: Per-ingredient violations, in formula order
+        allergens_to_declare: Allergens at or above their declaration threshold
+        total_allergen_load: Sum of declared allergen concentrations
+        max_total: Total allergen load limit
+        product_category: Product category the formula was checked against
+
+    Returns:
+        IFRAReport
+    """
+    # Check total allergen load
+    if total_allergen_load > max_total:
+        violations.append(IFRAViolation(
+            ingredient_name="Total Allergens",
+            cas_number=None,
+            violation_type="allergen_load",
+            current_concentration=total_allergen_load,
+            max_allowed=max_total,
+            severity="warning",
+            recommendation=f"Total allergen load {total_allergen_load:.2f}% exceeds {max_total}% recommendation"
+        ))
+
+    # Determine compliance
+    critical_violations = [v for v in violations if v.severity == "critical"]
+    is_compliant = len(critical_violations) == 0
+
+    # Generate summary
+    if is_compliant and not violations:
+        summary = "Formula is fully IFRA compliant with no issues detected."
+    elif is_compliant:
+        summary = f"Formula is compliant with {len(violations)} warning(s). {len(allergens_to_declare)} allergen(s) require declaration."
+    else:
+        summary = f"Formula has {len(critical_violations)} critical violation(s) that must be resolved for IFRA compliance."
+
+    return IFRAReport(
+        is_compliant=is_compliant,
+        violations=violations,
+        allergens_to_declare=allergens_to_declare,
+        total_allergen_load=total_allergen_load,
+        product_category=product_category,
+        summary=summary,
+        max_allergen_load=max_total
+    )
+
+
+@dataclass
+class IngredientCheck:
+    """Violations and allergen declarations contributed by one ingredient."""
+    violations: list[IFRAViolation]
+    declarations: list[dict]
+
+    @property
+    def allergen_load(self) -> float:
+        """Concentration this ingredient adds to the total allergen load."""
+        total = 0.0
+        for declaration in self.declarations:
+            total += declaration["concentration"]
+        return total
+
+
+def check_ingredient(
+    compiled: CompiledStandards,
+    limits: CategoryLimits,
+    ing: dict,
+    match: NameMatches
+) -> IngredientCheck:
+    """
+    Check one ingredient against one product category's limits.
+
+    Args:
+        compiled: Compiled standards the match was made against
+        limits: Category column from compiled.limits()
+        ing: Dict with 'name', 'concentration'
+        match: compiled.match() result for the ingredient
+
+    Returns:
+        IngredientCheck, in restricted / phototoxicity / allergen order
+    """
+    name = ing.get('name', '')
+    concentration = ing.get('concentration', 0)
+    violations = []
+    declarations = []
+
+    # Check restricted substances
+    if match.restricted is not None:
+        restricted = compiled.restricted_entries[match.restricted]
+        max_conc = limits.restricted[match.restricted]
+
+        if max_conc == 0:
+            # Banned substance
+            violations.append(IFRAViolation(
+                ingredient_name=name,
+                cas_number=restricted.get('cas'),
+                violation_type="banned",
+                current_concentration=concentration,
+                max_allowed=0,
+                severity="critical",
+                recommendation=f"Remove {name} - banned under IFRA. {restricted.get('reason', '')}"
+            ))
+        elif concentration > max_conc:
+            # Over limit
+            violations.append(IFRAViolation(
+                ingredient_name=name,
+                cas_number=restricted.get('cas'),
+                violation_type="over_limit",
+                current_concentration=concentration,
+                max_allowed=max_conc,
+                severity="critical",
+                recommendation=f"Reduce {name} to max {max_conc}%. {restricted.get('reason', '')}"
+            ))
+
+    # Check phototoxicity limits
+    for entry in match.phototoxic:
+        phototox = compiled.phototoxic_entries[entry]
+        max_conc = limits.phototoxic[entry]
+        if concentration > max_conc:
+            violations.append(IFRAViolation(
+                ingredient_name=name,
+                cas_number=None,
+                violation_type="phototoxicity",
+                current_concentration=concentration,
+                max_allowed=max_conc,
+                severity="critical",
+                recommendation=f"Reduce {name} to max {max_conc}% for phototoxicity. {phototox.get('reason', '')}"
+            ))
+
+    # Check allergen declaration
+    for entry in match.allergens:
+        allergen = compiled.allergen_entries[entry]
+        threshold = limits.allergen_thresholds[entry]
+
+        # Check if banned
+        if threshold == 0:
+            violations.append(IFRAViolation(
+                ingredient_name=name,
+                cas_number=allergen.get('cas'),
+                violation_type="banned",
+                current_concentration=concentration,
+                max_allowed=0,
+                severity="critical",
+                recommendation=f"Remove {name} - banned allergen"
+            ))
+        elif concentration >= threshold:
+            # Must be declared
+            declarations.append({
+                "name": name,
+                "cas": allergen.get('cas'),
+                "concentration": concentration,
+                "threshold": threshold
+            })
+
+    return IngredientCheck(violations=violations, declarations=declarations)
 
 
 class IFRAValidator:
@@ -46,25 +258,64 @@ class IFRAValidator:
     """
 
     def __init__(self):
-        self._standards: dict = {}
-        self._loaded = False
-
-    def _load_standards(self):
-        """Load IFRA standards from JSON."""
-        if self._loaded:
-            return
-
-        standards_path = settings.data_dir / "ifra_standards.json"
-
-        if not standards_path.exists():
-            self._standards = {"restricted_substances": [], "allergens_declaration_required": [], "phototoxicity_limits": []}
-            self._loaded = True
-            return
+        self._snapshot: Optional[StandardsSnapshot] = None
+        self._reload_lock = threading.Lock()
+
+    def _load_standards(self) -> StandardsSnapshot:
+        """Get the current standards snapshot, loading it on first use."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.reload()
+            snapshot = self._snapshot
+        return snapshot
+
+    def snapshot(self) -> StandardsSnapshot:
+        """The current standards snapshot."""
+        return self._load_standards()
+
+    @property
+    def version(self) -> str:
+        """Version (content hash) of the current standards."""
+        return self._load_standards().version
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Reload IFRA standards from JSON and swap them in.
 
-        with open(standards_path, 'r', encoding='utf-8') as f:
-            self._standards = json.load(f)
+        Args:
+            force: Reload even if the file content is unchanged
 
-        self._loaded = True
+        Returns:
+            True if a new snapshot was installed
+        """
+        with self._reload_lock:
+            standards_path = settings.data_dir / "ifra_standards.json"
+            pack = None if standards_path.exists() else load_pack()
+
+            if pack is not None:
+                # Deployed with the compiled knowledge pack only
+                raw = pack.raw_json("ifra_json")
+                version = pack.versions["ifra"]
+            elif standards_path.exists():
+                raw = standards_path.read_bytes()
+                version = hashlib.sha256(raw).hexdigest()
+            else:
+                if self._snapshot is None:
+                    self._snapshot = StandardsSnapshot.build(_EMPTY_STANDARDS, version="")
+                    return True
+                return False
+
+            current = self._snapshot
+            if not force and current is not None and current.version == version:
+                return False
+
+            self._snapshot = StandardsSnapshot.build(json.loads(raw), version=version)
+            return True
+
+    def install(self, snapshot: StandardsSnapshot):
+        """Swap in a prebuilt standards snapshot."""
+        with self._reload_lock:
+            self._snapshot = snapshot
 
     def validate_formula(
         self,
@@ -76,132 +327,67 @@ class IFRAValidator:
 
         Args:
             ingredients: List of dicts with 'name', 'concentration', optional 'cas'
-            product_category: "cat1" (leave-on) or "cat2" (rinse-off)
+            product_category: Product category key from the standards, e.g.
+                "cat1" (leave-on) or "cat2" (rinse-off)
 
         Returns:
             IFRAReport with compliance status and any violations
+
+        Raises:
+            ValueError: If the product category is not in the standards
         """
-        self._load_standards()
+        return self._load_standards().validate(ingredients, product_category)
 
+    def validate_all_categories(self, ingredients: list[dict]) -> MultiCategoryReport:
+        """
+        Validate a formula against every product category in one pass.
+
+        Ingredients are matched against the standards once; only the limit
+        comparisons are repeated per category.
+
+        Args:
+            ingredients: List of dicts with 'name', 'concentration', optional 'cas'
+
+        Returns:
+            MultiCategoryReport with a report per category and the legal ones
+        """
+        compiled = self._load_standards().compiled
+        matches = [compiled.match(ing.get('name', ''), ing.get('cas')) for ing in ingredients]
+        reports = {
+            category: self._evaluate(compiled, ingredients, matches, column)
+            for column, category in enumerate(compiled.categories)
+        }
+        return MultiCategoryReport(
+            reports=reports,
+            legal_categories=[category for category, report in reports.items() if report.is_compliant]
+        )
+
+    @staticmethod
+    def _evaluate(
+        compiled: CompiledStandards,
+        ingredients: list[dict],
+        matches: list[NameMatches],
+        column: int
+    ) -> IFRAReport:
+        """Check matched ingredients against one category column of the limit tables."""
+        limits = compiled.limits(column)
         violations = []
         allergens_to_declare = []
         total_allergen_load = 0.0
 
-        # Build lookup maps
-        restricted_map = {s['name'].lower(): s for s in self._standards.get('restricted_substances', [])}
-        allergen_map = {a['name'].lower(): a for a in self._standards.get('allergens_declaration_required', [])}
-        phototox_map = {p['name'].lower(): p for p in self._standards.get('phototoxicity_limits', [])}
-
-        # Check each ingredient
-        for ing in ingredients:
-            name = ing.get('name', '')
-            name_lower = name.lower()
-            concentration = ing.get('concentration', 0)
-            cas = ing.get('cas')
-
-            # Check restricted substances
-            if name_lower in restricted_map:
-                restricted = restricted_map[name_lower]
-                max_conc = restricted.get('max_concentration_cat1', 0)
-
-                if max_conc == 0:
-                    # Banned substance
-                    violations.append(IFRAViolation(
-                        ingredient_name=name,
-                        cas_number=restricted.get('cas'),
-                        violation_type="banned",
-                        current_concentration=concentration,
-                        max_allowed=0,
-                        severity="critical",
-                        recommendation=f"Remove {name} - banned under IFRA. {restricted.get('reason', '')}"
-                    ))
-                elif concentration > max_conc:
-                    # Over limit
-                    violations.append(IFRAViolation(
-                        ingredient_name=name,
-                        cas_number=restricted.get('cas'),
-                        violation_type="over_limit",
-                        current_concentration=concentration,
-                        max_allowed=max_conc,
-                        severity="critical",
-                        recommendation=f"Reduce {name} to max {max_conc}%. {restricted.get('reason', '')}"
-                    ))
-
-            # Check phototoxicity limits
-            for phototox_name, phototox in phototox_map.items():
-                if phototox_name in name_lower or name_lower in phototox_name:
-                    max_conc = phototox.get('max_concentration_cat1', 100)
-                    if concentration > max_conc:
-                        violations.append(IFRAViolation(
-                            ingredient_name=name,
-                            cas_number=None,
-                            violation_type="phototoxicity",
-                            current_concentration=concentration,
-                            max_allowed=max_conc,
-                            severity="critical",
-                            recommendation=f"Reduce {name} to max {max_conc}% for phototoxicity. {phototox.get('reason', '')}"
-                        ))
-
-            # Check allergen declaration
-            for allergen_name, allergen in allergen_map.items():
-                if allergen_name in name_lower or name_lower in allergen_name:
-                    threshold = allergen.get('threshold_cat1', 0.001)
-
-                    # Check if banned
-                    if threshold == 0:
-                        violations.append(IFRAViolation(
-                            ingredient_name=name,
-                            cas_number=allergen.get('cas'),
-                            violation_type="banned",
-                            current_concentration=concentration,
-                            max_allowed=0,
-                            severity="critical",
-                            recommendation=f"Remove {name} - banned allergen"
-                        ))
-                    elif concentration >= threshold:
-                        # Must be declared
-                        allergens_to_declare.append({
-                            "name": name,
-                            "cas": allergen.get('cas'),
-                            "concentration": concentration,
-                            "threshold": threshold
-                        })
-                        total_allergen_load += concentration
-
-        # Check total allergen load
-        allergen_limits = self._standards.get('total_allergen_limits', {}).get('cat1_leave_on', {})
-        max_total = allergen_limits.get('max_total_percentage', 1.0)
-
-        if total_allergen_load > max_total:
-            violations.append(IFRAViolation(
-                ingredient_name="Total Allergens",
-                cas_number=None,
-                violation_type="allergen_load",
-                current_concentration=total_allergen_load,
-                max_allowed=max_total,
-                severity="warning",
-                recommendation=f"Total allergen load {total_allergen_load:.2f}% exceeds {max_total}% recommendation"
-            ))
-
-        # Determine compliance
-        critical_violations = [v for v in violations if v.severity == "critical"]
-        is_compliant = len(critical_violations) == 0
-
-        # Generate summary
-        if is_compliant and not violations:
-            summary = "Formula is fully IFRA compliant with no issues detected."
-        elif is_compliant:
-            summary = f"Formula is compliant with {len(violations)} warning(s). {len(allergens_to_declare)} allergen(s) require declaration."
-        else:
-            summary = f"Formula has {len(critical_violations)} critical violation(s) that must be resolved for IFRA compliance."
-
-        return IFRAReport(
-            is_compliant=is_compliant,
-            violations=violations,
-            allergens_to_declare=allergens_to_declare,
-            total_allergen_load=total_allergen_load,
-            product_category=product_category,
-            summary=summary
+        for ing, match in zip(ingredients, matches):
+            checked = check_ingredient(compiled, limits, ing, match)
+            violations.extend(checked.violations)
+            for declaration in checked.declarations:
+                allergens_to_declare.append(declaration)
+                total_allergen_load += declaration["concentration"]
+
+        return build_report(
+            violations,
+            allergens_to_declare,
+            total_allergen_load,
+            limits.allergen_total,
+            compiled.categories[column]
         )
 
     def get_max_concentration(self, ingredient_name: str, product_category: str = "cat1") -> Optional[float]:
@@ -210,38 +396,35 @@ class IFRAValidator:
 
         Args:
             ingredient_name: Name of the ingredient
-            product_category: "cat1" or "cat2"
+            product_category: Product category key, e.g. "cat1" or "cat2"
 
         Returns:
             Max concentration percentage, or None if not restricted
+
+        Raises:
+            ValueError: If the product category is not in the standards
         """
-        self._load_standards()
+        compiled = self._load_standards().compiled
+        column = compiled.category_index(product_category)
 
         name_lower = ingredient_name.lower()
 
         # Check restricted substances
-        for restricted in self._standards.get('restricted_substances', []):
-            if restricted['name'].lower() == name_lower:
-                return restricted.get('max_concentration_cat1', None)
+        restricted = compiled.restricted.get(name_lower)
+        if restricted is not None:
+            return compiled.limits(column).restricted[restricted]
 
         # Check phototoxicity limits
-        for phototox in self._standards.get('phototoxicity_limits', []):
-            if phototox['name'].lower() in name_lower:
-                return phototox.get('max_concentration_cat1', None)
+        phototox = compiled.first_phototoxic_within(name_lower)
+        if phototox is not None:
+            return compiled.limits(column).phototoxic[phototox]
 
         return None  # Not restricted
 
     def is_allergen(self, ingredient_name: str) -> bool:
         """Check if an ingredient is a declared allergen."""
-        self._load_standards()
-
-        name_lower = ingredient_name.lower()
-
-        for allergen in self._standards.get('allergens_declaration_required', []):
-            if allergen['name'].lower() in name_lower or name_lower in allergen['name'].lower():
-                return True
-
-        return False
+        compiled = self._load_standards().compiled
+        return bool(compiled.lookup(ingredient_name.lower()).allergens)
 
 
 # Singleton instance
@@ -0,0 +1,120 @@
+"""
+Columnar representation of the ingredient catalog.
+
+Numeric fields are stored as NumPy arrays and categorical fields as integer
+code arrays, so catalog filters are vectorized mask operations. The original
+Ingredient objects are kept in row order and returned as views of a mask.
+"""
+
+from typing import Iterable, Optional, Union
+
+import numpy as np
+
+
+class IngredientColumns:
+    """
+    Column store over a fixed, ordered list of ingredients.
+
+    Categorical columns (note_type, family, source) are encoded as int32 codes
+    with a per-column value -> code dictionary.
+    """
+
+    CATEGORICAL = ("note_type", "family", "source")
+
+    def __init__(self, ingredients: list):
+        self.rows = list(ingredients)
+        self.row_of: dict[str, int] = {ing.id: row for row, ing in enumerate(self.rows)}
+
+        self.logp = np.array([ing.logp for ing in self.rows], dtype=np.float64)
+        self.molecular_weight = np.array([ing.molecular_weight for ing in self.rows], dtype=np.float64)
+        self.sustainability_score = np.array([ing.sustainability_score for ing in self.rows], dtype=np.int16)
+        self.is_sustainable = np.array([ing.is_sustainable for ing in self.rows], dtype=bool)
+        self.allergen = np.array([ing.allergen for ing in self.rows], dtype=bool)
+        self.ifra_restricted = np.array([ing.ifra_restricted for ing in self.rows], dtype=bool)
+
+        self.categories: dict[str, dict[str, int]] = {}
+        self.codes: dict[str, np.ndarray] = {}
+        for column in self.CATEGORICAL:
+            values = [getattr(ing, column) for ing in self.rows]
+            mapping: dict[str, int] = {}
+            codes = np.empty(len(values), dtype=np.int32)
+            for row, value in enumerate(values):
+                codes[row] = mapping.setdefault(value, len(mapping))
+            self.categories[column] = mapping
+            self.codes[column] = codes
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def all(self) -> np.ndarray:
+        """Mask selecting every row."""
+        return np.ones(len(self.rows), dtype=bool)
+
+    def category_mask(self, column: str, values: Union[str, Iterable[str]]) -> np.ndarray:
+        """Mask of rows whose categorical column equals any of the given values."""
+        if isinstance(values, str):
+            values = (values,)
+        mapping = self.categories[column]
+        wanted = [mapping[v] for v in values if v in mapping]
+        if not wanted:
+            return np.zeros(len(self.rows), dtype=bool)
+        if len(wanted) == 1:
+            return self.codes[column] == wanted[0]
+        return np.isin(self.codes[column], wanted)
+
+    def rows_mask(self, ids: Iterable[str]) -> np.ndarray:
+        """Mask of rows with the given ingredient IDs."""
+        mask = np.zeros(len(self.rows), dtype=bool)
+        positions = [self.row_of[i] for i in ids if i in self.row_of]
+        mask[positions] = True
+        return mask
+
+    def mask(
+        self,
+        note_type: Optional[Union[str, Iterable[str]]] = None,
+        family: Optional[Union[str, Iterable[str]]] = None,
+        source: Optional[Union[str, Iterable[str]]] = None,
+        min_logp: Optional[float] = None,
+        max_logp: Optional[float] = None,
+        min_molecular_weight: Optional[float] = None,
+        max_molecular_weight: Optional[float] = None,
+        min_sustainability_score: Optional[int] = None,
+        is_sustainable: Optional[bool] = None,
+        allergen: Optional[bool] = None,
+        ifra_restricted: Optional[bool] = None
+    ) -> np.ndarray:
+        """
+        Build a boolean row mask from combined predicates (logical AND).
+
+        Categorical filters accept one value or several (matched with OR).
+        Omitted predicates do not constrain the result.
+        """
+        mask = self.all()
+        if note_type is not None:
+            mask &= self.category_mask("note_type", note_type)
+        if family is not None:
+            mask &= self.category_mask("family", family)
+        if source is not None:
+            mask &= self.category_mask("source", source)
+        if min_logp is not None:
+            mask &= self.logp >= min_logp
+        if max_logp is not None:
+            mask &= self.logp <= max_logp
+        if min_molecular_weight is not None:
+            mask &= self.molecular_weight >= min_molecular_weight
+        if max_molecular_weight is not None:
+            mask &= self.molecular_weight <= max_molecular_weight
+        if min_sustainability_score is not None:
+            mask &= self.sustainability_score >= min_sustainability_score
+        if is_sustainable is not None:
+            mask &= self.is_sustainable == is_sustainable
+        if allergen is not None:
+            mask &= self.allergen == allergen
+        if ifra_restricted is not None:
+            mask &= self.ifra_restricted == ifra_restricted
+        return mask
+
+    def select(self, mask: np.ndarray) -> list:
+        """Return the Ingredient objects selected by a mask, in catalog order."""
+        rows = self.rows
+        return [rows[i] for i in np.flatnonzero(mask)]
@@ -1,14 +1,40 @@
 """
 Ingredient database interface.
 Provides access to fragrance ingredient data with sustainability and safety information.
+
+The catalog is held as an immutable CatalogSnapshot that can be rebuilt and
+swapped in at runtime without restarting the process.
+
+RDKit descriptors for every ingredient are computed once at load time and
+persisted to a sidecar cache keyed by a hash of ingredients.json and the
+descriptor backend, so request handlers only read precomputed fields.
+
+Catalog filters run as vectorized mask operations over a columnar copy of the
+catalog (see ingredient_columns); Ingredient objects are returned as views.
 """
 
+import hashlib
 import json
+import os
+import threading
+import time
+from functools import lru_cache
+from dataclasses import dataclass, asdict
 from pathlib import Path
 from typing import Optional
-from dataclasses import dataclass
+
+import numpy as np
 
 from app.config import settings
+from app.chemistry.molecular_calc import MolecularProperties, get_full_properties
+from app.chemistry.descriptor_backend import get_descriptor_backend
+from app.chemistry.similarity import FingerprintIndex
+from app.chemistry.ingredient_columns import IngredientColumns
+from app.chemistry.ingredient_facets import FacetIndex
+from app.chemistry.descriptor_index import DescriptorIndex
+from app.chemistry.name_resolver import NameIndex, NameMatch
+from app.core.knowledge_pack import KnowledgePack, load_pack
+from app.chemistry.allergen_filter import SafePool, build_safe_pool, normalize_allergies
 
 
 @dataclass
@@ -29,65 +55,334 @@ class Ingredient:
     max_concentration: Optional[float] = None
     descriptors: list[str] = None
     origin: Optional[str] = None
+    latin_name: Optional[str] = None
+    cas: Optional[str] = None
+    synonyms: list[str] = None
+    properties: Optional[MolecularProperties] = None  # Precomputed RDKit descriptors
 
     def __post_init__(self):
         if self.descriptors is None:
             self.descriptors = []
+        if self.synonyms is None:
+            self.synonyms = []
+
+
+def _ingredient_from_dict(ing_data: dict) -> Ingredient:
+    """Build an Ingredient from an ingredients.json record."""
+    return Ingredient(
+        id=ing_data['id'],
+        name=ing_data['name'],
+        smiles=ing_data['smiles'],
+        note_type=ing_data['note_type'],
+        family=ing_data['family'],
+        logp=ing_data['logp'],
+        molecular_weight=ing_data['molecular_weight'],
+        is_sustainable=ing_data['is_sustainable'],
+        source=ing_data['source'],
+        sustainability_score=ing_data['sustainability_score'],
+        ifra_restricted=ing_data.get('ifra_restricted', False),
+        allergen=ing_data.get('allergen', False),
+        max_concentration=ing_data.get('max_concentration'),
+        descriptors=ing_data.get('descriptors', []),
+        origin=ing_data.get('origin'),
+        latin_name=ing_data.get('latin_name'),
+        cas=ing_data.get('cas'),
+        synonyms=ing_data.get('synonyms', [])
+    )
+
+
+# Fields the import fills from descriptor estimates rather than supplier data
+_ESTIMATED_FIELDS = ("logp", "molecular_weight", "vapor_pressure_25c")
+
+_DEFAULT_CATALOG_HEADER = {
+    "version": "1.0.0",
+    "description": "Fragrance ingredient database with SMILES, properties, and sustainability data",
+}
+
+
+def _ingredient_to_dict(ing: Ingredient) -> dict:
+    """Serialize an Ingredient as an ingredients.json record."""
+    props = ing.properties
+    return {
+        "id": ing.id,
+        "name": ing.name,
+        "latin_name": ing.latin_name,
+        "cas": ing.cas,
+        "synonyms": ing.synonyms,
+        "smiles": ing.smiles,
+        "note_type": ing.note_type,
+        "family": ing.family,
+        "logp": ing.logp,
+        "molecular_weight": ing.molecular_weight,
+        "vapor_pressure_25c": props.estimated_vapor_pressure if props is not None and props.valid else None,
+        "is_sustainable": ing.is_sustainable,
+        "source": ing.source,
+        "sustainability_score": ing.sustainability_score,
+        "origin": ing.origin,
+        "ifra_restricted": ing.ifra_restricted,
+        "allergen": ing.allergen,
+        "max_concentration": ing.max_concentration,
+        "descriptors": ing.descriptors,
+    }
+
+
+def _merge_record(existing: dict, ing: Ingredient) -> dict:
+    """
+    Update an ingredients.json record from an Ingredient.
 
+    Fields the Ingredient does not model are kept, absent fields are not
+    added as nulls, and estimates never replace values already in the
+    record for the same molecule.
+    """
+    record = dict(existing)
+    same_molecule = existing.get("smiles") == ing.smiles
+    for key, value in _ingredient_to_dict(ing).items():
+        if value is None and key not in record:
+            continue
+        if key in _ESTIMATED_FIELDS and same_molecule and record.get(key) is not None:
+            continue
+        record[key] = value
+    return record
+
+
+def write_catalog_json(ingredients: list[Ingredient], path: Optional[Path] = None) -> str:
+    """
+    Atomically write a catalog in ingredients.json format.
 
-class IngredientDatabase:
+    The existing file is updated rather than regenerated: its top-level
+    blocks (note_families, sustainability_sources, ...) and each kept row's
+    hand-entered fields survive, rows are added or updated by id, and rows
+    not in ingredients are dropped. The descriptor sidecar cache is primed
+    for the new file, so the next load does not recompute descriptors.
+
+    Args:
+        ingredients: Ingredients with properties attached
+        path: Destination (default: data_dir/ingredients.json)
+
+    Returns:
+        SHA-256 of the written file (its catalog version)
     """
-    Singleton database for fragrance ingredients.
-    Loads from JSON and provides query methods.
+    path = Path(path or settings.data_dir / "ingredients.json")
+    document = dict(_DEFAULT_CATALOG_HEADER)
+    if path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            document = json.load(f)
+    existing = {record.get("id"): record for record in document.get("ingredients", [])}
+    document["ingredients"] = [_merge_record(existing.get(ing.id, {}), ing) for ing in ingredients]
+    raw = json.dumps(document, indent=2, ensure_ascii=False).encode("utf-8")
+    source_hash = hashlib.sha256(raw).hexdigest()
+
+    # Cache first: a watcher reloading the new file must find matching descriptors
+    if path == settings.data_dir / "ingredients.json":
+        _write_descriptor_cache(ingredients, source_hash)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(raw)
+    os.replace(tmp_path, path)
+    return source_hash
+
+
+def _attach_properties(ingredients: list[Ingredient], source_hash: str):
     """
+    Attach molecular descriptors to every ingredient.
 
-    _instance = None
-    _ingredients: dict[str, Ingredient] = {}
-    _loaded = False
+    Descriptors are read from the sidecar cache when its source hash and
+    backend match the current ingredients.json and descriptor backend;
+    otherwise they are computed and the cache is rewritten.
+    """
+    cached = _read_descriptor_cache(source_hash)
+    if cached is not None:
+        for ing in ingredients:
+            props = cached.get(ing.id)
+            if props is not None:
+                ing.properties = MolecularProperties(**props)
+        if all(ing.properties is not None for ing in ingredients):
+            return
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+    for ing in ingredients:
+        if ing.properties is None:
+            ing.properties = get_full_properties(ing.smiles)
+
+    if any(ing.properties.valid for ing in ingredients):
+        _write_descriptor_cache(ingredients, source_hash)
+
+
+def _read_descriptor_cache(source_hash: str) -> Optional[dict]:
+    """Load cached descriptors if the cache matches the source hash."""
+    cache_path = settings.descriptor_cache_path
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if cache.get('source_hash') != source_hash:
+        return None
+    if cache.get('backend') != get_descriptor_backend().name:
+        return None
+    return cache.get('properties', {})
+
+
+def _write_descriptor_cache(ingredients: list[Ingredient], source_hash: str):
+    """Write descriptors to the sidecar cache (best effort)."""
+    cache_path = Path(settings.descriptor_cache_path)
+    cache = {
+        "source_hash": source_hash,
+        "backend": get_descriptor_backend().name,
+        "properties": {
+            ing.id: asdict(ing.properties)
+            for ing in ingredients
+            if ing.properties is not None and ing.properties.valid
+        }
+    }
+    tmp_path = cache_path.with_suffix(cache_path.suffix + ".tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # Read-only filesystems (e.g. serverless) just recompute next start
+        pass
+
+
+def _properties_from_record(prop, prop_text: dict, row: int) -> MolecularProperties:
+    """Rebuild MolecularProperties from a knowledge pack record (NaN / -1 mean None)."""
+    def real(name):
+        value = float(prop[name])
+        return None if np.isnan(value) else value
+
+    def count(name):
+        value = int(prop[name])
+        return None if value < 0 else value
+
+    return MolecularProperties(
+        smiles=prop_text["smiles"][row],
+        valid=bool(prop["valid"]),
+        logp=real("logp"),
+        molecular_weight=real("molecular_weight"),
+        tpsa=real("tpsa"),
+        num_rotatable_bonds=count("num_rotatable_bonds"),
+        num_h_donors=count("num_h_donors"),
+        num_h_acceptors=count("num_h_acceptors"),
+        estimated_vapor_pressure=real("estimated_vapor_pressure"),
+        volatility_class=prop_text["volatility_class"][row],
+        error_message=prop_text["error_message"][row]
+    )
+
+
+class CatalogSnapshot:
+    """
+    Immutable, versioned view of the ingredient catalog and its indexes.
 
-    def __init__(self):
-        if not self._loaded:
-            self._load_ingredients()
+    A snapshot is never modified after construction; reloading the catalog
+    builds a new snapshot and swaps the reference held by IngredientDatabase.
+    Ingredient objects are shared with callers and must be treated as
+    read-only.
+    """
 
-    def _load_ingredients(self):
-        """Load ingredients from JSON file."""
-        data_path = settings.data_dir / "ingredients.json"
+    def __init__(
+        self,
+        ingredients: list[Ingredient],
+        version: str,
+        source: str = "json",
+        fingerprint_index: Optional[FingerprintIndex] = None
+    ):
+        self.version = version
+        self.source = source
+        self.loaded_at = time.time()
+        self._ingredients: dict[str, Ingredient] = {ing.id: ing for ing in ingredients}
+        self._columns = IngredientColumns(list(self._ingredients.values()))
+        self._facets = FacetIndex(self._columns.rows)
+        self._descriptor_index = DescriptorIndex(self._columns.rows)
+        self._name_index = NameIndex(self._columns.rows)
+        self._safe_pools = lru_cache(maxsize=settings.safe_pool_cache_size)(self._build_safe_pool)
+        self._fingerprint_index: Optional[FingerprintIndex] = fingerprint_index
+        self._fingerprint_lock = threading.Lock()
+
+    @classmethod
+    def from_json(cls, raw: bytes) -> "CatalogSnapshot":
+        """
+        Build a snapshot from the contents of ingredients.json.
 
-        if not data_path.exists():
-            # Create minimal fallback
-            self._ingredients = {}
-            self._loaded = True
-            return
+        Args:
+            raw: File contents; their SHA-256 becomes the snapshot version
+        """
+        source_hash = hashlib.sha256(raw).hexdigest()
+        data = json.loads(raw)
+        ingredients = [_ingredient_from_dict(d) for d in data.get('ingredients', [])]
+        _attach_properties(ingredients, source_hash)
+        return cls(ingredients, source_hash, source="json")
+
+    @classmethod
+    def from_pack(cls, pack: KnowledgePack) -> "CatalogSnapshot":
+        """
+        Build a snapshot from a memory-mapped knowledge pack.
 
-        with open(data_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        for ing_data in data.get('ingredients', []):
-            ingredient = Ingredient(
-                id=ing_data['id'],
-                name=ing_data['name'],
-                smiles=ing_data['smiles'],
-                note_type=ing_data['note_type'],
-                family=ing_data['family'],
-                logp=ing_data['logp'],
-                molecular_weight=ing_data['molecular_weight'],
-                is_sustainable=ing_data['is_sustainable'],
-                source=ing_data['source'],
-                sustainability_score=ing_data['sustainability_score'],
-                ifra_restricted=ing_data.get('ifra_restricted', False),
-                allergen=ing_data.get('allergen', False),
-                max_concentration=ing_data.get('max_concentration'),
-                descriptors=ing_data.get('descriptors', []),
-                origin=ing_data.get('origin')
+        Descriptors are taken from the pack as-is and the packed fingerprint
+        matrix is used in place (shared with other processes) when its
+        parameters match the current settings.
+        """
+        records = pack.array("ingredients")
+        props = pack.array("properties")
+        text = {
+            name: pack.strings(records[name])
+            for name in ("id", "name", "smiles", "note_type", "family", "source", "origin", "latin_name", "cas")
+        }
+        descriptors = pack.string_lists(records["descriptors"])
+        synonyms = pack.string_lists(records["synonyms"])
+        prop_text = {name: pack.strings(props[name]) for name in ("smiles", "volatility_class", "error_message")}
+
+        columns = {
+            name: records[name].tolist()
+            for name in ("logp", "molecular_weight", "max_concentration", "has_max_concentration",
+                         "sustainability_score", "is_sustainable", "ifra_restricted", "allergen")
+        }
+        present = props["present"].tolist()
+
+        ingredients = []
+        for row in range(len(records)):
+            ing = Ingredient(
+                id=text["id"][row],
+                name=text["name"][row],
+                smiles=text["smiles"][row],
+                note_type=text["note_type"][row],
+                family=text["family"][row],
+                logp=columns["logp"][row],
+                molecular_weight=columns["molecular_weight"][row],
+                is_sustainable=columns["is_sustainable"][row],
+                source=text["source"][row],
+                sustainability_score=columns["sustainability_score"][row],
+                ifra_restricted=columns["ifra_restricted"][row],
+                allergen=columns["allergen"][row],
+                max_concentration=columns["max_concentration"][row] if columns["has_max_concentration"][row] else None,
+                descriptors=descriptors[row],
+                origin=text["origin"][row],
+                latin_name=text["latin_name"][row],
+                cas=text["cas"][row],
+                synonyms=synonyms[row]
+            )
+            if present[row]:
+                ing.properties = _properties_from_record(props[row], prop_text, row)
+            ingredients.append(ing)
+
+        fingerprints = None
+        if (pack.header.get("fingerprint_bits") == settings.fingerprint_bits
+                and pack.header.get("fingerprint_radius") == settings.fingerprint_radius):
+            fingerprints = FingerprintIndex(
+                [ing.id for ing in ingredients],
+                pack.array("fingerprints"),
+                settings.fingerprint_bits,
+                settings.fingerprint_radius
             )
-            self._ingredients[ingredient.id] = ingredient
+        return cls(ingredients, pack.versions["ingredients"], source="pack", fingerprint_index=fingerprints)
 
-        self._loaded = True
+    def __len__(self) -> int:
+        return len(self._ingredients)
+
+    @property
+    def facets(self) -> FacetIndex:
+        """Bitmap facet index; rows follow get_all() order."""
+        return self._facets
 
     def get_all(self) -> list[Ingredient]:
         """Get all ingredients."""
@@ -99,34 +394,88 @@ class IngredientDatabase:
 
     def get_by_note_type(self, note_type: str) -> list[Ingredient]:
         """Get ingredients by note type (top, middle, base)."""
-        return [ing for ing in self._ingredients.values() if ing.note_type == note_type]
+        return self.query(note_type=note_type)
 
     def get_by_family(self, family: str) -> list[Ingredient]:
         """Get ingredients by fragrance family."""
-        return [ing for ing in self._ingredients.values() if ing.family == family]
+        return self.query(family=family)
 
     def get_sustainable(self, min_score: int = 8) -> list[Ingredient]:
         """Get sustainable ingredients above a minimum score."""
-        return [ing for ing in self._ingredients.values()
-                if ing.is_sustainable and ing.sustainability_score >= min_score]
+        return self.query(is_sustainable=True, min_sustainability_score=min_score)
 
     def get_upcycled(self) -> list[Ingredient]:
         """Get upcycled ingredients (highest sustainability tier)."""
-        return [ing for ing in self._ingredients.values() if ing.source == "upcycled"]
+        return self.query(source="upcycled")
 
     def get_non_allergenic(self) -> list[Ingredient]:
         """Get ingredients that are not known allergens."""
-        return [ing for ing in self._ingredients.values() if not ing.allergen]
+        return self.query(allergen=False)
 
     def get_fixatives(self, min_logp: float = 3.5) -> list[Ingredient]:
         """Get fixative ingredients based on LogP threshold."""
-        return [ing for ing in self._ingredients.values() if ing.logp >= min_logp]
+        return self.query(min_logp=min_logp)
+
+    def query(self, **predicates) -> list[Ingredient]:
+        """
+        Get ingredients matching combined predicates in one vectorized pass.
+
+        Args:
+            **predicates: Any of note_type, family, source (single value or
+                list), min_logp, max_logp, min_molecular_weight,
+                max_molecular_weight, min_sustainability_score,
+                is_sustainable, allergen, ifra_restricted
+
+        Returns:
+            Matching ingredients in catalog order
+        """
+        columns = self._columns
+        return columns.select(columns.mask(**predicates))
 
     def search_by_descriptor(self, descriptor: str) -> list[Ingredient]:
         """Search ingredients by scent descriptor."""
-        descriptor_lower = descriptor.lower()
-        return [ing for ing in self._ingredients.values()
-                if any(descriptor_lower in d.lower() for d in ing.descriptors)]
+        rows = self._descriptor_index.match_rows(descriptor)
+        return [self._columns.rows[row] for row in sorted(rows)]
+
+    def search_descriptors(
+        self,
+        terms: list[str],
+        include_family: bool = False
+    ) -> list[tuple[Ingredient, int]]:
+        """
+        Rank ingredients by how many scent terms they match.
+
+        Args:
+            terms: Descriptor terms; partial matches count ("wood" -> "woody")
+            include_family: Also match terms against the fragrance family
+
+        Returns:
+            List of (Ingredient, match_count), best matches first
+        """
+        fields = DescriptorIndex.FIELDS if include_family else ("descriptor",)
+        rows = self._columns.rows
+        return [(rows[row], count) for row, count in self._descriptor_index.search(terms, fields)]
+
+    def resolve_name(self, name: str, min_score: Optional[float] = None) -> Optional[NameMatch]:
+        """
+        Ground a free-text ingredient name (or CAS number) to the catalog.
+
+        Args:
+            name: Name as written by a user or LLM
+            min_score: Minimum fuzzy score (defaults to settings.name_match_min_score)
+
+        Returns:
+            NameMatch with the ingredient and score, or None
+        """
+        if min_score is None:
+            min_score = settings.name_match_min_score
+        return self._name_index.resolve(name, min_score)
+
+    def resolve_names(self, names: list[str], min_score: Optional[float] = None) -> list[Optional[NameMatch]]:
+        """Resolve a whole formula's ingredient names in one call."""
+        if min_score is None:
+            min_score = settings.name_match_min_score
+        return self._name_index.resolve_many(names, min_score)
 
     def get_safe_for_allergies(self, allergies: list[str]) -> list[Ingredient]:
         """
@@ -138,24 +487,165 @@ class IngredientDatabase:
         Returns:
             List of safe ingredients
         """
-        allergies_lower = [a.lower() for a in allergies]
-        safe = []
-        for ing in self._ingredients.values():
-            # Check if ingredient name contains any allergen
-            ing_name_lower = ing.name.lower()
-            is_safe = not any(allergen in ing_name_lower for allergen in allergies_lower)
+        return list(self.get_safe_pool(allergies).ingredients)
+
+    def get_safe_pool(self, allergies: Optional[list[str]]) -> SafePool:
+        """
+        Get the safe-ingredient pool for an allergy combination, split by note type.
 
-            # Also check if it's a declared allergen and user is sensitive
-            if ing.allergen:
-                for allergen in allergies_lower:
-                    if allergen in ing_name_lower:
-                        is_safe = False
-                        break
+        Pools are cached per normalized allergy set; the returned pool is
+        shared and must not be modified.
+        """
+        return self._safe_pools(normalize_allergies(allergies))
+
+    def safe_pool_cache_info(self):
+        """Hit/miss statistics of the safe-pool cache."""
+        return self._safe_pools.cache_info()
+
+    def _build_safe_pool(self, allergies: frozenset[str]) -> SafePool:
+        return build_safe_pool(self._columns.rows, allergies)
+
+    def fingerprint_index(self) -> FingerprintIndex:
+        """Build the structural fingerprint index on first use."""
+        if self._fingerprint_index is None:
+            with self._fingerprint_lock:
+                if self._fingerprint_index is None:
+                    rows = self._columns.rows
+                    self._fingerprint_index = FingerprintIndex.build(
+                        [ing.id for ing in rows],
+                        [ing.smiles for ing in rows]
+                    )
+        return self._fingerprint_index
+
+    def find_similar(
+        self,
+        smiles: str,
+        k: int = 5,
+        exclude_ids: Optional[set[str]] = None,
+        exclude_allergens: bool = False,
+        exclude_restricted: bool = False,
+        min_similarity: float = 0.0
+    ) -> list[tuple[Ingredient, float]]:
+        """
+        Find catalog ingredients structurally similar to a molecule.
 
-            if is_safe:
-                safe.append(ing)
+        Uses Tanimoto similarity on Morgan fingerprints; intended for
+        substitution lookups when a material must be replaced.
+
+        Args:
+            smiles: SMILES of the query molecule
+            k: Maximum number of results
+            exclude_ids: Ingredient IDs to leave out (e.g. the query itself)
+            exclude_allergens: Skip declared allergens
+            exclude_restricted: Skip IFRA-restricted materials
+            min_similarity: Minimum Tanimoto score
+
+        Returns:
+            List of (Ingredient, similarity) sorted by descending similarity
+
+        Raises:
+            ValueError: If the query SMILES cannot be parsed
+        """
+        index = self.fingerprint_index()
+        query = index.query_vector(smiles)
+        if query is None:
+            raise ValueError(f"Invalid SMILES: {smiles}")
+
+        # Index rows follow the column store's row order
+        columns = self._columns
+        mask = None
+        if exclude_ids or exclude_allergens or exclude_restricted:
+            mask = columns.all()
+            if exclude_ids:
+                mask &= ~columns.rows_mask(exclude_ids)
+            if exclude_allergens:
+                mask &= ~columns.allergen
+            if exclude_restricted:
+                mask &= ~columns.ifra_restricted
+
+        return [
+            (columns.rows[row], score)
+            for row, score in index.search(query, k=k, mask=mask, min_similarity=min_similarity)
+        ]
+
+
+class IngredientDatabase:
+    """
+    Singleton access point to the current catalog snapshot.
 
-        return safe
+    Query methods (get_all, query, find_similar, ...) are delegated to the
+    current CatalogSnapshot. Readers never lock: they read one reference, and
+    reload() installs a new snapshot with a single assignment. Code that makes
+    several related queries should take snapshot() once so every query sees
+    the same catalog version.
+    """
+
+    _instance = None
+    _snapshot: Optional[CatalogSnapshot] = None
+    _reload_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if self._snapshot is None:
+            self.reload()
+
+    def __getattr__(self, name: str):
+        # Only reached for attributes not defined here: delegate to the snapshot
+        return getattr(self.snapshot(), name)
+
+    def snapshot(self) -> CatalogSnapshot:
+        """The current catalog snapshot."""
+        return self._snapshot
+
+    @property
+    def version(self) -> str:
+        """Version (content hash) of the current catalog snapshot."""
+        return self._snapshot.version
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Rebuild the catalog from ingredients.json and swap it in.
+
+        Args:
+            force: Rebuild even if the file content is unchanged
+
+        Returns:
+            True if a new snapshot was installed
+        """
+        with self._reload_lock:
+            data_path = settings.data_dir / "ingredients.json"
+            raw = data_path.read_bytes() if data_path.exists() else None
+            version = hashlib.sha256(raw).hexdigest() if raw is not None else None
+
+            # Prefer a knowledge pack compiled from the same ingredients.json
+            pack = load_pack()
+            if pack is not None and pack.header.get("descriptor_backend") != get_descriptor_backend().name:
+                pack = None
+            if pack is not None and version is not None and pack.versions.get("ingredients") != version:
+                pack = None
+            if pack is not None:
+                version = pack.versions["ingredients"]
+
+            current = self._snapshot
+            if version is None:
+                # Minimal fallback: empty catalog
+                if current is None:
+                    self.install(CatalogSnapshot([], version=""))
+                    return True
+                return False
+
+            if not force and current is not None and current.version == version:
+                return False
+            self.install(CatalogSnapshot.from_pack(pack) if pack is not None else CatalogSnapshot.from_json(raw))
+            return True
+
+    def install(self, snapshot: CatalogSnapshot):
+        """Atomically make a fully built snapshot the current catalog."""
+        self._snapshot = snapshot
 
 
 # Singleton instance
@@ -0,0 +1,124 @@
+"""
+Bitmap facet indexes over the ingredient catalog.
+
+Every facet value maps to a Python-int bitset with one bit per catalog row.
+A filter is an OR of value bitsets within a facet and an AND across facets,
+and facet counts are popcounts, so listing cost no longer grows with the
+number of filters.
+"""
+
+from typing import Iterable, Optional
+
+SUSTAINABILITY_TIERS = (
+    ("high", 8),
+    ("medium", 5),
+    ("low", 0),
+)
+
+
+def sustainability_tier(score: int) -> str:
+    """Bucket a 0-10 sustainability score into high/medium/low."""
+    for tier, minimum in SUSTAINABILITY_TIERS:
+        if score >= minimum:
+            return tier
+    return SUSTAINABILITY_TIERS[-1][0]
+
+
+def _flag(value: bool) -> str:
+    return "true" if value else "false"
+
+
+class FacetIndex:
+    """
+    Categorical bitmap indexes for faceted catalog browsing.
+
+    Facet values are lower-cased; rows follow the order of the ingredient list
+    the index was built from.
+    """
+
+    FACETS = ("note_type", "family", "source", "allergen", "sustainable", "sustainability_tier", "descriptor")
+
+    def __init__(self, ingredients: list):
+        self.size = len(ingredients)
+        self.universe = (1 << self.size) - 1
+        self.bitmaps: dict[str, dict[str, int]] = {facet: {} for facet in self.FACETS}
+
+        for row, ing in enumerate(ingredients):
+            bit = 1 << row
+            values = {
+                "note_type": (ing.note_type,),
+                "family": (ing.family,),
+                "source": (ing.source,),
+                "allergen": (_flag(ing.allergen),),
+                "sustainable": (_flag(ing.is_sustainable),),
+                "sustainability_tier": (sustainability_tier(ing.sustainability_score),),
+                "descriptor": ing.descriptors,
+            }
+            for facet, facet_values in values.items():
+                bitmap = self.bitmaps[facet]
+                for value in facet_values:
+                    key = value.lower()
+                    bitmap[key] = bitmap.get(key, 0) | bit
+
+    def facet_bits(self, facet: str, values: Iterable[str]) -> int:
+        """OR together the bitsets of the given values of one facet."""
+        bitmap = self.bitmaps[facet]
+        bits = 0
+        for value in values:
+            bits |= bitmap.get(value.lower(), 0)
+        return bits
+
+    def filter(self, selections: dict[str, list[str]], skip: Optional[str] = None) -> int:
+        """
+        Bitset of rows matching every selected facet.
+
+        Args:
+            selections: Facet name -> accepted values (empty lists are ignored)
+            skip: Facet to leave out, used for disjunctive counts
+
+        Returns:
+            Row bitset
+        """
+        bits = self.universe
+        for facet, values in selections.items():
+            if facet == skip or not values:
+                continue
+            bits &= self.facet_bits(facet, values)
+        return bits
+
+    def counts(self, selections: dict[str, list[str]]) -> dict[str, dict[str, int]]:
+        """
+        Facet value counts for the current selection.
+
+        Counts for a facet ignore that facet's own selection, so the UI can
+        show how many rows each alternative value would add.
+        """
+        counts = {}
+        for facet, bitmap in self.bitmaps.items():
+            base = self.filter(selections, skip=facet)
+            facet_counts = {}
+            for value, bits in bitmap.items():
+                n = (base & bits).bit_count()
+                if n:
+                    facet_counts[value] = n
+            counts[facet] = dict(sorted(facet_counts.items(), key=lambda kv: (-kv[1], kv[0])))
+        return counts
+
+    @staticmethod
+    def rows(bits: int, after: int = -1, limit: Optional[int] = None) -> list[int]:
+        """
+        Row positions set in a bitset, ascending.
+
+        Args:
+            bits: Row bitset
+            after: Only return rows greater than this position (cursor)
+            limit: Maximum number of rows
+        """
+        if after >= 0:
+            bits = (bits >> (after + 1)) << (after + 1)
+        rows = []
+        while bits and (limit is None or len(rows) < limit):
+            low = bits & -bits
+            rows.append(low.bit_length() - 1)
+            bits ^= low
+        return rows
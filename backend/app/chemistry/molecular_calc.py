@@ -1,10 +1,26 @@
 """
 Molecular calculation engine using RDKit.
 Provides LogP calculations, molecular property analysis, and SMILES validation.
+
+Each SMILES string is parsed once; every descriptor is computed from that
+single molecule object and memoized in a bounded LRU cache keyed by canonical
+SMILES, so repeated enrichment of catalog molecules is a dictionary lookup.
+When RDKit is not installed, a pure-Python descriptor backend is used instead
+(see descriptor_backend).
 """
 
-from typing import Optional
-from dataclasses import dataclass
+import asyncio
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Iterator, Optional
+from dataclasses import dataclass, replace
+
+from app.config import settings
+from app.chemistry.descriptor_backend import get_descriptor_backend
 
 
 @dataclass
@@ -23,9 +39,108 @@ class MolecularProperties:
     error_message: Optional[str] = None
 
 
+class PropertyCache:
+    """
+    Bounded LRU cache of MolecularProperties keyed by canonical SMILES.
+
+    Raw input strings are mapped to their canonical form through an alias
+    table, so repeating the same spelling skips parsing entirely and different
+    spellings of one molecule share a single entry.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self._maxsize = max(1, maxsize)
+        self._entries: OrderedDict[str, MolecularProperties] = OrderedDict()
+        self._aliases: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, smiles: str) -> Optional[MolecularProperties]:
+        """Look up properties by a previously seen input spelling."""
+        with self._lock:
+            canonical = self._aliases.get(smiles)
+            if canonical is None:
+                return None
+            props = self._entries.get(canonical)
+            if props is None:
+                del self._aliases[smiles]
+                return None
+            self._aliases.move_to_end(smiles)
+            self._entries.move_to_end(canonical)
+            self._hits += 1
+            return props
+
+    def get_canonical(self, smiles: str, canonical: str) -> Optional[MolecularProperties]:
+        """Look up properties by canonical SMILES, remembering the input spelling."""
+        with self._lock:
+            props = self._entries.get(canonical)
+            if props is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(canonical)
+            self._set_alias(smiles, canonical)
+            self._hits += 1
+            return props
+
+    def record_miss(self):
+        """Count a lookup that could not be served from the cache."""
+        with self._lock:
+            self._misses += 1
+
+    def put(self, smiles: str, canonical: str, props: MolecularProperties):
+        """Store properties under their canonical SMILES."""
+        with self._lock:
+            self._entries[canonical] = props
+            self._entries.move_to_end(canonical)
+            self._set_alias(smiles, canonical)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def _set_alias(self, smiles: str, canonical: str):
+        self._aliases[smiles] = canonical
+        self._aliases.move_to_end(smiles)
+        # Aliases outnumber entries only when several spellings share a molecule
+        while len(self._aliases) > 2 * self._maxsize:
+            self._aliases.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached entries and reset statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._aliases.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current occupancy."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self._maxsize,
+            }
+
+
+_property_cache = PropertyCache(maxsize=settings.molecular_cache_size)
+
+
+def get_cache_stats() -> dict:
+    """Return statistics for the molecular property cache."""
+    return _property_cache.stats()
+
+
+def clear_property_cache():
+    """Clear the molecular property cache."""
+    _property_cache.clear()
+
+
 def validate_smiles(smiles: str) -> bool:
     """
-    Validate a SMILES string using RDKit.
+    Validate a SMILES string using the active descriptor backend.
 
     Args:
         smiles: SMILES string to validate
@@ -33,13 +148,7 @@ def validate_smiles(smiles: str) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    try:
-        from rdkit import Chem
-        mol = Chem.MolFromSmiles(smiles)
-        return mol is not None
-    except ImportError:
-        # Fallback if RDKit not installed
-        return len(smiles) > 0
+    return get_full_properties(smiles).valid
 
 
 def calculate_logp(smiles: str) -> Optional[float]:
@@ -56,18 +165,7 @@ def calculate_logp(smiles: str) -> Optional[float]:
     Returns:
         LogP value or None if calculation fails
     """
-    try:
-        from rdkit import Chem
-        from rdkit.Chem import Crippen
-
-        mol = Chem.MolFromSmiles(smiles)
-        if mol is None:
-            return None
-        return round(Crippen.MolLogP(mol), 2)
-    except ImportError:
-        return None
-    except Exception:
-        return None
+    return get_full_properties(smiles).logp
 
 
 def calculate_molecular_weight(smiles: str) -> Optional[float]:
@@ -85,18 +183,7 @@ def calculate_molecular_weight(smiles: str) -> Optional[float]:
     Returns:
         Molecular weight in g/mol
     """
-    try:
-        from rdkit import Chem
-        from rdkit.Chem import Descriptors
-
-        mol = Chem.MolFromSmiles(smiles)
-        if mol is None:
-            return None
-        return round(Descriptors.MolWt(mol), 2)
-    except ImportError:
-        return None
-    except Exception:
-        return None
+    return get_full_properties(smiles).molecular_weight
 
 
 def estimate_vapor_pressure(smiles: str, temperature_c: float = 25.0) -> Optional[float]:
@@ -116,32 +203,10 @@ def estimate_vapor_pressure(smiles: str, temperature_c: float = 25.0) -> Optiona
     Returns:
         Estimated vapor pressure in mmHg
     """
-    try:
-        mw = calculate_molecular_weight(smiles)
-        logp = calculate_logp(smiles)
-
-        if mw is None or logp is None:
-            return None
-
-        # Simplified empirical correlation
-        # log10(VP) = A - B*MW/1000 - C*LogP
-        # Coefficients derived from fragrance compound data
-        A = 2.5
-        B = 8.0
-        C = 0.3
-
-        log_vp = A - B * (mw / 1000) - C * logp
-
-        # Temperature correction using simplified Clausius-Clapeyron
-        # VP(T) = VP(25) * exp(dH/R * (1/298 - 1/T))
-        temp_k = temperature_c + 273.15
-        temp_factor = (temp_k / 298.15) ** 2  # Simplified
-
-        vp = (10 ** log_vp) * temp_factor
-
-        return round(vp, 6)
-    except Exception:
-        return None
+    props = get_full_properties(smiles)
+    if temperature_c == 25.0:
+        return props.estimated_vapor_pressure
+    return _vapor_pressure(props.molecular_weight, props.logp, temperature_c)
 
 
 def classify_volatility(smiles: str) -> Optional[str]:
@@ -154,13 +219,35 @@ def classify_volatility(smiles: str) -> Optional[str]:
     Returns:
         "high", "medium", or "low"
     """
-    vp = estimate_vapor_pressure(smiles)
-    mw = calculate_molecular_weight(smiles)
+    return get_full_properties(smiles).volatility_class
 
-    if vp is None and mw is None:
+
+def _vapor_pressure(mw: Optional[float], logp: Optional[float], temperature_c: float = 25.0) -> Optional[float]:
+    """Empirical vapor pressure correlation from molecular weight and LogP."""
+    if mw is None or logp is None:
         return None
 
-    # Use molecular weight as primary indicator if VP unavailable
+    # Simplified empirical correlation
+    # log10(VP) = A - B*MW/1000 - C*LogP
+    # Coefficients derived from fragrance compound data
+    A = 2.5
+    B = 8.0
+    C = 0.3
+
+    log_vp = A - B * (mw / 1000) - C * logp
+
+    # Temperature correction using simplified Clausius-Clapeyron
+    # VP(T) = VP(25) * exp(dH/R * (1/298 - 1/T))
+    temp_k = temperature_c + 273.15
+    temp_factor = (temp_k / 298.15) ** 2  # Simplified
+
+    vp = (10 ** log_vp) * temp_factor
+
+    return round(vp, 6)
+
+
+def _volatility_class(mw: Optional[float], vp: Optional[float]) -> Optional[str]:
+    """Classify volatility, using molecular weight as the primary indicator."""
     if mw is not None:
         if mw < 150:
             return "high"
@@ -180,10 +267,33 @@ def classify_volatility(smiles: str) -> Optional[str]:
     return None
 
 
+def _properties_from_descriptors(smiles: str, descriptors: dict) -> MolecularProperties:
+    """Build MolecularProperties from raw backend descriptors."""
+    logp = round(descriptors["logp"], 2)
+    mw = round(descriptors["molecular_weight"], 2)
+    vp = _vapor_pressure(mw, logp)
+
+    return MolecularProperties(
+        smiles=smiles,
+        valid=True,
+        logp=logp,
+        molecular_weight=mw,
+        tpsa=round(descriptors["tpsa"], 2),
+        num_rotatable_bonds=descriptors["num_rotatable_bonds"],
+        num_h_donors=descriptors["num_h_donors"],
+        num_h_acceptors=descriptors["num_h_acceptors"],
+        estimated_vapor_pressure=vp,
+        volatility_class=_volatility_class(mw, vp)
+    )
+
+
 def get_full_properties(smiles: str) -> MolecularProperties:
     """
     Calculate all available molecular properties for a SMILES string.
 
+    Results are cached by canonical SMILES; the returned object is a fresh
+    copy carrying the caller's original spelling.
+
     Args:
         smiles: SMILES string
 
@@ -197,47 +307,32 @@ def get_full_properties(smiles: str) -> MolecularProperties:
             error_message="Empty SMILES string"
         )
 
-    try:
-        from rdkit import Chem
-        from rdkit.Chem import Descriptors, Crippen, rdMolDescriptors
+    cached = _property_cache.get(smiles)
+    if cached is not None:
+        return replace(cached, smiles=smiles)
 
-        mol = Chem.MolFromSmiles(smiles)
+    backend = get_descriptor_backend()
+    try:
+        mol = backend.parse(smiles)
         if mol is None:
-            return MolecularProperties(
+            _property_cache.record_miss()
+            props = MolecularProperties(
                 smiles=smiles,
                 valid=False,
                 error_message="Invalid SMILES - could not parse"
             )
+            _property_cache.put(smiles, smiles, props)
+            return props
 
-        logp = round(Crippen.MolLogP(mol), 2)
-        mw = round(Descriptors.MolWt(mol), 2)
-        tpsa = round(Descriptors.TPSA(mol), 2)
-        rotatable = rdMolDescriptors.CalcNumRotatableBonds(mol)
-        h_donors = rdMolDescriptors.CalcNumHBD(mol)
-        h_acceptors = rdMolDescriptors.CalcNumHBA(mol)
-
-        vp = estimate_vapor_pressure(smiles)
-        volatility = classify_volatility(smiles)
+        canonical = backend.canonical_smiles(mol, smiles)
+        cached = _property_cache.get_canonical(smiles, canonical)
+        if cached is not None:
+            return replace(cached, smiles=smiles)
 
-        return MolecularProperties(
-            smiles=smiles,
-            valid=True,
-            logp=logp,
-            molecular_weight=mw,
-            tpsa=tpsa,
-            num_rotatable_bonds=rotatable,
-            num_h_donors=h_donors,
-            num_h_acceptors=h_acceptors,
-            estimated_vapor_pressure=vp,
-            volatility_class=volatility
-        )
+        props = _properties_from_descriptors(smiles, backend.descriptors(mol))
+        _property_cache.put(smiles, canonical, props)
+        return replace(props)
 
-    except ImportError:
-        return MolecularProperties(
-            smiles=smiles,
-            valid=False,
-            error_message="RDKit not installed"
-        )
     except Exception as e:
         return MolecularProperties(
             smiles=smiles,
@@ -246,6 +341,226 @@ def get_full_properties(smiles: str) -> MolecularProperties:
         )
 
 
+# ============== Batch Processing ==============
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _warm_worker():
+    """Load the descriptor backend once per worker so the first chunk pays no import cost."""
+    get_descriptor_backend().warm()
+
+
+def _noop() -> None:
+    return None
+
+
+def _properties_chunk(smiles_list: list[str]) -> list[MolecularProperties]:
+    """Worker entry point: compute properties for one chunk of SMILES."""
+    results = []
+    for smiles in smiles_list:
+        try:
+            results.append(get_full_properties(smiles))
+        except Exception as e:
+            results.append(MolecularProperties(smiles=smiles, valid=False, error_message=str(e)))
+    return results
+
+
+def _pool_size() -> int:
+    return settings.molecular_pool_workers or os.cpu_count() or 1
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared worker pool for batch property calculation.
+
+    The pool is created on first use and prewarmed before it is returned:
+    one no-op task per worker makes the executor spawn its workers and run
+    their initializer. This is best effort; a fast worker may take several
+    of the tasks, leaving another still cold for the first real batch.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=_pool_size(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker
+            )
+            # Best-effort prewarm: start workers and run the initializer up front
+            try:
+                for future in [pool.submit(_noop) for _ in range(_pool_size())]:
+                    future.result()
+            except BaseException:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+            _pool = pool
+        return _pool
+
+
+def shutdown_process_pool():
+    """Shut down the shared worker pool if it was started."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _discard_broken_pool(pool: ProcessPoolExecutor):
+    """Drop a pool whose worker died so the next get_process_pool starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit_chunk(pool: ProcessPoolExecutor, chunk: list[str]) -> Future:
+    """Submit a chunk; a broken pool yields a failed future so the chunk is retried like any crash."""
+    try:
+        return pool.submit(_properties_chunk, chunk)
+    except BrokenProcessPool as e:
+        failed = Future()
+        failed.set_exception(e)
+        return failed
+
+
+def _retry_chunk(chunk: list[str], broken: ProcessPoolExecutor) -> Optional[list[MolecularProperties]]:
+    """Run a chunk again on a fresh pool after its worker died; None if that fails too."""
+    _discard_broken_pool(broken)
+    pool = None
+    try:
+        pool = get_process_pool()
+        return pool.submit(_properties_chunk, chunk).result()
+    except BrokenProcessPool:
+        if pool is not None:
+            _discard_broken_pool(pool)
+    except Exception:
+        pass
+    return None
+
+
+def _chunks(smiles_list: list[str], chunk_size: int) -> Iterator[tuple[int, list[str]]]:
+    for start in range(0, len(smiles_list), chunk_size):
+        yield start, smiles_list[start:start + chunk_size]
+
+
+def iter_properties_batch(
+    smiles_list: list[str],
+    chunk_size: Optional[int] = None
+) -> Iterator[tuple[int, MolecularProperties]]:
+    """
+    Calculate properties for many SMILES strings in the worker pool.
+
+    Chunks are dispatched with a bounded in-flight window and results are
+    yielded in input order as soon as each chunk completes. Invalid molecules
+    are reported through their MolecularProperties error_message rather than
+    failing the batch. If a worker dies, the broken pool is replaced and each
+    affected chunk is retried once on the new pool.
+
+    Args:
+        smiles_list: SMILES strings to analyze
+        chunk_size: SMILES per worker task (default from settings)
+
+    Yields:
+        (input index, MolecularProperties) tuples
+    """
+    chunk_size = chunk_size or settings.molecular_batch_chunk_size
+    window = 2 * _pool_size()
+    pending = deque()
+
+    for start, chunk in _chunks(smiles_list, chunk_size):
+        # Looked up per chunk so a pool replaced after a crash is picked up
+        pool = get_process_pool()
+        pending.append((start, chunk, pool, _submit_chunk(pool, chunk)))
+        if len(pending) >= window:
+            yield from _drain_chunk(*pending.popleft())
+
+    while pending:
+        yield from _drain_chunk(*pending.popleft())
+
+
+async def aiter_properties_batch(
+    smiles_list: list[str],
+    chunk_size: Optional[int] = None
+) -> AsyncIterator[tuple[int, MolecularProperties]]:
+    """Async variant of iter_properties_batch that never blocks the event loop."""
+    chunk_size = chunk_size or settings.molecular_batch_chunk_size
+    loop = asyncio.get_running_loop()
+    window = 2 * _pool_size()
+    pending = deque()
+
+    for start, chunk in _chunks(smiles_list, chunk_size):
+        pool = _pool or await loop.run_in_executor(None, get_process_pool)
+        pending.append((start, chunk, pool, asyncio.wrap_future(_submit_chunk(pool, chunk))))
+        if len(pending) >= window:
+            start, chunk, pool, future = pending.popleft()
+            for item in _chunk_results(start, chunk, await _gather_chunk(chunk, pool, future)):
+                yield item
+
+    while pending:
+        start, chunk, pool, future = pending.popleft()
+        for item in _chunk_results(start, chunk, await _gather_chunk(chunk, pool, future)):
+            yield item
+
+
+async def _gather_chunk(chunk: list[str], pool: ProcessPoolExecutor, future) -> Optional[list[MolecularProperties]]:
+    try:
+        return await future
+    except BrokenProcessPool:
+        return await asyncio.get_running_loop().run_in_executor(None, _retry_chunk, chunk, pool)
+    except Exception:
+        return None
+
+
+def _drain_chunk(
+    start: int,
+    chunk: list[str],
+    pool: ProcessPoolExecutor,
+    future
+) -> Iterator[tuple[int, MolecularProperties]]:
+    try:
+        results = future.result()
+    except BrokenProcessPool:
+        results = _retry_chunk(chunk, pool)
+    except Exception:
+        results = None
+    return _chunk_results(start, chunk, results)
+
+
+def _chunk_results(
+    start: int,
+    chunk: list[str],
+    results: Optional[list[MolecularProperties]]
+) -> Iterator[tuple[int, MolecularProperties]]:
+    """Pair chunk results with input indices; a crashed chunk marks each molecule failed."""
+    for offset, smiles in enumerate(chunk):
+        if results is None:
+            props = MolecularProperties(smiles=smiles, valid=False, error_message="Worker failed to process molecule")
+        else:
+            props = results[offset]
+        yield start + offset, props
+
+
+def get_full_properties_batch(
+    smiles_list: list[str],
+    chunk_size: Optional[int] = None
+) -> list[MolecularProperties]:
+    """
+    Calculate all available molecular properties for a list of SMILES strings.
+
+    Args:
+        smiles_list: SMILES strings to analyze
+        chunk_size: SMILES per worker task (default from settings)
+
+    Returns:
+        MolecularProperties for each input, in input order
+    """
+    return [props for _, props in iter_properties_batch(smiles_list, chunk_size)]
+
+
 def filter_by_logp(ingredients: list[dict], min_logp: float, max_logp: float = 10.0) -> list[dict]:
     """
     Filter ingredients by LogP range.
@@ -0,0 +1,155 @@
+"""
+Name resolution for grounding free-text ingredient names to the catalog.
+
+Names, latin names, synonyms and CAS numbers are normalized into an exact
+lookup table. Anything else falls back to trigram candidate retrieval scored
+by Dice similarity, so "Rose Absolute" and "Rose Oxide" are told apart by
+score instead of by whichever substring hit comes first.
+
+Fuzzy scores ignore generic material-form words ("absolute", "oil",
+"extract", ...), which otherwise make "Jasmine Absolute" look like "Rose
+Absolute". A fuzzy match must also agree on the head term, the last
+distinctive word ("jasmine" vs "rose", "oxide" vs "absolute", and for
+latin names the epithet rather than a shared genus): an unresolved name
+is safer than grounding it to the wrong molecule.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+_CAS_PATTERN = re.compile(r"\b(\d{2,7}-\d{2}-\d)\b")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_PARENTHETICAL = re.compile(r"\([^)]*\)")
+
+# Material forms, grades and qualifiers that say nothing about which material it is
+GENERIC_TOKENS = frozenset({
+    "absolute", "abs", "oil", "oils", "essential", "eo", "extract", "resinoid", "resin",
+    "tincture", "concrete", "co2", "infusion", "isolate", "fraction", "accord", "type",
+    "natural", "synthetic", "nature", "identical", "pure", "organic", "upcycled",
+    "distilled", "rectified", "of", "de", "the", "and",
+})
+_HEAD_TOKEN_MIN = 0.8  # Dice similarity for the head term to count as matching
+
+
+def normalize_name(name: str) -> str:
+    """Lower-case a name and collapse punctuation and whitespace."""
+    return _NON_ALNUM.sub(" ", name.lower()).strip()
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _dice(a: set[str], b: set[str]) -> float:
+    return 2.0 * len(a & b) / (len(a) + len(b)) if a or b else 0.0
+
+
+def distinctive_tokens(key: str) -> list[str]:
+    """Tokens of a normalized name without the generic material-form words."""
+    return [token for token in key.split() if token not in GENERIC_TOKENS]
+
+
+@dataclass
+class NameMatch:
+    """A resolved catalog ingredient with the match score and how it matched."""
+    ingredient: object
+    score: float
+    matched_on: str  # "cas", "name", "synonym" or "fuzzy"
+    matched_key: str
+
+
+class NameIndex:
+    """
+    Exact and fuzzy lookup from ingredient names to catalog rows.
+
+    Rows follow the order of the ingredient list the index was built from.
+    """
+
+    def __init__(self, ingredients: list):
+        self.rows = list(ingredients)
+        self.exact: dict[str, tuple[int, str]] = {}
+        self.cas: dict[str, int] = {}
+        self.keys: list[tuple[str, int]] = []
+        self.key_grams: list[set[str]] = []  # Trigrams of each key's distinctive part
+        self.key_heads: list[set[str]] = []  # Trigrams of each key's head term
+        self.trigrams: dict[str, list[int]] = {}
+
+        # Primary names first so they win over colliding synonyms
+        for row, ing in enumerate(self.rows):
+            self._add(ing.name, row, "name")
+        for row, ing in enumerate(self.rows):
+            for alias in (ing.latin_name, *ing.synonyms):
+                if alias:
+                    self._add(alias, row, "synonym")
+            if ing.cas:
+                self.cas.setdefault(ing.cas, row)
+
+    def _add(self, text: str, row: int, kind: str):
+        variants = {normalize_name(text), normalize_name(_PARENTHETICAL.sub(" ", text))}
+        for key in variants:
+            if not key or key in self.exact:
+                continue
+            self.exact[key] = (row, kind)
+            key_id = len(self.keys)
+            self.keys.append((key, row))
+            tokens = distinctive_tokens(key) or key.split()
+            grams = _trigrams(" ".join(tokens))
+            self.key_grams.append(grams)
+            self.key_heads.append(_trigrams(tokens[-1]))
+            for gram in grams:
+                self.trigrams.setdefault(gram, []).append(key_id)
+
+    def resolve(self, name: str, min_score: float = 0.7) -> Optional[NameMatch]:
+        """
+        Resolve one name: CAS number, then exact name/synonym, then fuzzy.
+
+        Args:
+            name: Free-text ingredient name (may contain a CAS number)
+            min_score: Minimum Dice similarity of the distinctive words for
+                fuzzy matches
+
+        Returns:
+            Best NameMatch, or None if nothing scores high enough
+        """
+        cas = _CAS_PATTERN.search(name)
+        if cas and cas.group(1) in self.cas:
+            return NameMatch(self.rows[self.cas[cas.group(1)]], 1.0, "cas", cas.group(1))
+
+        for key in (normalize_name(name), normalize_name(_PARENTHETICAL.sub(" ", name))):
+            hit = self.exact.get(key)
+            if hit is not None:
+                row, kind = hit
+                return NameMatch(self.rows[row], 1.0, kind, key)
+
+        return self._fuzzy(normalize_name(name), min_score)
+
+    def _fuzzy(self, key: str, min_score: float) -> Optional[NameMatch]:
+        tokens = distinctive_tokens(key)
+        if not tokens:
+            return None  # Nothing but generic words, e.g. "essential oil"
+        grams = _trigrams(" ".join(tokens))
+        head = _trigrams(tokens[-1])
+        shared: dict[int, int] = {}
+        for gram in grams:
+            for key_id in self.trigrams.get(gram, ()):
+                shared[key_id] = shared.get(key_id, 0) + 1
+
+        scored = sorted(
+            ((2.0 * overlap / (len(grams) + len(self.key_grams[key_id])), key_id) for key_id, overlap in shared.items()),
+            key=lambda item: (-item[0], item[1])
+        )
+        for score, key_id in scored:
+            if score < min_score:
+                break
+            if _dice(head, self.key_heads[key_id]) >= _HEAD_TOKEN_MIN:
+                matched_key, row = self.keys[key_id]
+                return NameMatch(self.rows[row], round(score, 4), "fuzzy", matched_key)
+        return None
+
+    def resolve_many(self, names: Iterable[str], min_score: float = 0.7) -> list[Optional[NameMatch]]:
+        """Resolve a batch of names, looking up each distinct name once."""
+        names = list(names)
+        resolved = {name: self.resolve(name, min_score) for name in dict.fromkeys(names)}
+        return [resolved[name] for name in names]
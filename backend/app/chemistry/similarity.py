@@ -0,0 +1,148 @@
+"""
+Structural similarity search over the ingredient catalog.
+
+Morgan fingerprints are packed into a (molecules x words) uint64 matrix, so a
+Tanimoto top-k query is a single vectorized AND + popcount over the whole
+catalog followed by an argpartition.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from app.config import settings
+from app.chemistry.descriptor_backend import get_descriptor_backend
+
+_HAS_BITWISE_COUNT = hasattr(np, "bitwise_count")
+_BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount_rows(words: np.ndarray) -> np.ndarray:
+    """Count set bits per row of a 2D uint64 array."""
+    if _HAS_BITWISE_COUNT:
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int32)
+    # numpy < 2.0: byte lookup table
+    as_bytes = words.view(np.uint8).reshape(words.shape[0], -1)
+    return _BYTE_POPCOUNT[as_bytes].sum(axis=1, dtype=np.int32)
+
+
+def pack_bits(on_bits: list[int], n_bits: int) -> np.ndarray:
+    """Pack on-bit positions into a uint64 word vector."""
+    bits = np.zeros(n_bits, dtype=np.uint8)
+    bits[on_bits] = 1
+    return np.packbits(bits, bitorder="little").view(np.uint64)
+
+
+class FingerprintIndex:
+    """
+    Packed Morgan fingerprint matrix with Tanimoto top-k search.
+
+    Rows follow the order of the keys the index was built from; molecules
+    whose SMILES fail to parse get an all-zero row and never match.
+    """
+
+    def __init__(self, keys: list[str], matrix: np.ndarray, n_bits: int, radius: int):
+        self.keys = keys
+        self.matrix = matrix
+        self.n_bits = n_bits
+        self.radius = radius
+        self.counts = popcount_rows(matrix) if len(keys) else np.zeros(0, dtype=np.int32)
+
+    @classmethod
+    def build(
+        cls,
+        keys: list[str],
+        smiles_list: list[str],
+        n_bits: Optional[int] = None,
+        radius: Optional[int] = None
+    ) -> "FingerprintIndex":
+        """
+        Build an index from parallel lists of keys and SMILES strings.
+
+        Args:
+            keys: Identifier for each molecule (e.g. ingredient id)
+            smiles_list: SMILES string for each molecule
+            n_bits: Fingerprint length (multiple of 64)
+            radius: Morgan radius
+
+        Raises:
+            ValueError: If n_bits is not a positive multiple of 64
+        """
+        n_bits = settings.fingerprint_bits if n_bits is None else n_bits
+        radius = settings.fingerprint_radius if radius is None else radius
+        if n_bits <= 0 or n_bits % 64:
+            raise ValueError(f"Fingerprint length must be a positive multiple of 64, got {n_bits}")
+        words = n_bits // 64
+        matrix = np.zeros((len(keys), words), dtype=np.uint64)
+        for row, smiles in enumerate(smiles_list):
+            on_bits = fingerprint_bits(smiles, radius, n_bits)
+            if on_bits:
+                matrix[row] = pack_bits(on_bits, n_bits)
+        return cls(keys, matrix, n_bits, radius)
+
+    def query_vector(self, smiles: str) -> Optional[np.ndarray]:
+        """Fingerprint a query molecule with this index's parameters."""
+        on_bits = fingerprint_bits(smiles, self.radius, self.n_bits)
+        if on_bits is None:
+            return None
+        return pack_bits(on_bits, self.n_bits)
+
+    def tanimoto(self, query: np.ndarray) -> np.ndarray:
+        """Tanimoto similarity of the query against every row."""
+        intersection = popcount_rows(self.matrix & query)
+        union = self.counts + int(popcount_rows(query[np.newaxis, :])[0]) - intersection
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(union > 0, intersection / union, 0.0)
+        return scores
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 5,
+        mask: Optional[np.ndarray] = None,
+        min_similarity: float = 0.0
+    ) -> list[tuple[int, float]]:
+        """
+        Find the k most similar rows.
+
+        Args:
+            query: Packed query fingerprint from query_vector
+            k: Number of results
+            mask: Optional boolean row mask of eligible candidates
+            min_similarity: Drop results below this Tanimoto score
+
+        Returns:
+            List of (row, similarity) sorted by descending similarity
+        """
+        if not len(self.keys) or k <= 0:
+            return []
+
+        # Rows of unparseable molecules are all zero and never match
+        eligible = self.counts > 0
+        if mask is not None:
+            eligible &= mask
+        scores = np.where(eligible, self.tanimoto(query), -1.0)
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return [
+            (int(row), round(float(scores[row]), 4))
+            for row in top
+            if scores[row] >= min_similarity and scores[row] >= 0
+        ]
+
+
+def fingerprint_bits(smiles: str, radius: int, n_bits: int) -> Optional[list[int]]:
+    """Morgan fingerprint on-bits for a SMILES string, or None if it cannot be parsed."""
+    if not smiles:
+        return None
+    backend = get_descriptor_backend()
+    try:
+        mol = backend.parse(smiles)
+    except Exception:
+        return None
+    if mol is None:
+        return None
+    return backend.morgan_bits(mol, radius, n_bits)
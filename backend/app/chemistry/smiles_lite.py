@@ -0,0 +1,842 @@
+"""
+Lightweight pure-Python SMILES parser and descriptor estimator.
+
+Used as the molecular descriptor backend when RDKit is unavailable (e.g. on
+serverless deployments). Parses SMILES into a minimal molecular graph and
+estimates descriptors from atom contributions:
+
+- Molecular weight from average atomic masses (isotope masses for labelled
+  atoms) plus implicit hydrogens, as RDKit's MolWt
+- LogP from Wildman-Crippen atom-type contributions
+- TPSA from Ertl polar fragment contributions (N and O only)
+- H-bond donor/acceptor and rotatable bond counts following RDKit's
+  Lipinski-style definitions
+- Morgan/ECFP-style circular fingerprints (bit positions differ from RDKit's)
+
+Invalid SMILES are rejected as RDKit would reject them: unknown elements,
+malformed branches, ring closures and dots, neutral atoms above their
+valence, and aromatic systems that cannot be kekulized (e.g. c1cccc1).
+Stereochemistry and atom classes are parsed but ignored.
+
+Limitations: the logP estimate is least reliable for charged species
+(e.g. [NH4+] -1.09 vs RDKit 0.38) and molecules with explicit hydrogen
+atoms such as [2H]; callers needing accurate values there should use the
+RDKit backend.
+"""
+
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+class SmilesParseError(ValueError):
+    """Raised when a SMILES string cannot be parsed."""
+
+
+@dataclass
+class Atom:
+    """A heavy atom in the molecular graph."""
+    element: str
+    aromatic: bool = False
+    charge: int = 0
+    explicit_h: Optional[int] = None  # Set for bracket atoms only
+    isotope: Optional[int] = None
+    num_h: int = 0
+    neighbors: list[tuple[int, float]] = field(default_factory=list)  # (atom index, bond order)
+    in_ring: bool = False
+
+
+@dataclass
+class Molecule:
+    """Minimal molecular graph produced by parse_smiles."""
+    smiles: str
+    atoms: list[Atom]
+    bonds: list[tuple[int, int, float]]  # (begin, end, order); 1.5 = aromatic
+    ring_bonds: set[tuple[int, int]] = field(default_factory=set)
+
+
+# ============== Parsing ==============
+
+_TOKEN_RE = re.compile(
+    r"(\[[^\]]+\]|Br|Cl|B|C|N|O|P|S|F|I|b|c|n|o|p|s|\*|\(|\)|\.|=|#|\$|-|:|/|\\|%\d{2}|\d)"
+)
+_BRACKET_RE = re.compile(
+    r"^\[(\d+)?([A-Z][a-z]?|se|as|te|[bcnops]|\*)(@{1,2}|@TH\d|@AL\d|@SP\d|@TB\d{1,2}|@OH\d{1,2})?"
+    r"(H\d*)?([+-]{1,3}\d*)?(:\d+)?\]$"
+)
+
+# Average atomic weights, as in RDKit's periodic table
+_ATOMIC_WEIGHTS = {
+    "H": 1.008, "He": 4.003, "Li": 6.941, "Be": 9.012, "B": 10.812, "C": 12.011, "N": 14.007,
+    "O": 15.999, "F": 18.998, "Ne": 20.18, "Na": 22.99, "Mg": 24.305, "Al": 26.982, "Si": 28.086,
+    "P": 30.974, "S": 32.067, "Cl": 35.453, "Ar": 39.948, "K": 39.098, "Ca": 40.078, "Sc": 44.956,
+    "Ti": 47.867, "V": 50.944, "Cr": 51.996, "Mn": 54.938, "Fe": 55.845, "Co": 58.933, "Ni": 58.693,
+    "Cu": 63.546, "Zn": 65.39, "Ga": 69.723, "Ge": 72.61, "As": 74.922, "Se": 78.96, "Br": 79.904,
+    "Kr": 83.8, "Rb": 85.468, "Sr": 87.62, "Y": 88.906, "Zr": 91.224, "Nb": 92.906, "Mo": 95.94,
+    "Tc": 98.0, "Ru": 101.07, "Rh": 102.906, "Pd": 106.42, "Ag": 107.868, "Cd": 112.412,
+    "In": 114.818, "Sn": 118.711, "Sb": 121.76, "Te": 127.6, "I": 126.904, "Xe": 131.29,
+    "Cs": 132.905, "Ba": 137.328, "La": 138.906, "Ce": 140.116, "Pr": 140.908, "Nd": 144.24,
+    "Pm": 145.0, "Sm": 150.36, "Eu": 151.964, "Gd": 157.25, "Tb": 158.925, "Dy": 162.5,
+    "Ho": 164.93, "Er": 167.26, "Tm": 168.934, "Yb": 173.04, "Lu": 174.967, "Hf": 178.49,
+    "Ta": 180.948, "W": 183.84, "Re": 186.207, "Os": 190.23, "Ir": 192.217, "Pt": 195.078,
+    "Au": 196.967, "Hg": 200.59, "Tl": 204.383, "Pb": 207.2, "Bi": 208.98, "Po": 209.0, "At": 210.0,
+    "Rn": 222.0, "Fr": 223.0, "Ra": 226.0, "Ac": 227.0, "Th": 232.038, "Pa": 231.036, "U": 238.029,
+    "Np": 237.0, "Pu": 244.0, "Am": 243.0, "Cm": 247.0, "Bk": 247.0, "Cf": 251.0, "Es": 252.0,
+    "Fm": 257.0, "Md": 258.0, "No": 259.0, "Lr": 262.0, "Rf": 267.0, "Db": 268.0, "Sg": 269.0,
+    "Bh": 270.0, "Hs": 269.0, "Mt": 278.0, "Ds": 281.0, "Rg": 281.0, "Cn": 285.0, "Nh": 284.0,
+    "Fl": 289.0, "Mc": 288.0, "Lv": 293.0, "Ts": 292.0, "Og": 294.0,
+    "*": 0.0,
+}
+_ELEMENTS = frozenset(_ATOMIC_WEIGHTS)
+
+# Exact masses of common labelling isotopes; others weigh their mass number, as in RDKit
+_ISOTOPE_MASSES = {
+    ("H", 1): 1.0078, ("H", 2): 2.0141, ("H", 3): 3.016, ("B", 10): 10.0129, ("B", 11): 11.0093,
+    ("C", 11): 11.0114, ("C", 12): 12.0, ("C", 13): 13.0034, ("C", 14): 14.0032, ("N", 13): 13.0057,
+    ("N", 14): 14.0031, ("N", 15): 15.0001, ("O", 15): 15.0031, ("O", 16): 15.9949,
+    ("O", 17): 16.9991, ("O", 18): 17.9992, ("F", 18): 18.0009, ("F", 19): 18.9984,
+    ("Si", 28): 27.9769, ("Si", 29): 28.9765, ("Si", 30): 29.9738, ("P", 31): 30.9738,
+    ("P", 32): 31.9739, ("P", 33): 32.9717, ("S", 32): 31.9721, ("S", 33): 32.9715,
+    ("S", 34): 33.9679, ("S", 35): 34.969, ("S", 36): 35.9671, ("Cl", 35): 34.9689,
+    ("Cl", 36): 35.9683, ("Cl", 37): 36.9659, ("Br", 76): 75.9245, ("Br", 79): 78.9183,
+    ("Br", 81): 80.9163, ("Br", 82): 81.9168, ("I", 123): 122.9056, ("I", 124): 123.9062,
+    ("I", 125): 124.9046, ("I", 127): 126.9045, ("I", 131): 130.9061,
+}
+
+_BOND_ORDERS = {"-": 1.0, "=": 2.0, "#": 3.0, "$": 4.0, ":": 1.5, "/": 1.0, "\\": 1.0}
+
+# Default valences for the SMILES organic subset
+_DEFAULT_VALENCE = {
+    "B": (3,), "C": (4,), "N": (3, 5), "O": (2,), "P": (3, 5), "S": (2, 4, 6),
+    "F": (1,), "Cl": (1,), "Br": (1,), "I": (1,),
+}
+
+# Highest valence RDKit accepts for neutral atoms (stricter than OpenSMILES for N)
+_MAX_NEUTRAL_VALENCE = {
+    "B": 3, "C": 4, "N": 3, "O": 2, "P": 7, "S": 6, "F": 1, "Cl": 1, "Br": 1, "I": 1,
+}
+
+
+def _parse_charge(text: Optional[str]) -> int:
+    if not text:
+        return 0
+    sign = 1 if text[0] == "+" else -1
+    digits = text.lstrip("+-")
+    if digits:
+        return sign * int(digits)
+    return sign * len(text)
+
+
+def _parse_atom(token: str) -> Atom:
+    if token.startswith("["):
+        match = _BRACKET_RE.match(token)
+        if not match:
+            raise SmilesParseError(f"Invalid bracket atom {token}")
+        isotope_text, symbol, _, h_text, charge_text, _ = match.groups()
+        aromatic = symbol.islower()
+        element = symbol.capitalize()
+        if element not in _ELEMENTS:
+            raise SmilesParseError(f"Unknown element {symbol}")
+        if h_text:
+            explicit_h = int(h_text[1:]) if len(h_text) > 1 else 1
+        else:
+            explicit_h = 0
+        return Atom(
+            element=element,
+            aromatic=aromatic,
+            charge=_parse_charge(charge_text),
+            explicit_h=explicit_h,
+            isotope=int(isotope_text) if isotope_text else None
+        )
+
+    aromatic = token.islower()
+    return Atom(element=token.capitalize(), aromatic=aromatic)
+
+
+def _bond_order(symbol: Optional[str]) -> Optional[float]:
+    """Explicit bond order, or None where it follows from the atoms (directional bonds included)."""
+    if symbol is None or symbol in ("/", "\\"):
+        return None
+    return _BOND_ORDERS[symbol]
+
+
+def parse_smiles(smiles: str) -> Molecule:
+    """
+    Parse a SMILES string into a Molecule graph.
+
+    Args:
+        smiles: SMILES string
+
+    Returns:
+        Parsed Molecule with hydrogen counts and ring membership resolved
+
+    Raises:
+        SmilesParseError: If the string is not valid SMILES
+    """
+    if not smiles or not smiles.strip():
+        raise SmilesParseError("Empty SMILES string")
+
+    atoms: list[Atom] = []
+    bonds: list[list] = []  # [begin, end, order or None (implicit)]
+    branch_stack: list[Optional[int]] = []
+    ring_open: dict[str, tuple[int, Optional[str]]] = {}
+    prev: Optional[int] = None
+    pending_bond: Optional[str] = None
+    last = None  # Kind of the previous token: "atom", "ring", "(", ")", "." or "bond"
+
+    position = 0
+    for match in _TOKEN_RE.finditer(smiles):
+        if match.start() != position:
+            raise SmilesParseError(f"Unexpected character at position {position}")
+        position = match.end()
+        token = match.group(0)
+
+        if token == "(":
+            if last not in ("atom", "ring", ")") or pending_bond:
+                raise SmilesParseError(f"Misplaced branch at position {match.start()}")
+            branch_stack.append(prev)
+            last = "("
+        elif token == ")":
+            if not branch_stack:
+                raise SmilesParseError("Unbalanced parenthesis")
+            if last in ("(", "bond", "."):
+                raise SmilesParseError(f"Empty branch or dangling bond at position {match.start()}")
+            prev = branch_stack.pop()
+            last = ")"
+        elif token == ".":
+            if last not in ("atom", "ring", ")") or branch_stack:
+                raise SmilesParseError(f"Misplaced '.' at position {match.start()}")
+            prev = None
+            last = "."
+        elif token in _BOND_ORDERS:
+            if last not in ("atom", "ring", "(", ")"):
+                raise SmilesParseError(f"Misplaced bond at position {match.start()}")
+            pending_bond = token
+            last = "bond"
+        elif token[0].isdigit() or token[0] == "%":
+            if last not in ("atom", "ring", ")", "bond") or prev is None:
+                raise SmilesParseError(f"Misplaced ring closure at position {match.start()}")
+            label = token.lstrip("%")
+            if label in ring_open:
+                other, other_bond = ring_open.pop(label)
+                if other == prev or any({begin, end} == {other, prev} for begin, end, _ in bonds):
+                    raise SmilesParseError(f"Ring closure {token} duplicates a bond")
+                bonds.append([other, prev, _bond_order(pending_bond or other_bond)])
+            else:
+                ring_open[label] = (prev, pending_bond)
+            pending_bond = None
+            last = "ring"
+        else:
+            atoms.append(_parse_atom(token))
+            index = len(atoms) - 1
+            if prev is not None:
+                bonds.append([prev, index, _bond_order(pending_bond)])
+            prev = index
+            pending_bond = None
+            last = "atom"
+
+    if position != len(smiles):
+        raise SmilesParseError(f"Unexpected character at position {position}")
+    if ring_open:
+        raise SmilesParseError("Unclosed ring")
+    if branch_stack:
+        raise SmilesParseError("Unbalanced parenthesis")
+    if pending_bond:
+        raise SmilesParseError("Dangling bond")
+    if last == ".":
+        raise SmilesParseError("Trailing '.'")
+
+    mol = Molecule(smiles=smiles, atoms=atoms, bonds=[])
+    mol.ring_bonds = _find_ring_bonds(len(atoms), bonds)
+
+    for begin, end, order in bonds:
+        if order is None:
+            # Implicit bonds between aromatic atoms are aromatic only inside rings
+            both_aromatic = atoms[begin].aromatic and atoms[end].aromatic
+            order = 1.5 if both_aromatic and _bond_key(begin, end) in mol.ring_bonds else 1.0
+        mol.bonds.append((begin, end, order))
+        atoms[begin].neighbors.append((end, order))
+        atoms[end].neighbors.append((begin, order))
+
+    for begin, end in mol.ring_bonds:
+        atoms[begin].in_ring = True
+        atoms[end].in_ring = True
+    if any(atom.aromatic and not atom.in_ring for atom in atoms):
+        raise SmilesParseError("Non-ring atom marked aromatic")
+
+    for atom in atoms:
+        atom.num_h = _implicit_hydrogens(atom)
+        _check_valence(atom)
+    _check_kekulizable(atoms)
+
+    return mol
+
+
+def _bond_key(a: int, b: int) -> tuple[int, int]:
+    return (a, b) if a < b else (b, a)
+
+
+def _find_ring_bonds(num_atoms: int, bonds: list[list]) -> set[tuple[int, int]]:
+    """Return the set of ring bonds (every bond that is not a bridge)."""
+    adjacency: list[list[tuple[int, int]]] = [[] for _ in range(num_atoms)]
+    for bond_index, (begin, end, _) in enumerate(bonds):
+        adjacency[begin].append((end, bond_index))
+        adjacency[end].append((begin, bond_index))
+
+    discovery = [-1] * num_atoms
+    low = [0] * num_atoms
+    bridges: set[int] = set()
+    counter = 0
+
+    for root in range(num_atoms):
+        if discovery[root] != -1:
+            continue
+        discovery[root] = low[root] = counter
+        counter += 1
+        # Iterative DFS: (atom, parent bond index, neighbor iterator)
+        stack = [(root, -1, iter(adjacency[root]))]
+        while stack:
+            atom, parent_bond, neighbors = stack[-1]
+            advanced = False
+            for neighbor, bond_index in neighbors:
+                if bond_index == parent_bond:
+                    continue
+                if discovery[neighbor] == -1:
+                    discovery[neighbor] = low[neighbor] = counter
+                    counter += 1
+                    stack.append((neighbor, bond_index, iter(adjacency[neighbor])))
+                    advanced = True
+                    break
+                low[atom] = min(low[atom], discovery[neighbor])
+            if not advanced:
+                stack.pop()
+                if stack:
+                    parent = stack[-1][0]
+                    low[parent] = min(low[parent], low[atom])
+                    if low[atom] > discovery[parent]:
+                        bridges.add(parent_bond)
+
+    return {
+        _bond_key(begin, end)
+        for bond_index, (begin, end, _) in enumerate(bonds)
+        if bond_index not in bridges
+    }
+
+
+def _implicit_hydrogens(atom: Atom) -> int:
+    if atom.explicit_h is not None:
+        return atom.explicit_h
+
+    valences = _DEFAULT_VALENCE.get(atom.element)
+    if valences is None:
+        return 0
+
+    if atom.aromatic:
+        # Aromatic bonds count as single; C/N/B/P in an aromatic system contribute one pi electron
+        bond_sum = sum(1 if order == 1.5 else order for _, order in atom.neighbors)
+        in_system = any(order == 1.5 for _, order in atom.neighbors)
+        pi = 1 if in_system and atom.element in ("C", "N", "B", "P") else 0
+        return max(0, valences[0] - int(bond_sum) - pi)
+
+    bond_sum = sum(order for _, order in atom.neighbors)
+    for valence in valences:
+        if valence >= bond_sum:
+            return int(valence - bond_sum)
+    return 0
+
+
+def _check_valence(atom: Atom):
+    """Reject neutral non-aromatic atoms with more bonds than RDKit allows (e.g. [CH5], Cl(C)C)."""
+    limit = _MAX_NEUTRAL_VALENCE.get(atom.element)
+    if limit is None or atom.charge or atom.aromatic:
+        return
+    if sum(order for _, order in atom.neighbors) + atom.num_h > limit:
+        raise SmilesParseError(f"Explicit valence of {atom.element} exceeds {limit}")
+
+
+def _needs_double_bond(atom: Atom) -> bool:
+    """Whether an aromatic atom must take a double bond in the Kekulé structure."""
+    if not any(order == 1.5 for _, order in atom.neighbors):
+        return False  # Not part of an aromatic system
+    if any(order == 2.0 for _, order in atom.neighbors):
+        return False  # Exocyclic double bond, e.g. the c of a pyridone
+    # An unfilled valence left after the sigma bonds and hydrogens takes the double bond
+    if atom.element == "C":
+        valence = 4 - abs(atom.charge)
+    elif atom.element in ("N", "P", "As"):
+        valence = 3 + atom.charge
+    elif atom.element in ("O", "S", "Se", "Te"):
+        valence = 2 + atom.charge
+    elif atom.element == "B":
+        valence = 3 - atom.charge
+    else:
+        return False
+    return len(atom.neighbors) + atom.num_h < valence
+
+
+def _check_kekulizable(atoms: list[Atom]):
+    """
+    Reject aromatic systems without a Kekulé structure.
+
+    Every aromatic atom that needs a double bond must get exactly one, over
+    aromatic bonds to another such atom: a perfect matching, found by
+    backtracking with the most constrained atom first.
+
+    Raises:
+        SmilesParseError: If no such assignment exists (e.g. c1cccc1)
+    """
+    needing = {index for index, atom in enumerate(atoms) if atom.aromatic and _needs_double_bond(atom)}
+    if not needing:
+        return
+    partners = {
+        index: [other for other, order in atoms[index].neighbors if order == 1.5 and other in needing]
+        for index in needing
+    }
+
+    def match(unmatched: set[int]) -> bool:
+        if not unmatched:
+            return True
+        atom = min(unmatched, key=lambda i: sum(1 for j in partners[i] if j in unmatched))
+        for other in partners[atom]:
+            if other in unmatched and match(unmatched - {atom, other}):
+                return True
+        return False
+
+    if len(needing) % 2 or not match(needing):
+        raise SmilesParseError("Cannot kekulize aromatic system")
+
+
+# ============== Descriptors ==============
+
+_HALOGENS = ("F", "Cl", "Br", "I")
+_CRIPPEN_HETERO = ("N", "O", "P", "S", "F", "Cl", "Br", "I")
+_CRIPPEN_HALOGEN = {"F": 0.4202, "Cl": 0.6895, "Br": 0.8456, "I": 0.8857}
+_CRIPPEN_AROMATIC_HALOGEN = {"F": 0.0, "Cl": 0.245, "Br": 0.198, "I": 0.0}
+
+
+def molecular_weight(mol: Molecule) -> float:
+    """Average molecular weight in g/mol, including implicit hydrogens and isotope labels."""
+    total = 0.0
+    for atom in mol.atoms:
+        if atom.isotope:
+            total += _ISOTOPE_MASSES.get((atom.element, atom.isotope), float(atom.isotope))
+        else:
+            total += _ATOMIC_WEIGHTS[atom.element]
+        total += atom.num_h * _ATOMIC_WEIGHTS["H"]
+    return total
+
+
+def _is_aliphatic(atom: Atom, element: Optional[str] = None) -> bool:
+    return not atom.aromatic and (element is None or atom.element == element)
+
+
+def _crippen_carbon(mol: Molecule, atom: Atom) -> float:
+    nbrs = [(mol.atoms[i], order) for i, order in atom.neighbors]
+    h = atom.num_h
+    degree = len(nbrs) + h
+
+    if atom.aromatic:
+        for nbr, order in nbrs:
+            if order == 1.0 and not nbr.aromatic and nbr.element not in ("C", "N", "O", "S") + _HALOGENS and h == 0:
+                return -0.5443                                          # C13
+        for nbr, _ in nbrs:
+            if nbr.element in _CRIPPEN_AROMATIC_HALOGEN:
+                return _CRIPPEN_AROMATIC_HALOGEN[nbr.element]           # C14-C17
+        if h > 0:
+            return 0.1581                                               # C18
+        exo = [(nbr, order) for nbr, order in nbrs if order != 1.5]
+        if not exo:
+            return 0.2955                                               # C19
+        nbr, order = exo[0]
+        if order == 2.0 and nbr.element in ("C", "N", "O"):
+            return -0.8186                                              # C25
+        if nbr.aromatic:
+            return 0.2713                                               # C20
+        return {"C": 0.136, "N": 0.4619, "O": 0.5437, "S": 0.1893}.get(nbr.element, 0.08129)
+
+    single_aliphatic_c = sum(1 for nbr, order in nbrs if order == 1.0 and _is_aliphatic(nbr, "C"))
+    if h == 4 or (h == 3 and single_aliphatic_c == 1) or (h == 2 and single_aliphatic_c == 2):
+        return 0.1441                                                   # C1
+    if (h == 1 and single_aliphatic_c == 3) or (h == 0 and single_aliphatic_c == 4):
+        return 0.0                                                      # C2
+
+    all_single = all(order == 1.0 for _, order in nbrs)
+    hetero = any(_is_aliphatic(nbr) and nbr.element in _CRIPPEN_HETERO for nbr, _ in nbrs)
+    all_aliphatic = all(not nbr.aromatic for nbr, _ in nbrs)
+    if all_single and degree == 4 and hetero and all_aliphatic:
+        return -0.2035 if h >= 2 else -0.2051                           # C3 / C4
+
+    if any(order == 2.0 and _is_aliphatic(nbr) and nbr.element != "C" for nbr, order in nbrs):
+        return -0.2783                                                  # C5
+    double_c = [nbr for nbr, order in nbrs if order == 2.0 and nbr.element == "C"]
+    if double_c and all_aliphatic:
+        return 0.1551                                                   # C6
+    if any(order == 3.0 for _, order in nbrs):
+        return 0.0017                                                   # C7
+
+    if all_single and degree == 4 and any(nbr.aromatic for nbr, _ in nbrs):
+        if h == 3:
+            return 0.08452 if any(nbr.aromatic and nbr.element == "C" for nbr, _ in nbrs) else -0.1444
+        return {2: -0.0516, 1: 0.1193, 0: -0.0967}[h]                   # C10-C12
+
+    if double_c:
+        return 0.264                                                    # C26
+    if all_single and degree == 4 and any(nbr.element not in ("C",) + _CRIPPEN_HETERO for nbr, _ in nbrs):
+        return 0.2148                                                   # C27
+    return 0.08129                                                      # CS
+
+
+def _crippen_nitrogen(mol: Molecule, atom: Atom) -> float:
+    nbrs = [(mol.atoms[i], order) for i, order in atom.neighbors]
+    h = atom.num_h
+
+    if atom.aromatic:
+        return -0.3239 if atom.charge == 0 else -1.119                  # N11 / N12
+    if atom.charge > 0:
+        if h > 0:
+            return -1.95                                                # N10
+        if any(order == 3.0 for _, order in nbrs):
+            return 0.2887                                               # N14
+        return -0.3396                                                  # N13
+    if atom.charge < 0:
+        return 0.2887                                                   # N14
+
+    aromatic_nbrs = sum(1 for nbr, _ in nbrs if nbr.aromatic)
+    orders = sorted(order for _, order in nbrs)
+    if h == 2 and len(nbrs) == 1:
+        return -1.027 if aromatic_nbrs else -1.019                      # N3 / N1
+    if h == 1 and orders == [1.0, 1.0]:
+        return -0.5188 if aromatic_nbrs else -0.7096                    # N4 / N2
+    if h == 1 and orders == [2.0]:
+        return 0.08387                                                  # N5
+    if h == 0 and orders == [1.0, 2.0]:
+        return 0.1836                                                   # N6
+    if h == 0 and orders == [1.0, 1.0, 1.0]:
+        return -0.4458 if aromatic_nbrs else -0.3187                    # N8 / N7
+    if orders == [3.0]:
+        return 0.01508                                                  # N9
+    return -0.4806                                                      # NS
+
+
+def _crippen_oxygen(mol: Molecule, atom: Atom) -> float:
+    nbrs = [(mol.atoms[i], order) for i, order in atom.neighbors]
+
+    if atom.aromatic:
+        return 0.1552                                                   # O1
+    if atom.num_h > 0 and atom.charge == 0:
+        return -0.2893                                                  # O2
+    if len(nbrs) == 2 and all(order == 1.0 for _, order in nbrs):
+        if any(nbr.aromatic for nbr, _ in nbrs):
+            return -0.4195                                              # O4
+        return -0.0684                                                  # O3
+    if atom.charge < 0:
+        nbr = nbrs[0][0] if nbrs else None
+        if nbr is not None and nbr.element == "N":
+            return 0.0335                                               # O5
+        if nbr is not None and nbr.element == "S":
+            return -0.3339                                              # O6
+        if nbr is not None and nbr.element == "C" and any(
+            order == 2.0 and mol.atoms[i].element == "O" for i, order in nbr.neighbors
+        ):
+            return -1.326                                               # O12
+        return -1.189                                                   # O7
+    if len(nbrs) == 1 and nbrs[0][1] == 2.0:
+        nbr = nbrs[0][0]
+        if nbr.element in ("N", "O"):
+            return 0.0335                                               # O5
+        if nbr.element == "S":
+            return -0.3339                                              # O6
+        if nbr.aromatic:
+            return 0.1788                                               # O8
+        if nbr.element == "C":
+            others = [mol.atoms[i] for i, _ in nbr.neighbors if mol.atoms[i] is not atom]
+            if nbr.num_h == 2 or (others and all(not o.aromatic for o in others) and (
+                any(o.element == "C" for o in others)
+                or (nbr.num_h == 1 and others[0].element in ("N", "O"))
+            )):
+                return -0.1526                                          # O9
+            if any(o.aromatic for o in others) and any(o.element == "C" for o in others):
+                return 0.1129                                           # O10
+            if len(others) == 2 and all(o.element != "C" for o in others):
+                return 0.4833                                           # O11
+    return -0.1188                                                      # OS
+
+
+def _crippen_sulfur(mol: Molecule, atom: Atom) -> float:
+    if atom.aromatic:
+        return 0.6237                                                   # S3
+    if atom.charge != 0:
+        return -0.0024                                                  # S2
+    for i, order in atom.neighbors:
+        if order == 2.0 and mol.atoms[i].element in ("N", "O", "P", "S"):
+            return -0.0024                                              # S2
+    return 0.6482                                                       # S1
+
+
+def _crippen_hydrogen(mol: Molecule, atom: Atom) -> float:
+    element = atom.element
+    if element == "C":
+        return 0.123                                                    # H1
+    if element == "N":
+        return 0.2142                                                   # H3
+    if element == "O" and not atom.aromatic:
+        nbrs = [(mol.atoms[i], order) for i, order in atom.neighbors]
+        if not nbrs:
+            return -0.2677                                              # H2 (water)
+        nbr = nbrs[0][0]
+        if nbr.element == "C" and nbr.aromatic:
+            return -0.2677                                              # H2
+        if nbr.element == "C":
+            if any(order == 2.0 for _, order in nbr.neighbors):
+                return 0.298                                            # H4
+            return -0.2677                                              # H2
+        if nbr.element == "N":
+            return 0.2142 if not nbr.aromatic else -0.2677              # H3 / H2
+        if nbr.element in ("O", "S") and not nbr.aromatic:
+            return 0.298                                                # H4
+        return -0.2677                                                  # H2
+    return -0.2677                                                      # H2 (other heteroatoms)
+
+
+def crippen_logp(mol: Molecule) -> float:
+    """Estimate LogP by summing Wildman-Crippen atom-type contributions."""
+    total = 0.0
+    for atom in mol.atoms:
+        element = atom.element
+        if element == "C":
+            total += _crippen_carbon(mol, atom)
+        elif element == "N":
+            total += _crippen_nitrogen(mol, atom)
+        elif element == "O":
+            total += _crippen_oxygen(mol, atom)
+        elif element == "S":
+            total += _crippen_sulfur(mol, atom)
+        elif element in _CRIPPEN_HALOGEN:
+            total += _CRIPPEN_HALOGEN[element] if atom.charge == 0 else -2.996
+        elif element == "P":
+            total += 0.8612
+        else:
+            total += -0.3808
+        if atom.num_h:
+            total += atom.num_h * _crippen_hydrogen(mol, atom)
+    return total
+
+
+def _tpsa_contribution(mol: Molecule, atom: Atom) -> float:
+    orders = sorted(order for _, order in atom.neighbors)
+    h = atom.num_h
+    charge = atom.charge
+    in_3_ring = atom.in_ring and _in_three_ring(mol, atom)
+
+    if atom.element == "O":
+        if atom.aromatic:
+            return 13.14
+        if charge < 0:
+            return 23.06
+        if h == 1:
+            return 20.23
+        if h == 2:
+            return 20.23
+        if orders == [2.0]:
+            return 17.07
+        if orders == [1.0, 1.0]:
+            return 12.53 if in_3_ring else 9.23
+        return 0.0
+
+    if atom.element == "N":
+        if atom.aromatic:
+            aromatic_bonds = orders.count(1.5)
+            if charge > 0:
+                return 14.14 if h else (4.10 if aromatic_bonds == 3 else 3.88)
+            if h:
+                return 15.79
+            if aromatic_bonds == 3:
+                return 4.41
+            if 2.0 in orders:
+                return 8.39
+            if 1.0 in orders:
+                return 4.93
+            return 12.89
+        if charge > 0:
+            if h == 3:
+                return 27.64
+            if h == 2:
+                return 25.59 if 2.0 in orders else 16.61
+            if h == 1:
+                return 13.97 if 2.0 in orders else 4.44
+            if 3.0 in orders:
+                return 4.36
+            if 2.0 in orders:
+                return 3.01
+            return 0.0
+        if h == 2:
+            return 26.02 if orders == [1.0] else 23.85
+        if h == 1:
+            if orders == [2.0]:
+                return 23.85
+            return 21.94 if in_3_ring else 12.03
+        if orders == [3.0]:
+            return 23.79
+        if orders == [1.0, 2.0]:
+            return 12.36
+        if orders == [1.0, 2.0, 2.0]:
+            return 11.68
+        if orders == [2.0, 3.0]:
+            return 13.60
+        if orders == [1.0, 1.0, 1.0]:
+            return 3.01 if in_3_ring else 3.24
+        return 3.24
+
+    return 0.0
+
+
+def _in_three_ring(mol: Molecule, atom: Atom) -> bool:
+    nbr_ids = [i for i, _ in atom.neighbors]
+    for a_pos, a in enumerate(nbr_ids):
+        for b in nbr_ids[a_pos + 1:]:
+            if any(i == b for i, _ in mol.atoms[a].neighbors):
+                return True
+    return False
+
+
+def tpsa(mol: Molecule) -> float:
+    """Topological polar surface area from N and O fragment contributions."""
+    return sum((_tpsa_contribution(mol, atom) for atom in mol.atoms if atom.element in ("N", "O")), 0.0)
+
+
+def _valence(atom: Atom) -> float:
+    return sum(1 if order == 1.5 else order for _, order in atom.neighbors) + atom.num_h + (
+        1 if atom.aromatic and atom.element in ("C", "N") else 0
+    )
+
+
+def num_h_donors(mol: Molecule) -> int:
+    """Count H-bond donors (N-H, neutral O-H / S-H, aromatic n-H)."""
+    count = 0
+    for atom in mol.atoms:
+        if atom.num_h == 0:
+            continue
+        if atom.element == "N":
+            count += 1
+        elif atom.element in ("O", "S") and atom.num_h == 1 and atom.charge == 0:
+            count += 1
+    return count
+
+
+def num_h_acceptors(mol: Molecule) -> int:
+    """Count H-bond acceptors (O/S, non-amide trivalent N, pyridine-type n, aromatic o/s)."""
+    count = 0
+    for index, atom in enumerate(mol.atoms):
+        element = atom.element
+        if element in ("O", "S") and not atom.aromatic:
+            if atom.charge < 0:
+                count += 1
+            elif atom.num_h == 1 and _valence(atom) == 2:
+                # Exclude acid-like OH attached to X=O/N/P/S
+                nbr = mol.atoms[atom.neighbors[0][0]] if atom.neighbors else None
+                if nbr is None or not any(
+                    order == 2.0 and mol.atoms[i].element in ("O", "N", "P", "S")
+                    for i, order in nbr.neighbors
+                ):
+                    count += 1
+            elif atom.num_h == 0 and _valence(atom) == 2:
+                count += 1
+        elif element in ("O", "S") and atom.aromatic and atom.charge == 0:
+            count += 1
+        elif element == "N":
+            if atom.aromatic:
+                # Pyridine-type only; substituted/pyrrole-type n has no free lone pair
+                if atom.num_h == 0 and atom.charge == 0 and len(atom.neighbors) == 2:
+                    count += 1
+            elif atom.charge == 0 and _valence(atom) == 3 and not _is_amide_like_n(mol, index):
+                count += 1
+    return count
+
+
+def _is_amide_like_n(mol: Molecule, index: int) -> bool:
+    for nbr_index, order in mol.atoms[index].neighbors:
+        if order != 1.0:
+            continue
+        for other, other_order in mol.atoms[nbr_index].neighbors:
+            if other_order == 2.0 and mol.atoms[other].element in ("O", "N", "P", "S"):
+                if _bond_key(nbr_index, other) not in mol.ring_bonds:
+                    return True
+    return False
+
+
+def _is_rigid_terminal_group(mol: Molecule, index: int) -> bool:
+    """True for CX3 trihalomethyl and tert-butyl carbons, whose rotation is degenerate."""
+    atom = mol.atoms[index]
+    if atom.element != "C" or atom.aromatic or len(atom.neighbors) != 4:
+        return False
+    for element in ("F", "Cl", "Br"):
+        if sum(1 for i, _ in atom.neighbors if mol.atoms[i].element == element) == 3:
+            return True
+    methyls = sum(
+        1 for i, _ in atom.neighbors
+        if mol.atoms[i].element == "C" and len(mol.atoms[i].neighbors) == 1 and mol.atoms[i].num_h == 3
+    )
+    return methyls == 3
+
+
+def _is_amide_like_bond(mol: Molecule, begin: int, end: int) -> bool:
+    """True for the C-X single bond of amides, esters and thioesters."""
+    for carbon, hetero in ((begin, end), (end, begin)):
+        c, x = mol.atoms[carbon], mol.atoms[hetero]
+        if c.element != "C" or len(c.neighbors) != 3 or x.element not in ("N", "O", "S"):
+            continue
+        if len(x.neighbors) < 2:
+            continue
+        if any(order == 2.0 and mol.atoms[i].element in ("N", "O", "S") for i, order in c.neighbors):
+            return True
+    return False
+
+
+def num_rotatable_bonds(mol: Molecule) -> int:
+    """Count rotatable bonds using RDKit's strict definition."""
+    count = 0
+    for begin, end, order in mol.bonds:
+        if order != 1.0 or _bond_key(begin, end) in mol.ring_bonds:
+            continue
+        a, b = mol.atoms[begin], mol.atoms[end]
+        if len(a.neighbors) < 2 or len(b.neighbors) < 2:
+            continue
+        if any(o == 3.0 for _, o in a.neighbors) or any(o == 3.0 for _, o in b.neighbors):
+            continue
+        if _is_rigid_terminal_group(mol, begin) or _is_rigid_terminal_group(mol, end):
+            continue
+        if _is_amide_like_bond(mol, begin, end):
+            continue
+        count += 1
+    return count
+
+
+# ============== Fingerprints ==============
+
+def _stable_hash(values: tuple) -> int:
+    return zlib.crc32(repr(values).encode())
+
+
+def morgan_bits(mol: Molecule, radius: int = 2, n_bits: int = 2048) -> list[int]:
+    """
+    Compute on-bit positions of an ECFP-style circular fingerprint.
+
+    Atom identifiers start from (element, degree, H count, charge, ring,
+    aromatic) invariants and are iteratively rehashed with the sorted
+    (bond order, neighbor identifier) pairs, as in the Morgan algorithm.
+    """
+    identifiers = [
+        _stable_hash((atom.element, len(atom.neighbors), atom.num_h, atom.charge, atom.in_ring, atom.aromatic))
+        for atom in mol.atoms
+    ]
+    features = set(identifiers)
+    for _ in range(radius):
+        identifiers = [
+            _stable_hash((identifiers[index], tuple(sorted(
+                (order, identifiers[nbr]) for nbr, order in atom.neighbors
+            ))))
+            for index, atom in enumerate(mol.atoms)
+        ]
+        features.update(identifiers)
+    return sorted({feature % n_bits for feature in features})
@@ -23,8 +23,73 @@ class Settings(BaseSettings):
     chroma_persist_dir: str = str(base_dir / "data" / "chroma_db")
     chroma_collection_name: str = "physio_rules"
 
+    # Physio rule vector search: "chroma", "numpy" (in-process index) or "auto" (Chroma if installed)
+    physio_vector_backend: str = "auto"
+    physio_vector_quantize: bool = False  # int8 embeddings in the NumPy index
+
+    # Physio query cache: profiles are bucketed (pH / temperature steps) before embedding
+    physio_query_cache_size: int = 4096
+    physio_query_cache_ttl: float = 600.0
+    physio_query_ph_step: float = 0.1
+    physio_query_temperature_step: float = 0.1
+
+    # Molecular descriptors: "auto" (RDKit if installed), "rdkit", or "python"
+    descriptor_backend: str = "auto"
+
+    # Molecular property cache (canonical SMILES -> descriptors)
+    molecular_cache_size: int = 4096
+    descriptor_cache_path: Path = data_dir / "ingredients.descriptors.json"
+
+    # Compiled binary datasets (python -m app.core.knowledge_pack build)
+    knowledge_pack_path: Path = data_dir / "knowledge.pack"
+
+    # Structural similarity (Morgan fingerprint) index
+    fingerprint_bits: int = 2048
+    fingerprint_radius: int = 2
+
+    # Batch molecular analysis process pool
+    molecular_pool_workers: int = 0  # 0 = one per CPU
+    molecular_pool_prewarm: bool = False  # Spawn workers at app startup
+    molecular_batch_chunk_size: int = 256
+    molecular_batch_max_size: int = 50000
+
+    # Allergy-safe ingredient pools cached per allergy combination
+    safe_pool_cache_size: int = 256
+
+    # Minimum fuzzy score (Dice over the distinctive words) when grounding free-text ingredient names
+    name_match_min_score: float = 0.7
+
+    # Memoized IFRA standards lookups per ingredient name
+    ifra_match_cache_size: int = 4096
+
+    # Batch IFRA validation: formulas per vectorized chunk / per request
+    ifra_batch_chunk_size: int = 2000
+    ifra_batch_max_size: int = 50000
+
+    # Interactive IFRA validation sessions
+    ifra_session_ttl: float = 1800.0  # Idle seconds before a session expires
+    ifra_session_max: int = 1000
+
+    # Cap materials with critical IFRA violations in generated formulas
+    ifra_auto_correct: bool = True
+
+    # Dataset hot reload: poll data files every N seconds (0 = disabled; POST /admin/reload still works)
+    dataset_poll_interval: float = 0.0
+    admin_token: Optional[str] = None  # /admin endpoints are refused until this is set
+
     # Embedding Model
     embedding_model: str = "all-MiniLM-L6-v2"
+    embedding_cache_dir: Path = data_dir / "embeddings"  # Persistent rule embeddings, by content hash
+
+    # Micro-batching of concurrent query embeddings
+    embedding_batching: bool = True
+    embedding_batch_max_size: int = 32
+    embedding_batch_max_wait_ms: float = 3.0
+
+    # Embedding sidecar (python -m app.core.embedding_sidecar); None = load the model in every worker
+    embedding_socket: Optional[str] = None
+    embedding_socket_timeout: float = 10.0
+    embedding_socket_retry: float = 30.0  # Seconds on the in-process fallback before retrying the sidecar
 
     # OpenAI Configuration
     openai_api_key: Optional[str] = None
@@ -95,6 +95,8 @@ class AetherAgent:
 
     def __init__(self, user_profile: UserProfile):
         self.user_profile = user_profile
+        # Pin one catalog snapshot so every lookup sees the same version
+        self.catalog = ingredient_db.snapshot()
         self.applicable_rules: list[PhysioRule] = []
         self.formula: Optional[Formula] = None
 
@@ -145,18 +147,15 @@ class AetherAgent:
     ) -> Formula:
         """Generate base formula from ingredient database."""
         formula = Formula()
-        all_ingredients = ingredient_db.get_all()
 
-        # Filter by allergies first
-        safe_ingredients = ingredient_db.get_safe_for_allergies(
-            self.user_profile.allergies
-        )
+        # Filter by allergies first (cached per allergy combination)
+        safe_pool = self.catalog.get_safe_pool(self.user_profile.allergies)
 
         # Select ingredients by note type
         # Standard ratio: 20% top, 35% middle, 45% base
-        top_notes = [i for i in safe_ingredients if i.note_type == "top"]
-        middle_notes = [i for i in safe_ingredients if i.note_type == "middle"]
-        base_notes = [i for i in safe_ingredients if i.note_type == "base"]
+        top_notes = list(safe_pool.note_type("top"))
+        middle_notes = list(safe_pool.note_type("middle"))
+        base_notes = list(safe_pool.note_type("base"))
 
         # Apply scent preferences if provided
         if scent_preferences:
@@ -195,16 +194,10 @@ class AetherAgent:
         return formula
 
     def _filter_by_preferences(self, ingredients: list[Ingredient], preferences: list[str]) -> list[Ingredient]:
-        """Filter ingredients by scent preferences."""
-        matched = []
-        for ing in ingredients:
-            for pref in preferences:
-                pref_lower = pref.lower()
-                if (pref_lower in ing.family.lower() or
-                    any(pref_lower in d.lower() for d in ing.descriptors)):
-                    matched.append(ing)
-                    break
-        return matched
+        """Filter ingredients by scent preferences, best matches first."""
+        ranked = self.catalog.search_descriptors(preferences, include_family=True)
+        candidates = {ing.id for ing in ingredients}
+        return [ing for ing, _ in ranked if ing.id in candidates]
 
     def _va_to_description(self, valence: float, arousal: float) -> str:
         """Convert Valence-Arousal to scent description."""
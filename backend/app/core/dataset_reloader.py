@@ -0,0 +1,144 @@
+"""
+Background reloading of the ingredient, IFRA and physio datasets.
+
+Each dataset owner (ingredient_db, ifra_validator, physio_rag) builds a new
+immutable snapshot off to the side and installs it with one reference swap,
+so requests in flight keep the snapshot they started with. This module only
+decides when to rebuild: on file changes (mtime/size polling) or on demand.
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from app.config import settings
+from app.chemistry.ingredient_db import ingredient_db
+from app.chemistry.ifra_validator import ifra_validator
+from app.core.physio_rag import physio_rag
+
+
+DATASETS = {
+    "ingredients": ("ingredients.json", ingredient_db),
+    "ifra": ("ifra_standards.json", ifra_validator),
+    "physio_rules": ("physio_rules.json", physio_rag),
+}
+
+
+class DatasetReloader:
+    """
+    Rebuilds dataset snapshots when their source files change.
+
+    Rebuilds are serialized with a lock; readers never take it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: dict[str, Optional[tuple[int, int]]] = {}
+        self._reloaded_at: dict[str, float] = {}
+        self._errors: dict[str, str] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @staticmethod
+    def _path(name: str) -> Path:
+        return settings.data_dir / DATASETS[name][0]
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[tuple[int, int]]:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def reload(self, names: Optional[list[str]] = None, force: bool = False) -> dict[str, bool]:
+        """
+        Rebuild datasets and swap in the new snapshots.
+
+        Args:
+            names: Datasets to reload (default: all)
+            force: Rebuild even when the file content is unchanged
+
+        Returns:
+            Dict of dataset name -> whether a new snapshot was installed
+
+        Raises:
+            KeyError: If a dataset name is unknown
+        """
+        names = list(names or DATASETS)
+        for name in names:
+            if name not in DATASETS:
+                raise KeyError(name)
+
+        with self._lock:
+            return self._reload_locked(names, force)
+
+    def check(self) -> dict[str, bool]:
+        """Reload only the datasets whose files changed since the last check."""
+        # Polling and the admin API may check concurrently; the file stats
+        # are only read and updated under the lock
+        with self._lock:
+            changed = [
+                name for name in DATASETS
+                if name in self._stats and self._stat(self._path(name)) != self._stats[name]
+            ]
+            # First check just records the baseline
+            for name in DATASETS:
+                self._stats.setdefault(name, self._stat(self._path(name)))
+            return self._reload_locked(changed, force=False) if changed else {}
+
+    def _reload_locked(self, names: list[str], force: bool) -> dict[str, bool]:
+        """Rebuild datasets; the caller holds self._lock."""
+        results = {}
+        for name in names:
+            owner = DATASETS[name][1]
+            self._stats[name] = self._stat(self._path(name))
+            try:
+                results[name] = owner.reload(force=force)
+            except Exception as e:
+                # Keep serving the previous snapshot
+                self._errors[name] = str(e)
+                results[name] = False
+                continue
+            self._errors.pop(name, None)
+            if results[name]:
+                self._reloaded_at[name] = time.time()
+        return results
+
+    def status(self) -> dict[str, dict]:
+        """Current version, last reload time and last error of each dataset."""
+        return {
+            name: {
+                "file": filename,
+                "version": owner.version,
+                "reloaded_at": self._reloaded_at.get(name),
+                "error": self._errors.get(name),
+            }
+            for name, (filename, owner) in DATASETS.items()
+        }
+
+    def start(self, interval: float):
+        """Start polling the dataset files in a daemon thread."""
+        if self._thread is not None or interval <= 0:
+            return
+        self._stop.clear()
+        self.check()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="dataset-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the polling thread."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def _run(self, interval: float):
+        while not self._stop.wait(interval):
+            self.check()
+
+
+# Singleton instance
+dataset_reloader = DatasetReloader()
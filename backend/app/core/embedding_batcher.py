@@ -0,0 +1,148 @@
+"""
+Micro-batching front end for a text embedder.
+
+Concurrent queries each need one embedding, and encoding them one by one
+wastes most of a transformer forward pass. The batcher queues texts, and a
+worker thread takes whatever arrives within a short window (or until the
+batch is full) and encodes it in one call, resolving each caller's future.
+Callers block on the future (sync) or await it via asyncio.wrap_future.
+
+Batch sizes, queueing delays and encode times are recorded in histograms
+for tuning the window and batch size.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from app.config import settings
+
+Encoder = Callable[[list[str]], list[list[float]]]
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+MILLISECOND_BUCKETS = (0.5, 1, 2, 5, 10, 20, 50, 100, 250, 1000)
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus style); thread-safe."""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)  # Last slot: above the largest bucket
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._counts[bisect_left(self.buckets, value)] += 1
+            self._sum += value
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        count = sum(counts)
+        cumulative, running = {}, 0
+        for bound, n in zip(self.buckets, counts):
+            running += n
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = count
+        return {"buckets": cumulative, "count": count, "sum": total, "mean": total / count if count else 0.0}
+
+
+class MicroBatcher:
+    """Collects embedding requests into batches encoded on one worker thread."""
+
+    def __init__(
+        self,
+        encode: Encoder,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None
+    ):
+        """
+        Args:
+            encode: Embeds a list of texts, one vector per text
+            max_batch_size: Most texts per encode call
+            max_wait_ms: How long the first text of a batch waits for company
+        """
+        self._encode = encode
+        self.max_batch_size = max_batch_size or settings.embedding_batch_max_size
+        self.max_wait = (settings.embedding_batch_max_wait_ms if max_wait_ms is None else max_wait_ms) / 1000
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.wait_ms = Histogram(MILLISECOND_BUCKETS)
+        self.encode_ms = Histogram(MILLISECOND_BUCKETS)
+
+    def submit(self, text: str) -> Future:
+        """Queue a text; the future resolves to its embedding."""
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def embed(self, text: str) -> list[float]:
+        """Embedding of one text, blocking until its batch is encoded."""
+        return self.submit(text).result()
+
+    async def aembed(self, text: str) -> list[float]:
+        """Embedding of one text, awaiting its batch without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(text))
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queued": self._queue.qsize(),
+            "batch_size": self.batch_sizes.to_dict(),
+            "wait_ms": self.wait_ms.to_dict(),
+            "encode_ms": self.encode_ms.to_dict(),
+        }
+
+    def _ensure_worker(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> list[tuple[str, Future, float]]:
+        """Block for one request, then gather more until the window closes or the batch is full."""
+        batch = [self._queue.get()]
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # Callers that gave up (cancelled futures) are dropped from the batch
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            for _, _, enqueued in batch:
+                self.wait_ms.observe((started - enqueued) * 1000)
+            self.batch_sizes.observe(len(batch))
+            try:
+                vectors = self._encode([text for text, _, _ in batch])
+            except BaseException as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            finally:
+                self.encode_ms.observe((time.perf_counter() - started) * 1000)
+            for (_, future, _), vector in zip(batch, vectors):
+                future.set_result(vector)
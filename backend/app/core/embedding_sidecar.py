@@ -0,0 +1,228 @@
+"""
+Embedding sidecar: one sentence-transformers model per host, shared over a
+Unix socket.
+
+Every worker that embeds in-process loads its own copy of the model
+(hundreds of MB of RSS and seconds of load time each). Run the sidecar once
+per host and point the workers at it with settings.embedding_socket; their
+SentenceTransformerEmbedding then sends texts over the socket and only
+loads the model itself if the sidecar is unreachable. Requests from all
+workers go through one MicroBatcher, so concurrent queries share forward
+passes.
+
+Protocol: length-prefixed frames (u32 big-endian length, then payload).
+A request is one JSON frame, {"op": "encode", "model": ..., "texts": [...]}
+or {"op": "info"}. The reply is a JSON header frame ({"shape": [n, d]}, or
+{"error": ...}) followed, for encode, by one frame of little-endian float32
+vectors.
+
+Run from backend/:
+    python -m app.core.embedding_sidecar [--socket PATH] [--model NAME]
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.config import settings
+from app.core.embedding_batcher import MicroBatcher
+
+_LENGTH = struct.Struct(">I")
+MAX_FRAME = 256 << 20
+
+
+class EmbeddingServerError(Exception):
+    """The sidecar answered with an error (e.g. a different model)."""
+
+
+def _send_frame(sock: socket.socket, payload: bytes):
+    sock.sendall(_LENGTH.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Embedding sidecar closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_frame(sock: socket.socket) -> bytes:
+    (size,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+    if size > MAX_FRAME:
+        raise ConnectionError(f"Frame of {size} bytes exceeds the limit")
+    return _recv_exact(sock, size)
+
+
+class EmbeddingClient:
+    """
+    Client of the embedding sidecar.
+
+    Keeps one connection per thread and reconnects once on a broken
+    connection. Thread-safe.
+    """
+
+    def __init__(self, socket_path: str, model_name: str, timeout: Optional[float] = None):
+        self.socket_path = socket_path
+        self.model_name = model_name
+        self.timeout = settings.embedding_socket_timeout if timeout is None else timeout
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+
+    def _exchange(self, payload: bytes) -> tuple[dict, Optional[bytes]]:
+        try:
+            sock = self._connection()
+            _send_frame(sock, payload)
+            header = json.loads(_recv_frame(sock))
+            body = _recv_frame(sock) if "shape" in header else None
+            return header, body
+        except OSError:
+            # A half-read reply would desynchronize the connection
+            self._close()
+            raise
+
+    def _request(self, request: dict) -> tuple[dict, Optional[bytes]]:
+        payload = json.dumps(request).encode("utf-8")
+        reused = getattr(self._local, "sock", None) is not None
+        try:
+            return self._exchange(payload)
+        except OSError:
+            if not reused:
+                raise
+            # Stale connection (e.g. sidecar restarted): retry once on a fresh one
+            return self._exchange(payload)
+
+    def info(self) -> dict:
+        """Model served by the sidecar."""
+        header, _ = self._request({"op": "info"})
+        return header
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """
+        Embed texts in the sidecar.
+
+        Returns:
+            (texts x dimensions) float32 matrix
+
+        Raises:
+            OSError: If the sidecar is unreachable or the connection fails
+            EmbeddingServerError: If the sidecar rejects the request
+        """
+        header, body = self._request({"op": "encode", "model": self.model_name, "texts": list(texts)})
+        if "error" in header:
+            raise EmbeddingServerError(header["error"])
+        return np.frombuffer(body, dtype="<f4").reshape(header["shape"])
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """Serves requests on one client connection until it closes."""
+
+    def handle(self):
+        server: "EmbeddingSidecar" = self.server
+        while True:
+            try:
+                request = json.loads(_recv_frame(self.request))
+            except (ConnectionError, OSError, ValueError):
+                return
+            try:
+                if request.get("op") == "info":
+                    _send_frame(self.request, json.dumps({"model": server.model_name}).encode("utf-8"))
+                    continue
+                vectors = server.encode(request)
+            except Exception as e:
+                _send_frame(self.request, json.dumps({"error": str(e)}).encode("utf-8"))
+                continue
+            _send_frame(self.request, json.dumps({"shape": list(vectors.shape)}).encode("utf-8"))
+            _send_frame(self.request, vectors.astype("<f4").tobytes())
+
+
+class EmbeddingSidecar(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server owning the embedding model."""
+
+    daemon_threads = True
+    # Every worker thread holds a connection; a short backlog makes connects fail with EAGAIN
+    request_queue_size = 256
+
+    def __init__(self, socket_path: str, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self._model = SentenceTransformer(model_name)
+        self.batcher = MicroBatcher(self._encode)
+
+        # A socket file left by a previous run would make bind fail
+        path = Path(socket_path)
+        if path.exists():
+            path.unlink()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(socket_path, _Handler)
+        os.chmod(socket_path, 0o660)
+
+    def _encode(self, texts: list[str]) -> list[np.ndarray]:
+        return list(self._model.encode(texts, convert_to_numpy=True))
+
+    def encode(self, request: dict) -> np.ndarray:
+        """
+        Embed the texts of one request through the shared batcher.
+
+        Raises:
+            ValueError: If the request names a different model
+        """
+        model = request.get("model")
+        if model and model != self.model_name:
+            raise ValueError(f"Sidecar serves {self.model_name}, not {model}")
+        futures = [self.batcher.submit(text) for text in request.get("texts", [])]
+        if not futures:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([future.result() for future in futures]).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the embedding model to all workers on this host")
+    parser.add_argument("--socket", default=settings.embedding_socket or "/tmp/aether-embedding.sock")
+    parser.add_argument("--model", default=settings.embedding_model)
+    args = parser.parse_args()
+
+    server = EmbeddingSidecar(args.socket, args.model)
+    print(f"Serving {args.model} on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
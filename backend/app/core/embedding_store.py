@@ -0,0 +1,97 @@
+"""
+Content-addressed on-disk cache of document embeddings.
+
+Vectors are keyed by a hash of the embedding model name and the exact
+document text, so a changed rule (or a different model) misses the cache
+while every unchanged document loads from disk instead of being
+re-embedded. Each model has one .npz file (hash keys plus a float32
+matrix) under settings.embedding_cache_dir, rewritten atomically.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+from app.config import settings
+
+Embedder = Callable[[list[str]], list[list[float]]]
+
+
+def document_key(model_name: str, document: str) -> str:
+    """Cache key of one document under one embedding model."""
+    return hashlib.sha256(f"{model_name}\x00{document}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """Persistent embeddings of one model. Thread-safe."""
+
+    def __init__(self, model_name: str, directory: Optional[Path] = None):
+        self.model_name = model_name
+        directory = Path(directory or settings.embedding_cache_dir)
+        self.path = directory / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', model_name)}.npz"
+        self._lock = threading.Lock()
+        self._vectors: Optional[dict[str, np.ndarray]] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self) -> dict[str, np.ndarray]:
+        """Read the cache file once; a missing or unreadable file is an empty cache."""
+        if self._vectors is None:
+            self._vectors = {}
+            try:
+                with np.load(self.path) as data:
+                    keys, matrix = data["keys"], data["vectors"]
+                self._vectors = {str(key): row for key, row in zip(keys, matrix)}
+            except (OSError, KeyError, ValueError):
+                pass
+        return self._vectors
+
+    def _save(self, keys: list[str]):
+        """Write the vectors of the given keys (best effort)."""
+        vectors = self._vectors
+        matrix = np.stack([vectors[key] for key in keys]) if keys else np.zeros((0, 0), dtype=np.float32)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                np.savez(f, keys=np.asarray(keys, dtype="U64"), vectors=matrix)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # Read-only filesystems just re-embed next start
+            pass
+
+    def embed(self, documents: list[str], embedder: Embedder) -> np.ndarray:
+        """
+        Embeddings of documents, computing only those not cached.
+
+        The cache file is rewritten when anything was computed, keeping only
+        the given documents, so it tracks the current rule set.
+
+        Args:
+            documents: Document texts
+            embedder: Called with the uncached texts; returns one vector each
+
+        Returns:
+            (documents x dimensions) float32 matrix, in document order
+        """
+        keys = [document_key(self.model_name, document) for document in documents]
+        with self._lock:
+            vectors = self._load()
+            missing = {key: document for key, document in zip(keys, documents) if key not in vectors}
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+            if missing:
+                computed = embedder(list(missing.values()))
+                for key, vector in zip(missing, computed):
+                    vectors[key] = np.asarray(vector, dtype=np.float32)
+                self._save(list(dict.fromkeys(keys)))
+
+            if not keys:
+                return np.zeros((0, 0), dtype=np.float32)
+            return np.stack([vectors[key] for key in keys])
@@ -0,0 +1,333 @@
+"""
+Compiled binary "knowledge pack" of the backend datasets.
+
+The pack is a single file holding the ingredient catalog as fixed-width NumPy
+records over a shared string table, the precomputed molecular descriptors,
+the packed Morgan fingerprint matrix, and the IFRA standards and physio rules.
+Workers map it read-only, so the heavy arrays live once in the page cache and
+are shared by every process on the host.
+
+Layout: magic, u32 format version, u32 header length, JSON header (array
+dtypes, shapes and offsets plus dataset versions), then 64-byte aligned
+array data.
+
+Build from backend/:
+    python -m app.core.knowledge_pack build [--output data/knowledge.pack]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.config import settings
+
+MAGIC = b"AETHERPK"
+FORMAT_VERSION = 1
+ALIGN = 64
+LIST_SEPARATOR = "\x1f"
+
+_STR = np.dtype([("off", "<u4"), ("len", "<u4")])
+
+INGREDIENT_DTYPE = np.dtype([
+    ("id", _STR),
+    ("name", _STR),
+    ("smiles", _STR),
+    ("note_type", _STR),
+    ("family", _STR),
+    ("source", _STR),
+    ("origin", _STR),
+    ("latin_name", _STR),
+    ("cas", _STR),
+    ("descriptors", _STR),
+    ("synonyms", _STR),
+    ("logp", "<f8"),
+    ("molecular_weight", "<f8"),
+    ("max_concentration", "<f8"),
+    ("sustainability_score", "<i2"),
+    ("is_sustainable", "?"),
+    ("ifra_restricted", "?"),
+    ("allergen", "?"),
+    ("has_max_concentration", "?"),
+])
+
+PROPERTIES_DTYPE = np.dtype([
+    ("smiles", _STR),
+    ("volatility_class", _STR),
+    ("error_message", _STR),
+    ("logp", "<f8"),
+    ("molecular_weight", "<f8"),
+    ("tpsa", "<f8"),
+    ("estimated_vapor_pressure", "<f8"),
+    ("num_rotatable_bonds", "<i4"),
+    ("num_h_donors", "<i4"),
+    ("num_h_acceptors", "<i4"),
+    ("valid", "?"),
+    ("present", "?"),
+])
+
+_NONE = (0xFFFFFFFF, 0)
+
+
+class _StringTable:
+    """Deduplicating UTF-8 string table; None is stored as a sentinel offset."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._size = 0
+        self._seen: dict[str, tuple[int, int]] = {}
+
+    def add(self, value: Optional[str]) -> tuple[int, int]:
+        if value is None:
+            return _NONE
+        ref = self._seen.get(value)
+        if ref is None:
+            data = value.encode("utf-8")
+            ref = (self._size, len(data))
+            self._chunks.append(data)
+            self._size += len(data)
+            self._seen[value] = ref
+        return ref
+
+    def array(self) -> np.ndarray:
+        return np.frombuffer(b"".join(self._chunks) or b"\0", dtype=np.uint8)
+
+
+def _optional(value, default=np.nan):
+    return default if value is None else value
+
+
+def _file_version(path: Path) -> tuple[str, bytes]:
+    raw = path.read_bytes() if path.exists() else b""
+    return (hashlib.sha256(raw).hexdigest() if raw else ""), raw
+
+
+def build_pack(output: Optional[Path] = None) -> dict:
+    """
+    Compile the JSON datasets into a knowledge pack.
+
+    Args:
+        output: Destination path (default: settings.knowledge_pack_path)
+
+    Returns:
+        The pack header
+    """
+    # Imported here so the pack reader stays free of catalog dependencies
+    from app.chemistry.ingredient_db import CatalogSnapshot
+    from app.chemistry.descriptor_backend import get_descriptor_backend
+
+    output = Path(output or settings.knowledge_pack_path)
+    ingredients_version, ingredients_raw = _file_version(settings.data_dir / "ingredients.json")
+    ifra_version, ifra_raw = _file_version(settings.data_dir / "ifra_standards.json")
+    physio_version, physio_raw = _file_version(settings.data_dir / "physio_rules.json")
+
+    catalog = CatalogSnapshot.from_json(ingredients_raw) if ingredients_raw else CatalogSnapshot([], "")
+    ingredients = catalog.get_all()
+    fingerprints = catalog.fingerprint_index()
+
+    strings = _StringTable()
+    records = np.zeros(len(ingredients), dtype=INGREDIENT_DTYPE)
+    properties = np.zeros(len(ingredients), dtype=PROPERTIES_DTYPE)
+    for row, ing in enumerate(ingredients):
+        rec = records[row]
+        for name in ("id", "name", "smiles", "note_type", "family", "source", "origin", "latin_name", "cas"):
+            rec[name] = strings.add(getattr(ing, name))
+        rec["descriptors"] = strings.add(LIST_SEPARATOR.join(ing.descriptors))
+        rec["synonyms"] = strings.add(LIST_SEPARATOR.join(ing.synonyms))
+        rec["logp"] = ing.logp
+        rec["molecular_weight"] = ing.molecular_weight
+        rec["max_concentration"] = _optional(ing.max_concentration)
+        rec["has_max_concentration"] = ing.max_concentration is not None
+        rec["sustainability_score"] = ing.sustainability_score
+        rec["is_sustainable"] = ing.is_sustainable
+        rec["ifra_restricted"] = ing.ifra_restricted
+        rec["allergen"] = ing.allergen
+
+        props = ing.properties
+        if props is None:
+            continue
+        prop = properties[row]
+        prop["present"] = True
+        prop["valid"] = props.valid
+        prop["smiles"] = strings.add(props.smiles)
+        prop["volatility_class"] = strings.add(props.volatility_class)
+        prop["error_message"] = strings.add(props.error_message)
+        for name in ("logp", "molecular_weight", "tpsa", "estimated_vapor_pressure"):
+            prop[name] = _optional(getattr(props, name))
+        for name in ("num_rotatable_bonds", "num_h_donors", "num_h_acceptors"):
+            prop[name] = _optional(getattr(props, name), -1)
+
+    arrays = {
+        "ingredients": records,
+        "properties": properties,
+        "fingerprints": fingerprints.matrix,
+        "ifra_json": np.frombuffer(ifra_raw or b"{}", dtype=np.uint8),
+        "physio_json": np.frombuffer(physio_raw or b"{}", dtype=np.uint8),
+        "strings": strings.array(),
+    }
+    meta = {
+        "built_at": time.time(),
+        "versions": {
+            "ingredients": ingredients_version,
+            "ifra": ifra_version,
+            "physio_rules": physio_version,
+        },
+        "descriptor_backend": get_descriptor_backend().name,
+        "fingerprint_bits": fingerprints.n_bits,
+        "fingerprint_radius": fingerprints.radius,
+    }
+    return write_pack(output, arrays, meta)
+
+
+def write_pack(path: Path, arrays: dict[str, np.ndarray], meta: dict) -> dict:
+    """Write arrays and metadata to a pack file atomically."""
+    entries = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = -(-offset // ALIGN) * ALIGN
+        entries[name] = {
+            "dtype": np.lib.format.dtype_to_descr(array.dtype),
+            "shape": list(array.shape),
+            "offset": offset,
+            "nbytes": int(array.nbytes),
+        }
+        offset += array.nbytes
+
+    header = dict(meta, format_version=FORMAT_VERSION, arrays=entries)
+    header_bytes = json.dumps(header).encode("utf-8")
+    preamble = MAGIC + struct.pack("<II", FORMAT_VERSION, len(header_bytes))
+    data_start = -(-(len(preamble) + len(header_bytes)) // ALIGN) * ALIGN
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(preamble)
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + entries[name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp_path, path)
+    return header
+
+
+class KnowledgePack:
+    """
+    Read-only, memory-mapped view of a knowledge pack file.
+
+    Array accessors return views into the shared mapping; nothing is copied
+    until individual records are materialized.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            preamble = f.read(len(MAGIC) + 8)
+            if preamble[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"Not a knowledge pack: {self.path}")
+            format_version, header_len = struct.unpack("<II", preamble[len(MAGIC):])
+            if format_version != FORMAT_VERSION:
+                raise ValueError(f"Unsupported knowledge pack format {format_version}")
+            self.header = json.loads(f.read(header_len))
+
+        data_start = -(-(len(preamble) + header_len) // ALIGN) * ALIGN
+        self._map = np.memmap(self.path, dtype=np.uint8, mode="r")
+        self._arrays: dict[str, np.ndarray] = {}
+        self._blob: Optional[bytes] = None
+        for name, entry in self.header["arrays"].items():
+            dtype = np.lib.format.descr_to_dtype(entry["dtype"])
+            start = data_start + entry["offset"]
+            raw = self._map[start:start + entry["nbytes"]]
+            self._arrays[name] = raw.view(dtype).reshape(entry["shape"])
+
+    @property
+    def versions(self) -> dict[str, str]:
+        """Source-file SHA-256 of each dataset compiled into the pack."""
+        return self.header["versions"]
+
+    def array(self, name: str) -> np.ndarray:
+        return self._arrays[name]
+
+    def strings(self, refs: np.ndarray) -> list[Optional[str]]:
+        """Decode a column of string-table references."""
+        blob = self._strings_blob()
+        return [
+            None if off == _NONE[0] else blob[off:off + length].decode("utf-8")
+            for off, length in zip(refs["off"].tolist(), refs["len"].tolist())
+        ]
+
+    def string_lists(self, refs: np.ndarray) -> list[list[str]]:
+        """Decode a column of separator-joined string lists."""
+        return [value.split(LIST_SEPARATOR) if value else [] for value in self.strings(refs)]
+
+    def _strings_blob(self) -> bytes:
+        if self._blob is None:
+            self._blob = self._arrays["strings"].tobytes()
+        return self._blob
+
+    def raw_json(self, name: str) -> bytes:
+        """Embedded JSON dataset ("ifra_json" or "physio_json")."""
+        return self._arrays[name].tobytes()
+
+
+_pack_cache: Optional[tuple[tuple, KnowledgePack]] = None
+_pack_lock = threading.Lock()
+
+
+def load_pack(path: Optional[Path] = None) -> Optional[KnowledgePack]:
+    """
+    Open the configured knowledge pack, reusing the mapping while the file is unchanged.
+
+    Returns:
+        KnowledgePack, or None if the file is missing or unreadable
+    """
+    global _pack_cache
+    path = Path(path or settings.knowledge_pack_path)
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    key = (str(path), st.st_mtime_ns, st.st_size)
+
+    with _pack_lock:
+        if _pack_cache is not None and _pack_cache[0] == key:
+            return _pack_cache[1]
+        try:
+            pack = KnowledgePack(path)
+        except (OSError, ValueError):
+            return None
+        _pack_cache = (key, pack)
+        return pack
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Aether knowledge pack")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Compile JSON datasets into a knowledge pack")
+    build.add_argument("--output", type=Path, default=None)
+    sub.add_parser("info", help="Print the header of the current knowledge pack")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        header = build_pack(args.output)
+        path = args.output or settings.knowledge_pack_path
+        n = header["arrays"]["ingredients"]["shape"][0]
+        print(f"Wrote {path}: {n} ingredients, {os.path.getsize(path)} bytes "
+              f"in {time.perf_counter() - start:.2f}s")
+    else:
+        pack = load_pack()
+        if pack is None:
+            raise SystemExit(f"No readable knowledge pack at {settings.knowledge_pack_path}")
+        header = dict(pack.header)
+        header["arrays"] = {k: {"shape": v["shape"], "nbytes": v["nbytes"]} for k, v in header["arrays"].items()}
+        print(json.dumps(header, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,29 @@
 """
 Physio-RAG Engine: Retrieval-Augmented Generation for physiological corrections.
-Uses ChromaDB with sentence-transformers for semantic similarity search.
+Uses ChromaDB (or an in-process NumPy index) with sentence-transformers for
+semantic similarity search.
+
+Rules and their vector collection are held as an immutable RuleSetSnapshot
+that can be rebuilt from physio_rules.json and swapped in at runtime.
 """
 
+import asyncio
+import hashlib
 import json
+import threading
+import time
 from typing import Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from app.config import settings
+from app.core.embedding_batcher import MicroBatcher
+from app.core.embedding_sidecar import EmbeddingClient, EmbeddingServerError
+from app.core.embedding_store import EmbeddingStore
+from app.core.knowledge_pack import load_pack
+from app.core.query_cache import TTLCache
+from app.core.rule_conditions import comparisons, describe, is_comparison
+from app.core.rule_index import RuleIndex
+from app.core.vector_index import NumpyVectorIndex
 
 
 @dataclass
@@ -31,12 +47,36 @@ class RetrievedRule:
     matched_condition: str
 
 
+@dataclass(frozen=True)
+class RuleSetSnapshot:
+    """Immutable, versioned rule set with its condition index and vector collection (if any)."""
+    version: str
+    rules: tuple[PhysioRule, ...]
+    by_id: dict[str, PhysioRule]
+    index: RuleIndex
+    collection: object = None
+    loaded_at: float = field(default_factory=time.time)
+
+
 class SentenceTransformerEmbedding:
-    """Custom embedding function using sentence-transformers."""
+    """
+    Custom embedding function using sentence-transformers.
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    With settings.embedding_socket set, texts are embedded by the host's
+    embedding sidecar; the model is loaded in-process only while the
+    sidecar is unreachable (retried every embedding_socket_retry seconds).
+    """
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", socket_path: Optional[str] = None):
         self._model = None
         self._model_name = model_name
+        socket_path = socket_path or settings.embedding_socket
+        self._client = EmbeddingClient(socket_path, model_name) if socket_path else None
+        self._client_retry_at = 0.0
+
+    @property
+    def model_name(self) -> str:
+        return self._model_name
 
     def _load_model(self):
         if self._model is None:
@@ -48,6 +88,12 @@ class SentenceTransformerEmbedding:
 
     def __call__(self, input: list[str]) -> list[list[float]]:
         """Generate embeddings for input texts."""
+        if self._client is not None and time.monotonic() >= self._client_retry_at:
+            try:
+                return self._client.encode(input).tolist()
+            except (OSError, EmbeddingServerError):
+                # Fall back to the in-process model until the next retry
+                self._client_retry_at = time.monotonic() + settings.embedding_socket_retry
         self._load_model()
         embeddings = self._model.encode(input, convert_to_numpy=True)
         return embeddings.tolist()
@@ -57,50 +103,114 @@ class PhysioRAG:
     """
     Physio-RAG Engine for retrieving physiological correction rules.
 
-    Uses ChromaDB with sentence-transformers for semantic similarity search
-    to find relevant rules based on user physiological profile.
+    Uses ChromaDB or an in-process NumPy index with sentence-transformers for
+    semantic similarity search to find relevant rules based on user
+    physiological profile.
     """
 
     def __init__(self):
-        self._rules: list[PhysioRule] = []
-        self._collection = None
+        self._snapshot: Optional[RuleSetSnapshot] = None
+        self._client = None
         self._embedder: Optional[SentenceTransformerEmbedding] = None
+        self._embedding_store: Optional[EmbeddingStore] = None
+        self._batcher: Optional[MicroBatcher] = None
+        self._query_cache = TTLCache(settings.physio_query_cache_size, settings.physio_query_cache_ttl)
+        self._use_vector_db = True
         self._initialized = False
+        self._reload_lock = threading.RLock()
+        self._retired_collections: list[str] = []
 
     def initialize(self, use_vector_db: bool = True):
         """
         Initialize the RAG engine.
 
         Args:
-            use_vector_db: Whether to use ChromaDB for vector search.
+            use_vector_db: Whether to use vector search (ChromaDB or NumPy).
                           If False, uses simple keyword matching.
         """
-        self._load_rules()
+        with self._reload_lock:
+            self._use_vector_db = use_vector_db
+            if use_vector_db:
+                self._setup_embedder()
 
-        if use_vector_db:
-            self._setup_embedder()
-            self._setup_vector_db()
+            self._install_rules(force=True)
+            self._initialized = True
 
-        self._initialized = True
+    def snapshot(self) -> RuleSetSnapshot:
+        """The current rule set snapshot."""
+        if not self._initialized:
+            self.initialize()
+        return self._snapshot
+
+    @property
+    def version(self) -> Optional[str]:
+        """Version (content hash) of the current rule set, or None before initialization."""
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else None
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Rebuild the rule set (and its embeddings) from JSON and swap it in.
+
+        Args:
+            force: Rebuild even if the file content is unchanged
+
+        Returns:
+            True if a new snapshot was installed
+        """
+        if not self._initialized:
+            # Nothing loaded yet; the first query reads the current file
+            return False
+        with self._reload_lock:
+            return self._install_rules(force)
+
+    def _install_rules(self, force: bool) -> bool:
+        """Build a rule set snapshot from physio_rules.json; caller holds the reload lock."""
+        rules_path = settings.data_dir / "physio_rules.json"
+        pack = None if rules_path.exists() else load_pack()
+        if pack is not None:
+            # Deployed with the compiled knowledge pack only
+            raw = pack.raw_json("physio_json")
+            version = pack.versions["physio_rules"]
+        else:
+            raw = rules_path.read_bytes() if rules_path.exists() else b""
+            version = hashlib.sha256(raw).hexdigest() if raw else ""
+
+        current = self._snapshot
+        if not force and current is not None and current.version == version:
+            return False
+
+        rules = self._load_rules(raw)
+        collection = self._setup_vector_db(rules, version) if self._use_vector_db else None
+        self._snapshot = RuleSetSnapshot(
+            version=version,
+            rules=tuple(rules),
+            by_id={rule.id: rule for rule in rules},
+            index=RuleIndex(rules),
+            collection=collection
+        )
+        self._retire_collection(current)
+        return True
 
     def _setup_embedder(self):
         """Initialize sentence-transformers embedder."""
         try:
-            self._embedder = SentenceTransformerEmbedding()
+            self._embedder = SentenceTransformerEmbedding(settings.embedding_model)
+            self._embedding_store = EmbeddingStore(self._embedder.model_name)
+            # The sidecar batches across workers itself; a second window would only add latency
+            if settings.embedding_batching and not settings.embedding_socket:
+                self._batcher = MicroBatcher(self._embedder)
         except ImportError:
             self._embedder = None
 
-    def _load_rules(self):
-        """Load physio rules from JSON file."""
-        rules_path = settings.data_dir / "physio_rules.json"
-
-        if not rules_path.exists():
-            self._rules = []
-            return
+    def _load_rules(self, raw: bytes) -> list[PhysioRule]:
+        """Parse physio rules from the contents of physio_rules.json."""
+        if not raw:
+            return []
 
-        with open(rules_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = json.loads(raw)
 
+        rules = []
         for rule_data in data.get('rules', []):
             rule = PhysioRule(
                 id=rule_data['id'],
@@ -112,59 +222,175 @@ class PhysioRAG:
                 substitute=rule_data.get('substitute'),
                 reasoning=rule_data.get('reasoning', '')
             )
-            self._rules.append(rule)
+            rules.append(rule)
+        return rules
+
+    def _setup_vector_db(self, rules: list[PhysioRule], version: str):
+        """
+        Set up the vector search backend for a rule set version.
+
+        settings.physio_vector_backend picks "chroma", "numpy" (in-process
+        NumpyVectorIndex), or "auto" (Chroma if installed, else NumPy).
+        Each rule set version gets its own collection so a reload never
+        mutates the collection in-flight queries are reading.
+
+        Returns:
+            The collection or index, or None if no backend is available
+        """
+        backend = settings.physio_vector_backend
+        if backend == "numpy":
+            return self._setup_numpy_index(rules, version)
+        collection = self._setup_chroma(rules, version)
+        if collection is None and backend == "auto":
+            return self._setup_numpy_index(rules, version)
+        return collection
+
+    def _collection_name(self, version: str) -> str:
+        return f"{settings.chroma_collection_name}_{version[:12] or 'empty'}"
+
+    def _setup_numpy_index(self, rules: list[PhysioRule], version: str) -> Optional[NumpyVectorIndex]:
+        """
+        Build an in-process vector index over the rule embeddings.
 
-    def _setup_vector_db(self):
-        """Set up ChromaDB collection with sentence-transformer embeddings."""
+        Returns:
+            The index, or None without sentence-transformers
+        """
+        if self._embedder is None or self._embedding_store is None:
+            return None
+        documents, ids, metadatas = self._rule_documents(rules)
+        try:
+            embeddings = self._embedding_store.embed(documents, self._embedder)
+        except ImportError:
+            # Fallback to keyword matching if sentence-transformers not available
+            return None
+        return NumpyVectorIndex(
+            name=self._collection_name(version),
+            ids=ids,
+            embeddings=embeddings,
+            metadatas=metadatas,
+            documents=documents,
+            embedding_function=self._embedder,
+            quantize=settings.physio_vector_quantize
+        )
+
+    def _setup_chroma(self, rules: list[PhysioRule], version: str):
+        """
+        Set up a ChromaDB collection with sentence-transformer embeddings.
+
+        Returns:
+            The collection, or None if ChromaDB is not available
+        """
         try:
             import chromadb
             from chromadb.config import Settings as ChromaSettings
 
             # Initialize ChromaDB client (in-memory for MVP)
-            client = chromadb.Client(ChromaSettings(
-                anonymized_telemetry=False,
-                is_persistent=False
-            ))
+            if self._client is None:
+                self._client = chromadb.Client(ChromaSettings(
+                    anonymized_telemetry=False,
+                    is_persistent=False
+                ))
+
+            name = self._collection_name(version)
 
             # Create collection with custom embedding function if available
             if self._embedder:
-                self._collection = client.get_or_create_collection(
-                    name=settings.chroma_collection_name,
+                collection = self._client.get_or_create_collection(
+                    name=name,
                     metadata={"description": "Physio-chemical rules for perfume formulation"},
                     embedding_function=self._embedder
                 )
             else:
-                self._collection = client.get_or_create_collection(
-                    name=settings.chroma_collection_name,
+                collection = self._client.get_or_create_collection(
+                    name=name,
                     metadata={"description": "Physio-chemical rules for perfume formulation"}
                 )
 
             # Embed rules if collection is empty
-            if self._collection.count() == 0:
-                self._embed_rules()
+            if collection.count() == 0:
+                self._embed_rules(collection, rules)
+            return collection
 
         except ImportError:
             # Fallback to keyword matching if ChromaDB not available
-            self._collection = None
+            return None
 
-    def _embed_rules(self):
-        """Embed rules into the vector database with rich semantic content."""
-        if not self._collection or not self._rules:
+    def _retire_collection(self, previous: Optional[RuleSetSnapshot]):
+        """
+        Drop collections two versions old.
+
+        The collection just replaced is kept for requests that still hold the
+        previous snapshot.
+        """
+        if previous is None or previous.collection is None or self._client is None:
+            return
+        if isinstance(previous.collection, NumpyVectorIndex):
+            # Not held by the client; freed with the snapshot
+            return
+        current = self._snapshot.collection
+        if current is not None and previous.collection.name == current.name:
+            return
+        self._retired_collections.append(previous.collection.name)
+        while len(self._retired_collections) > 1:
+            name = self._retired_collections.pop(0)
+            try:
+                self._client.delete_collection(name)
+            except Exception:
+                pass
+
+    def _embed_rules(self, collection, rules: list[PhysioRule]):
+        """
+        Embed rules into the vector database with rich semantic content.
+
+        With the sentence-transformers embedder, vectors come from the
+        persistent embedding store, so only new or changed rule documents
+        are encoded (and the model is not loaded at all when none are).
+        """
+        if not collection or not rules:
             return
 
+        documents, ids, metadatas = self._rule_documents(rules)
+        if self._embedder is not None and self._embedding_store is not None:
+            embeddings = self._embedding_store.embed(documents, self._embedder)
+            collection.add(
+                documents=documents,
+                ids=ids,
+                metadatas=metadatas,
+                embeddings=embeddings.tolist()
+            )
+        else:
+            collection.add(
+                documents=documents,
+                ids=ids,
+                metadatas=metadatas
+            )
+
+    def _rule_documents(self, rules: list[PhysioRule]) -> tuple[list[str], list[str], list[dict]]:
+        """
+        Semantic documents for embedding, with ids and metadata.
+
+        Returns:
+            (documents, rule ids, metadata dicts)
+        """
         documents = []
         ids = []
         metadatas = []
 
-        for rule in self._rules:
+        for rule in rules:
             condition = rule.condition
-            param = condition.get('parameter', '')
-            operator = condition.get('operator', '')
-            value = condition.get('value', '')
+            if is_comparison(condition):
+                param = condition.get('parameter', '')
+                operator = condition.get('operator', '')
+                value = condition.get('value', '')
+            else:
+                # Compound condition: metadata lists its parameters
+                param = ",".join(dict.fromkeys(c.get('parameter', '') for c in comparisons(condition)))
+                operator = "compound"
+                value = describe(condition)
 
             # Create rich semantic document for better retrieval
             doc_parts = [
-                f"Condition: {param} {operator} {value}",
+                f"Condition: {describe(condition)}",
                 f"Affects: {rule.target}",
                 f"Action: {rule.action}",
             ]
@@ -174,7 +400,10 @@ class PhysioRAG:
                 doc_parts.append(f"Reasoning: {rule.reasoning}")
 
             # Add semantic expansion for better matching
-            semantic_hints = self._get_semantic_hints(param, operator, value)
+            semantic_hints = ", ".join(filter(None, (
+                self._get_semantic_hints(c.get('parameter', ''), c.get('operator', ''), c.get('value', ''))
+                for c in comparisons(condition)
+            )))
             if semantic_hints:
                 doc_parts.append(f"Related concepts: {semantic_hints}")
 
@@ -189,11 +418,7 @@ class PhysioRAG:
                 "factor": str(rule.factor) if rule.factor else ""
             })
 
-        self._collection.add(
-            documents=documents,
-            ids=ids,
-            metadatas=metadatas
-        )
+        return documents, ids, metadatas
 
     def _get_semantic_hints(self, param: str, operator: str, value) -> str:
         """Generate semantic hints for better embedding similarity."""
@@ -223,6 +448,11 @@ class PhysioRAG:
         """
         Query for relevant physio rules based on user profile.
 
+        Vector queries are cached per profile bucket (see _profile_bucket)
+        and rule set version; keyword matching is exact and uncached. Query
+        embeddings go through the micro-batcher, so concurrent callers on
+        other threads share one forward pass.
+
         Args:
             user_profile: Dict with keys like 'ph', 'skin_type', 'temperature', 'allergies'
             n_results: Maximum number of rules to return
@@ -230,18 +460,152 @@ class PhysioRAG:
         Returns:
             List of RetrievedRule objects sorted by relevance
         """
-        if not self._initialized:
-            self.initialize()
+        snapshot = self.snapshot()
+        if snapshot.collection is None:
+            return self._keyword_query(snapshot, user_profile, n_results)
+
+        # Nearby profiles share one canonical query and its cached results
+        key, query_text, cached = self._cache_lookup(snapshot, user_profile, n_results)
+        if cached is not None:
+            return cached
+
+        embedding = self._batcher.embed(query_text) if self._batcher is not None else None
+        retrieved = self._vector_query(snapshot, query_text, n_results, embedding)
+        self._cache_store(key, retrieved)
+        return retrieved
+
+    async def aquery(self, user_profile: dict, n_results: int = 5) -> list[RetrievedRule]:
+        """
+        Async version of query(): awaits the batched query embedding instead
+        of blocking the event loop, then searches in a worker thread.
+        """
+        snapshot = self.snapshot()
+        if snapshot.collection is None:
+            return self._keyword_query(snapshot, user_profile, n_results)
+
+        key, query_text, cached = self._cache_lookup(snapshot, user_profile, n_results)
+        if cached is not None:
+            return cached
+
+        embedding = await self._batcher.aembed(query_text) if self._batcher is not None else None
+        retrieved = await asyncio.to_thread(self._vector_query, snapshot, query_text, n_results, embedding)
+        self._cache_store(key, retrieved)
+        return retrieved
+
+    def _cache_lookup(
+        self,
+        snapshot: RuleSetSnapshot,
+        user_profile: dict,
+        n_results: int
+    ) -> tuple[tuple, str, Optional[list[RetrievedRule]]]:
+        """
+        Query cache lookup for a profile.
+
+        Returns:
+            (cache key, canonical query text, cached results or None)
+        """
+        bucket = self._profile_bucket(user_profile)
+        key = (snapshot.version, bucket, n_results)
+        cached = self._query_cache.get(key)
+        if cached is not None:
+            cached = [
+                RetrievedRule(rule=snapshot.by_id[rule_id], relevance_score=score, matched_condition=matched)
+                for rule_id, score, matched in cached
+            ]
+            return key, "", cached
+        return key, self._query_text(self._bucket_profile(bucket), bucket[-1]), None
+
+    def _cache_store(self, key: tuple, retrieved: list[RetrievedRule]):
+        self._query_cache.put(key, tuple(
+            (r.rule.id, r.relevance_score, r.matched_condition) for r in retrieved
+        ))
+
+    @staticmethod
+    def _profile_bucket(user_profile: dict) -> tuple:
+        """
+        Canonical cache key of a profile's query.
+
+        pH and temperature are rounded to settings.physio_query_ph_step /
+        physio_query_temperature_step, skin type lower-cased and allergies
+        de-duplicated and sorted; absent fields stay absent (None). The key
+        ends with the raw values' threshold sides (see _threshold_sides), so
+        profiles on either side of a rule threshold never share an entry.
+        """
+        def snap(value, step):
+            return round(round(value / step) * step, 6) if step > 0 else value
+
+        ph = user_profile.get('ph') if 'ph' in user_profile else None
+        temperature = user_profile.get('temperature') if 'temperature' in user_profile else None
+        skin = user_profile['skin_type'].lower() if 'skin_type' in user_profile else None
+        allergies = None
+        if 'allergies' in user_profile:
+            allergies = tuple(sorted(set(user_profile.get('allergies') or [])))
+        return (
+            None if ph is None else snap(ph, settings.physio_query_ph_step),
+            skin,
+            None if temperature is None else snap(temperature, settings.physio_query_temperature_step),
+            allergies,
+            PhysioRAG._threshold_sides(user_profile),
+        )
+
+    @staticmethod
+    def _bucket_profile(bucket: tuple) -> dict:
+        """The profile a bucket stands for (inverse of _profile_bucket)."""
+        ph, skin, temperature, allergies, _ = bucket
+        profile = {}
+        if ph is not None:
+            profile['ph'] = ph
+        if skin is not None:
+            profile['skin_type'] = skin
+        if temperature is not None:
+            profile['temperature'] = temperature
+        if allergies is not None:
+            profile['allergies'] = list(allergies)
+        return profile
+
+    @staticmethod
+    def _threshold_sides(user_profile: dict) -> tuple[Optional[str], Optional[str]]:
+        """
+        Which side of the query hint thresholds a profile's pH and
+        temperature fall on.
+
+        Returns:
+            (ph side, temperature side): "acidic"/"alkaline" and "warm"/"cool",
+            or None when the value is absent or in the neutral range
+        """
+        ph_side = temperature_side = None
+        ph = user_profile.get('ph')
+        if ph is not None:
+            if ph < 5.2:
+                ph_side = "acidic"
+            elif ph > 5.8:
+                ph_side = "alkaline"
+        temp = user_profile.get('temperature')
+        if temp is not None:
+            if temp > 37.0:
+                temperature_side = "warm"
+            elif temp < 36.0:
+                temperature_side = "cool"
+        return ph_side, temperature_side
+
+    @staticmethod
+    def _query_text(user_profile: dict, sides: Optional[tuple] = None) -> str:
+        """
+        Semantic query text for a profile.
 
-        # Build semantic query from profile
+        Args:
+            user_profile: Profile (or bucket profile) for the numeric parts
+            sides: Threshold sides for the hint words; defaults to those of
+                user_profile (see _threshold_sides)
+        """
+        ph_side, temperature_side = sides if sides is not None else PhysioRAG._threshold_sides(user_profile)
         query_parts = []
 
         if 'ph' in user_profile:
-            ph = user_profile['ph']
-            query_parts.append(f"pH level {ph}")
-            if ph < 5.2:
+            query_parts.append(f"pH level {user_profile['ph']}")
+            if ph_side == "acidic":
                 query_parts.append("acidic skin chemistry faster evaporation")
-            elif ph > 5.8:
+            elif ph_side == "alkaline":
                 query_parts.append("alkaline skin chemistry slower breakdown")
 
         if 'skin_type' in user_profile:
@@ -253,40 +617,59 @@ class PhysioRAG:
                 query_parts.append("high sebum enhanced projection")
 
         if 'temperature' in user_profile:
-            temp = user_profile['temperature']
-            query_parts.append(f"body temperature {temp}")
-            if temp > 37.0:
+            query_parts.append(f"body temperature {user_profile['temperature']}")
+            if temperature_side == "warm":
                 query_parts.append("warm skin fast diffusion")
-            elif temp < 36.0:
+            elif temperature_side == "cool":
                 query_parts.append("cool skin slow evaporation")
 
         if 'allergies' in user_profile:
             for allergy in user_profile.get('allergies', []):
                 query_parts.append(f"allergen sensitivity {allergy}")
 
-        query_text = " ".join(query_parts)
+        return " ".join(query_parts)
 
-        if self._collection is not None:
-            return self._vector_query(query_text, n_results)
-        else:
-            return self._keyword_query(user_profile, n_results)
+    def query_cache_stats(self) -> dict:
+        """Hit/miss, eviction and expiry counters of the query cache."""
+        return self._query_cache.stats().to_dict()
 
-    def _vector_query(self, query_text: str, n_results: int) -> list[RetrievedRule]:
-        """Query using ChromaDB vector similarity with sentence-transformers."""
-        if self._collection is None:
+    def embedding_batcher_stats(self) -> Optional[dict]:
+        """Batch size, queueing delay and encode time histograms, or None when batching is off."""
+        return self._batcher.stats() if self._batcher is not None else None
+
+    def _vector_query(
+        self,
+        snapshot: RuleSetSnapshot,
+        query_text: str,
+        n_results: int,
+        embedding: Optional[list[float]] = None
+    ) -> list[RetrievedRule]:
+        """
+        Query the rule set's vector collection (Chroma or NumPy) with sentence-transformers.
+
+        The collection embeds query_text itself unless a precomputed
+        embedding is given.
+        """
+        if snapshot.collection is None:
             return []
 
-        results = self._collection.query(
-            query_texts=[query_text],
-            n_results=n_results
-        )
+        if embedding is not None:
+            results = snapshot.collection.query(
+                query_embeddings=[embedding],
+                n_results=n_results
+            )
+        else:
+            results = snapshot.collection.query(
+                query_texts=[query_text],
+                n_results=n_results
+            )
 
         retrieved = []
         ids = results.get('ids', [[]])[0]
         distances = results.get('distances', [[]])[0]
 
         for i, rule_id in enumerate(ids):
-            rule = self._get_rule_by_id(rule_id)
+            rule = snapshot.by_id.get(rule_id)
             if rule:
                 distance = distances[i] if i < len(distances) else 1.0
                 relevance = 1.0 / (1.0 + distance)
@@ -298,49 +681,23 @@ class PhysioRAG:
 
         return retrieved
 
-    def _keyword_query(self, user_profile: dict, n_results: int) -> list[RetrievedRule]:
+    def _keyword_query(self, snapshot: RuleSetSnapshot, user_profile: dict, n_results: int) -> list[RetrievedRule]:
         """Fallback keyword-based matching when vector DB not available."""
         matched = []
 
-        for rule in self._rules:
-            condition = rule.condition
-            param = condition.get('parameter', '')
-            operator = condition.get('operator', '')
-            value = condition.get('value')
-
-            if param not in user_profile or value is None:
-                continue
-
-            user_value = user_profile[param]
-            matches = False
-            relevance = 0.5
-
-            if operator == '<' and isinstance(user_value, (int, float)) and isinstance(value, (int, float)):
-                matches = user_value < value
-            elif operator == '>' and isinstance(user_value, (int, float)) and isinstance(value, (int, float)):
-                matches = user_value > value
-            elif operator == '==':
-                matches = user_value == value
-            elif operator == 'contains' and isinstance(user_value, list):
-                matches = value in user_value
-
-            if matches:
-                relevance = 0.9
-                matched.append(RetrievedRule(
-                    rule=rule,
-                    relevance_score=relevance,
-                    matched_condition=f"{param} {operator} {value}"
-                ))
+        # Every exact match scores the same, so rule order decides the top n
+        for rule in snapshot.index.match(user_profile)[:n_results]:
+            matched.append(RetrievedRule(
+                rule=rule,
+                relevance_score=0.9,
+                matched_condition=describe(rule.condition)
+            ))
 
-        matched.sort(key=lambda x: x.relevance_score, reverse=True)
-        return matched[:n_results]
+        return matched
 
     def _get_rule_by_id(self, rule_id: str) -> Optional[PhysioRule]:
         """Get a rule by its ID."""
-        for rule in self._rules:
-            if rule.id == rule_id:
-                return rule
-        return None
+        return self.snapshot().by_id.get(rule_id)
 
     def get_applicable_rules(self, user_profile: dict) -> list[PhysioRule]:
         """
@@ -352,34 +709,7 @@ class PhysioRAG:
         Returns:
             List of applicable PhysioRule objects
         """
-        if not self._initialized:
-            self.initialize()
-
-        applicable = []
-
-        for rule in self._rules:
-            condition = rule.condition
-            param = condition.get('parameter', '')
-            operator = condition.get('operator', '')
-            value = condition.get('value')
-
-            if param not in user_profile or value is None:
-                continue
-
-            user_value = user_profile[param]
-
-            if operator == '<' and isinstance(user_value, (int, float)) and isinstance(value, (int, float)):
-                if user_value < value:
-                    applicable.append(rule)
-            elif operator == '>' and isinstance(user_value, (int, float)) and isinstance(value, (int, float)):
-                if user_value > value:
-                    applicable.append(rule)
-            elif operator == '==' and user_value == value:
-                applicable.append(rule)
-            elif operator == 'contains' and isinstance(user_value, list) and value in user_value:
-                applicable.append(rule)
-
-        return applicable
+        return self.snapshot().index.match(user_profile)
 
 
 # Singleton instance
@@ -0,0 +1,78 @@
+"""
+Thread-safe LRU cache with per-entry time-to-live and hit-rate metrics.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Hashable, Optional
+
+
+@dataclass
+class CacheStats:
+    """Counters of one cache since it was created (or last cleared)."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0  # Dropped to stay within maxsize
+    expirations: int = 0  # Dropped for exceeding the TTL
+    size: int = 0
+    maxsize: int = 0
+    ttl: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "hit_rate": self.hit_rate}
+
+
+class TTLCache:
+    """LRU cache whose entries also expire ttl seconds after being stored."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats(maxsize=maxsize, ttl=ttl)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[object]:
+        """Cached value, or None on a miss or an expired entry."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._stats.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self._stats.expirations += 1
+            self._stats.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: object):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._stats = CacheStats(maxsize=self.maxsize, ttl=self.ttl)
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(**{**asdict(self._stats), "size": len(self._entries)})
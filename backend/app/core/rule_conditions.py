@@ -0,0 +1,122 @@
+"""
+Condition language of physio rules.
+
+A condition is either a single comparison (the original form)
+
+    {"parameter": "ph", "operator": "<", "value": 4.5}
+
+or a combination of conditions, nested to any depth:
+
+    {"all": [condition, ...]}    every condition holds
+    {"any": [condition, ...]}    at least one condition holds
+    {"not": condition}           the condition does not hold
+
+e.g. dry skin on a warm body:
+
+    {"all": [{"parameter": "skin_type", "operator": "==", "value": "Dry"},
+             {"parameter": "temperature", "operator": ">", "value": 37.0}]}
+
+Comparison operators:
+    <, <=, >, >=     numeric profile value against a number
+    ==, !=           equality
+    contains         the profile value is a list holding the value
+    in               the profile value is one of the listed values
+    between          numeric profile value within [low, high], inclusive
+    exists           the profile has the parameter (no value)
+
+A comparison on a parameter missing from the profile is false, including
+`!=`; `not` simply negates. Comparisons with an unknown operator or without
+a value never hold, as before.
+"""
+
+from typing import Iterator
+
+COMBINATORS = ('all', 'any', 'not')
+CORE_OPERATORS = ('<', '<=', '>', '>=', '==', 'contains', 'exists')
+
+
+def is_comparison(condition: dict) -> bool:
+    return not any(key in condition for key in COMBINATORS)
+
+
+def normalize(condition: dict) -> dict:
+    """
+    Rewrite a condition into core comparisons combined with all/any/not.
+
+    `!=` becomes exists-and-not-==, `in` an any of ==, and `between` an all
+    of >= and <=.
+
+    Raises:
+        ValueError: If the condition is malformed
+    """
+    if not isinstance(condition, dict):
+        raise ValueError(f"Condition must be an object, got {condition!r}")
+
+    combinators = [key for key in COMBINATORS if key in condition]
+    if len(combinators) > 1:
+        raise ValueError(f"Condition mixes {' and '.join(combinators)}")
+    if combinators:
+        key = combinators[0]
+        if key == 'not':
+            return {'not': normalize(condition['not'])}
+        children = condition[key]
+        if not isinstance(children, list):
+            raise ValueError(f"'{key}' takes a list of conditions")
+        return {key: [normalize(child) for child in children]}
+
+    param = condition.get('parameter')
+    operator = condition.get('operator')
+    value = condition.get('value')
+    if not isinstance(param, str) or not isinstance(operator, str):
+        raise ValueError(f"Comparison needs a parameter and an operator: {condition!r}")
+
+    if operator == '!=':
+        return {'all': [
+            {'parameter': param, 'operator': 'exists'},
+            {'not': {'parameter': param, 'operator': '==', 'value': value}},
+        ]}
+    if operator == 'in':
+        if not isinstance(value, list):
+            raise ValueError(f"'in' takes a list of values: {condition!r}")
+        return {'any': [{'parameter': param, 'operator': '==', 'value': item} for item in value]}
+    if operator == 'between':
+        if not (isinstance(value, list) and len(value) == 2):
+            raise ValueError(f"'between' takes [low, high]: {condition!r}")
+        low, high = value
+        return {'all': [
+            {'parameter': param, 'operator': '>=', 'value': low},
+            {'parameter': param, 'operator': '<=', 'value': high},
+        ]}
+    return {'parameter': param, 'operator': operator, 'value': value}
+
+
+def comparisons(condition: dict) -> Iterator[dict]:
+    """Every comparison in a condition, depth first."""
+    if is_comparison(condition):
+        yield condition
+        return
+    if 'not' in condition:
+        yield from comparisons(condition['not'])
+        return
+    for child in condition.get('all', condition.get('any', [])):
+        yield from comparisons(child)
+
+
+def describe(condition: dict) -> str:
+    """Readable form of a condition, e.g. "skin_type == Dry AND temperature > 37.0"."""
+    if is_comparison(condition):
+        param = condition.get('parameter', '')
+        operator = condition.get('operator', '')
+        if operator == 'exists':
+            return f"{param} exists"
+        return f"{param} {operator} {condition.get('value')}"
+
+    def operand(child: dict) -> str:
+        text = describe(child)
+        return text if is_comparison(child) or 'not' in child else f"({text})"
+
+    if 'not' in condition:
+        return f"NOT {operand(condition['not'])}"
+    if 'all' in condition:
+        return " AND ".join(operand(child) for child in condition['all']) or "always"
+    return " OR ".join(operand(child) for child in condition['any']) or "never"
@@ -0,0 +1,235 @@
+"""
+Compiled lookup index over physio rule conditions.
+
+Rules are compiled once per rule set version so matching a profile no longer
+scans every rule. Conditions (see rule_conditions) are split into distinct
+comparisons, shared across all rules, and each comparison is indexed by
+parameter: numeric thresholds in sorted arrays resolved with bisect, `==`
+values in hash maps, and `contains` values in a hash map probed with each
+item of the profile's list. One profile lookup finds every true comparison
+in O(log rules) per numeric parameter plus the number of hits.
+
+A rule whose condition is a single comparison matches when that comparison
+is true. A compound condition compiles to one generated function, a flat
+and/or/not expression of set-membership tests on the true comparisons, and
+only runs when one of its trigger comparisons is true (one of which must
+hold for the condition to hold). A profile therefore evaluates each distinct
+comparison once, and only the compound rules it could satisfy.
+
+Matches are returned in rule file order.
+"""
+
+import json
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from itertools import chain
+from typing import Callable, Optional, Sequence
+
+from app.core.rule_conditions import CORE_OPERATORS, is_comparison, normalize
+
+_NUMBER = (int, float)
+
+Predicate = Callable[[set[int]], bool]
+
+
+class _Thresholds:
+    """Numeric thresholds of one parameter and operator, sorted ascending."""
+
+    def __init__(self, pairs: list[tuple[float, int]]):
+        pairs.sort()
+        self.values = [value for value, _ in pairs]
+        self.ids = [leaf for _, leaf in pairs]
+
+    def select(self, operator: str, value: float) -> list[int]:
+        """Comparisons `param <operator> threshold` that hold for value."""
+        if operator == '<':
+            return self.ids[bisect_right(self.values, value):]
+        if operator == '<=':
+            return self.ids[bisect_left(self.values, value):]
+        if operator == '>':
+            return self.ids[:bisect_left(self.values, value)]
+        return self.ids[:bisect_right(self.values, value)]
+
+
+class _ValueMap:
+    """Comparison ids keyed by value; unhashable values are kept aside and compared."""
+
+    def __init__(self):
+        self.hashed: dict[object, list[int]] = defaultdict(list)
+        self.unhashable: list[tuple[object, int]] = []
+
+    def add(self, value, leaf: int):
+        try:
+            self.hashed[value].append(leaf)
+        except TypeError:
+            self.unhashable.append((value, leaf))
+
+    def get(self, value) -> list[int]:
+        """Ids whose value equals the given one."""
+        try:
+            found = self.hashed.get(value, [])
+        except TypeError:
+            found = []
+        if self.unhashable:
+            found = found + [leaf for rule_value, leaf in self.unhashable if rule_value == value]
+        return found
+
+
+class RuleIndex:
+    """
+    Condition index of a rule set.
+
+    Rules are objects with an `id` and a `condition` (see rule_conditions).
+
+    Raises:
+        ValueError: If a rule's condition is malformed
+    """
+
+    def __init__(self, rules: Sequence):
+        self.rules = tuple(rules)
+
+        self._leaf_ids: dict[tuple, int] = {}
+        self._threshold_pairs: dict[tuple[str, str], list[tuple[float, int]]] = defaultdict(list)
+        self._equal: dict[str, _ValueMap] = defaultdict(_ValueMap)
+        self._contains: dict[str, _ValueMap] = defaultdict(_ValueMap)
+        self._exists: dict[str, list[int]] = defaultdict(list)
+
+        self._direct: list[list[int]] = []  # Per comparison: rules whose condition is just it
+        self._triggered: list[list[int]] = []  # Per comparison: compound rules it may satisfy
+        self._untriggered: list[int] = []  # Compound rules that can hold with no comparison true
+        self._predicates: dict[int, Predicate] = {}
+        expressions: list[tuple[int, str]] = []
+
+        for position, rule in enumerate(self.rules):
+            try:
+                condition = normalize(rule.condition)
+            except ValueError as e:
+                raise ValueError(f"Rule {getattr(rule, 'id', position)}: {e}") from None
+
+            if is_comparison(condition):
+                self._direct[self._leaf(condition)].append(position)
+                continue
+            expression, trigger = self._compile(condition)
+            expressions.append((position, expression))
+            if trigger is None:
+                self._untriggered.append(position)
+            else:
+                for leaf in trigger:
+                    self._triggered[leaf].append(position)
+
+        if expressions:
+            # One compile for all rules; the sources hold only integer ids and keywords
+            source = "(" + ",\n".join(f"lambda true: {expression}" for _, expression in expressions) + ",)"
+            predicates = eval(compile(source, "<physio rule conditions>", "eval"), {"__builtins__": {}})
+            self._predicates = {position: predicate for (position, _), predicate in zip(expressions, predicates)}
+
+        self._thresholds: dict[str, list[tuple[str, _Thresholds]]] = defaultdict(list)
+        for (param, operator), pairs in self._threshold_pairs.items():
+            self._thresholds[param].append((operator, _Thresholds(pairs)))
+        del self._threshold_pairs
+        self._thresholds = dict(self._thresholds)
+        self._equal = dict(self._equal)
+        self._contains = dict(self._contains)
+        self._exists = dict(self._exists)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    @property
+    def comparison_count(self) -> int:
+        """Number of distinct comparisons across all rules."""
+        return len(self._leaf_ids)
+
+    def _leaf(self, comparison: dict) -> int:
+        """Id of a comparison, registering it in the lookup tables on first sight."""
+        param = comparison['parameter']
+        operator = comparison['operator']
+        value = comparison.get('value')
+        key = (param, operator, json.dumps(value, sort_keys=True, default=repr))
+        leaf = self._leaf_ids.get(key)
+        if leaf is not None:
+            return leaf
+
+        leaf = self._leaf_ids[key] = len(self._leaf_ids)
+        self._direct.append([])
+        self._triggered.append([])
+        # Comparisons that can never hold get an id but no table entry
+        if operator == 'exists':
+            self._exists[param].append(leaf)
+        elif value is None or operator not in CORE_OPERATORS:
+            pass
+        elif operator == '==':
+            self._equal[param].add(value, leaf)
+        elif operator == 'contains':
+            self._contains[param].add(value, leaf)
+        elif isinstance(value, _NUMBER) and value == value:  # NaN thresholds never compare true
+            self._threshold_pairs[(param, operator)].append((value, leaf))
+        return leaf
+
+    def _compile(self, condition: dict) -> tuple[str, Optional[frozenset[int]]]:
+        """
+        Compile a normalized condition to a boolean expression over `true`,
+        the set of true comparison ids.
+
+        Returns:
+            (expression source, trigger ids or None if the condition can
+            hold with none of its comparisons true)
+        """
+        if is_comparison(condition):
+            leaf = self._leaf(condition)
+            return f"{leaf} in true", frozenset((leaf,))
+
+        if 'not' in condition:
+            inner, _ = self._compile(condition['not'])
+            return f"not ({inner})", None
+
+        combinator = 'all' if 'all' in condition else 'any'
+        compiled = [self._compile(child) for child in condition[combinator]]
+        triggers = [trigger for _, trigger in compiled]
+        if combinator == 'all':
+            expression = " and ".join(f"({source})" for source, _ in compiled) or "True"
+            # Any one child's trigger will do; the smallest wakes the rule least often
+            known = [trigger for trigger in triggers if trigger is not None]
+            trigger = min(known, key=len) if known else None
+        else:
+            expression = " or ".join(f"({source})" for source, _ in compiled) or "False"
+            trigger = None if None in triggers else frozenset().union(*triggers)
+        return expression, trigger
+
+    def true_comparisons(self, profile: dict) -> set[int]:
+        """Ids of the comparisons that hold for a profile."""
+        true: set[int] = set()
+        for param, user_value in profile.items():
+            leaves = self._exists.get(param)
+            if leaves is not None:
+                true.update(leaves)
+
+            if isinstance(user_value, _NUMBER):
+                for operator, thresholds in self._thresholds.get(param, ()):
+                    true.update(thresholds.select(operator, user_value))
+
+            values = self._equal.get(param)
+            if values is not None:
+                true.update(values.get(user_value))
+
+            values = self._contains.get(param)
+            if values is not None and isinstance(user_value, list):
+                for item in user_value:
+                    true.update(values.get(item))
+        return true
+
+    def positions(self, profile: dict) -> list[int]:
+        """Positions (in rule order) of the rules whose condition holds for a profile."""
+        true = self.true_comparisons(profile)
+        found = set(chain.from_iterable(map(self._direct.__getitem__, true)))
+        if self._predicates:
+            candidates = set(chain.from_iterable(map(self._triggered.__getitem__, true)))
+            candidates.update(self._untriggered)
+            predicates = self._predicates
+            found.update(position for position in candidates if predicates[position](true))
+        return sorted(found)
+
+    def match(self, profile: dict) -> list:
+        """Rules whose condition holds for a profile, in rule order."""
+        rules = self.rules
+        return [rules[position] for position in self.positions(profile)]
@@ -0,0 +1,199 @@
+"""
+In-process NumPy vector index for small document sets.
+
+A lightweight alternative to a ChromaDB collection for the physio rules:
+embeddings are held as one L2-normalized float32 matrix (or int8 with a
+per-row scale, a quarter of the memory), a query is one matrix-vector
+product plus argpartition for the top k, and metadata filters are boolean
+masks over per-key columns. Search is exact, so there is no recall loss
+beyond int8 rounding.
+
+It answers the subset of the Chroma collection API that PhysioRAG uses
+(query/count/name), with Chroma's default squared-L2 distances, so it can
+be swapped in for a collection.
+"""
+
+from typing import Callable, Optional
+
+import numpy as np
+
+Embedder = Callable[[list[str]], list[list[float]]]
+
+_QUANTIZED_CHUNK = 4096  # Rows dequantized per matmul, bounding temporary memory
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+class NumpyVectorIndex:
+    """Exact cosine top-k search over a fixed set of documents."""
+
+    def __init__(
+        self,
+        name: str,
+        ids: list[str],
+        embeddings: np.ndarray,
+        metadatas: Optional[list[dict]] = None,
+        documents: Optional[list[str]] = None,
+        embedding_function: Optional[Embedder] = None,
+        quantize: bool = False
+    ):
+        """
+        Args:
+            name: Index name (plays the role of the collection name)
+            ids: Document ids, one per embedding row
+            embeddings: (documents x dimensions) matrix
+            metadatas: Per-document metadata dicts for `where` filters
+            documents: Per-document texts, returned with results
+            embedding_function: Embeds query_texts passed to query()
+            quantize: Store int8 codes with a per-row scale instead of float32
+        """
+        self.name = name
+        self.ids = list(ids)
+        self.metadatas = list(metadatas) if metadatas is not None else [{} for _ in self.ids]
+        self.documents = list(documents) if documents is not None else None
+        self._embed = embedding_function
+        self.quantized = quantize
+
+        embeddings = np.asarray(embeddings).reshape(len(self.ids), -1)
+        self.dimensions = embeddings.shape[1]
+        if quantize:
+            # Chunked, so no full float32 copy is ever materialized
+            self._codes = np.empty(embeddings.shape, dtype=np.int8)
+            self._scale = np.empty(len(self.ids), dtype=np.float32)
+            for start in range(0, len(self.ids), _QUANTIZED_CHUNK):
+                stop = start + _QUANTIZED_CHUNK
+                vectors = _normalize(embeddings[start:stop].astype(np.float32))
+                scale = np.abs(vectors).max(axis=1) / 127.0
+                scale[scale == 0] = 1.0
+                self._codes[start:stop] = np.round(vectors / scale[:, None])
+                self._scale[start:stop] = scale
+            self._vectors = None
+        else:
+            self._vectors = np.ascontiguousarray(_normalize(embeddings.astype(np.float32)))
+
+        # Metadata columns for filtering
+        keys = dict.fromkeys(key for metadata in self.metadatas for key in metadata)
+        self._columns = {
+            key: np.array([metadata.get(key) for metadata in self.metadatas], dtype=object)
+            for key in keys
+        }
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the vectors."""
+        if self.quantized:
+            return self._codes.nbytes + self._scale.nbytes
+        return self._vectors.nbytes
+
+    def similarities(self, query: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every document to each (normalized) query row."""
+        if not self.quantized:
+            return query @ self._vectors.T
+        scores = np.empty((query.shape[0], len(self.ids)), dtype=np.float32)
+        for start in range(0, len(self.ids), _QUANTIZED_CHUNK):
+            stop = start + _QUANTIZED_CHUNK
+            scores[:, start:stop] = query @ self._codes[start:stop].astype(np.float32).T
+        return scores * self._scale
+
+    def _mask(self, where: Optional[dict]) -> Optional[np.ndarray]:
+        """
+        Documents passing a Chroma-style metadata filter.
+
+        Supports {key: value}, {key: {"$eq" | "$ne" | "$in" | "$nin": ...}}
+        and {"$and" | "$or": [filters]}.
+
+        Raises:
+            ValueError: On an unsupported operator
+        """
+        if not where:
+            return None
+        masks = []
+        for key, condition in where.items():
+            if key in ("$and", "$or"):
+                parts = [self._mask(part) for part in condition]
+                parts = [part if part is not None else np.ones(len(self.ids), dtype=bool) for part in parts]
+                reduce = np.logical_and if key == "$and" else np.logical_or
+                masks.append(reduce.reduce(parts) if parts else np.full(len(self.ids), key == "$and"))
+                continue
+
+            column = self._columns.get(key)
+            if column is None:
+                column = np.full(len(self.ids), None, dtype=object)
+            operator, value = next(iter(condition.items())) if isinstance(condition, dict) else ("$eq", condition)
+            if operator == "$eq":
+                masks.append(column == value)
+            elif operator == "$ne":
+                masks.append(column != value)
+            elif operator in ("$in", "$nin"):
+                hit = np.array([item in value for item in column], dtype=bool)
+                masks.append(hit if operator == "$in" else ~hit)
+            else:
+                raise ValueError(f"Unsupported filter operator: {operator}")
+        return np.logical_and.reduce(masks).astype(bool)
+
+    def search(
+        self,
+        query_embeddings: np.ndarray,
+        n_results: int = 5,
+        where: Optional[dict] = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k documents for each query embedding.
+
+        Returns:
+            (row indexes, cosine similarities), each (queries x k), best first;
+            k is at most the number of documents passing the filter
+        """
+        query = _normalize(np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)))
+        scores = self.similarities(query)
+        mask = self._mask(where)
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        available = len(self.ids) if mask is None else int(mask.sum())
+        k = min(n_results, available)
+        if k <= 0:
+            empty = np.zeros((query.shape[0], 0))
+            return empty.astype(np.int64), empty
+
+        if k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(scores.shape[1]), (query.shape[0], 1))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        return top, np.take_along_axis(top_scores, order, axis=1)
+
+    def query(
+        self,
+        query_texts: Optional[list[str]] = None,
+        query_embeddings: Optional[list[list[float]]] = None,
+        n_results: int = 5,
+        where: Optional[dict] = None
+    ) -> dict:
+        """
+        Chroma-compatible query.
+
+        Returns:
+            Dict with 'ids', 'distances' (squared L2 between unit vectors,
+            2 - 2 * cosine), 'metadatas' and 'documents', one list per query
+        """
+        if query_embeddings is None:
+            if self._embed is None:
+                raise ValueError("query_texts needs an embedding_function")
+            query_embeddings = self._embed(list(query_texts or []))
+        rows, similarities = self.search(np.asarray(query_embeddings), n_results, where)
+
+        results = {"ids": [], "distances": [], "metadatas": [], "documents": []}
+        for row_ids, row_scores in zip(rows, similarities):
+            results["ids"].append([self.ids[i] for i in row_ids])
+            results["distances"].append([float(2.0 - 2.0 * s) for s in row_scores])
+            results["metadatas"].append([self.metadatas[i] for i in row_ids])
+            results["documents"].append([self.documents[i] for i in row_ids] if self.documents is not None else None)
+        return results
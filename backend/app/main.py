@@ -2,16 +2,34 @@
 Aether FastAPI Application Entry Point.
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
-from app.api.routes import calibration, formulation, payment
+from app.api.routes import admin, calibration, formulation, payment
+from app.chemistry.molecular_calc import get_process_pool, shutdown_process_pool
+from app.core.dataset_reloader import dataset_reloader
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop shared background resources."""
+    if settings.molecular_pool_prewarm:
+        await run_in_threadpool(get_process_pool)
+    dataset_reloader.start(settings.dataset_poll_interval)
+    yield
+    dataset_reloader.stop()
+    shutdown_process_pool()
+
 
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="AI-Driven Adaptive Perfume Formulation Platform",
+    lifespan=lifespan,
 )
 
 # CORS middleware for frontend
@@ -32,6 +50,7 @@ app.add_middleware(
 app.include_router(calibration.router, prefix=f"{settings.api_prefix}/calibration", tags=["calibration"])
 app.include_router(formulation.router, prefix=f"{settings.api_prefix}/formulation", tags=["formulation"])
 app.include_router(payment.router, prefix=f"{settings.api_prefix}/payment", tags=["payment"])
+app.include_router(admin.router, prefix=f"{settings.api_prefix}/admin", tags=["admin"])
 
 
 @app.get("/")
@@ -0,0 +1,107 @@
+"""
+Benchmark: pure-Python descriptor backend vs RDKit on the catalog molecules.
+
+Reports per-descriptor agreement (mean absolute error for continuous values,
+exact-match rate for counts), per-molecule calculation time, and cold-start
+time to the first result in a fresh interpreter.
+
+Usage (from backend/):
+    python benchmarks/descriptor_backends.py [--repeat 200]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Add backend root to path for imports
+backend_root = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_root))
+
+from app.config import settings
+from app.chemistry.descriptor_backend import PurePythonBackend, RDKitBackend, rdkit_available
+
+CONTINUOUS = ("logp", "molecular_weight", "tpsa")
+COUNTS = ("num_rotatable_bonds", "num_h_donors", "num_h_acceptors")
+
+COLD_START = """
+import time
+t = time.perf_counter()
+from app.chemistry.descriptor_backend import {cls}
+backend = {cls}()
+backend.descriptors(backend.parse("CC(C)=CCCC(C)=CC=O"))
+print(time.perf_counter() - t)
+"""
+
+
+def load_catalog_smiles() -> list[str]:
+    with open(settings.data_dir / "ingredients.json", "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return [ing["smiles"] for ing in data.get("ingredients", [])]
+
+
+def time_backend(backend, smiles_list: list[str], repeat: int) -> float:
+    """Mean microseconds per molecule for parse + descriptors, uncached."""
+    backend.warm()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for smiles in smiles_list:
+            backend.descriptors(backend.parse(smiles))
+    return (time.perf_counter() - start) / (repeat * len(smiles_list)) * 1e6
+
+
+def cold_start(cls_name: str) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", COLD_START.format(cls=cls_name)],
+        cwd=backend_root, capture_output=True, text=True, check=True
+    )
+    return float(out.stdout.strip()) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    smiles_list = load_catalog_smiles()
+    python_backend = PurePythonBackend()
+
+    print(f"Catalog molecules: {len(smiles_list)}")
+    print(f"pure-python: {time_backend(python_backend, smiles_list, args.repeat):8.1f} us/molecule, "
+          f"cold start {cold_start('PurePythonBackend'):7.1f} ms")
+
+    if not rdkit_available():
+        print("RDKit not installed - accuracy comparison skipped")
+        return
+
+    rdkit_backend = RDKitBackend()
+    print(f"rdkit:       {time_backend(rdkit_backend, smiles_list, args.repeat):8.1f} us/molecule, "
+          f"cold start {cold_start('RDKitBackend'):7.1f} ms")
+
+    errors = {key: [] for key in CONTINUOUS}
+    matches = {key: 0 for key in COUNTS}
+    outliers = []
+    for smiles in smiles_list:
+        reference = rdkit_backend.descriptors(rdkit_backend.parse(smiles))
+        estimate = python_backend.descriptors(python_backend.parse(smiles))
+        for key in CONTINUOUS:
+            errors[key].append(abs(reference[key] - estimate[key]))
+        for key in COUNTS:
+            matches[key] += reference[key] == estimate[key]
+        if abs(reference["logp"] - estimate["logp"]) > 0.1:
+            outliers.append((smiles, reference["logp"], estimate["logp"]))
+
+    print("\nAccuracy vs RDKit:")
+    for key in CONTINUOUS:
+        values = errors[key]
+        print(f"  {key:<22} MAE {sum(values) / len(values):.3f}  max {max(values):.3f}")
+    for key in COUNTS:
+        print(f"  {key:<22} exact {matches[key]}/{len(smiles_list)}")
+    for smiles, reference, estimate in outliers:
+        print(f"  logP outlier {smiles}: rdkit {reference:.2f} vs python {estimate:.2f}")
+
+
+if __name__ == "__main__":
+    main()
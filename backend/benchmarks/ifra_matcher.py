@@ -0,0 +1,178 @@
+"""
+Benchmark: compiled IFRA standards matcher vs the original per-call scan.
+
+Builds a synthetic standards list (2,000 entries by default) and a batch of
+formulas whose ingredient names hit the standards exactly, by substring in
+either direction, or not at all. Reports compile time, per-formula validation
+time for both implementations, and checks that the reports are identical.
+
+Usage (from backend/):
+    python benchmarks/ifra_matcher.py [--entries 2000] [--formulas 500] [--size 20]
+"""
+
+import argparse
+import random
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+# Add backend root to path for imports
+backend_root = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_root))
+
+from app.chemistry.ifra_validator import IFRAValidator, StandardsSnapshot
+
+SYLLABLES = ["ber", "ga", "mot", "lin", "al", "ol", "cit", "ral", "eu", "gen", "vanil", "lin",
+             "cou", "ma", "rin", "far", "ne", "sol", "is", "o", "hex", "yl", "cin", "nam"]
+
+
+def make_name(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def make_standards(rng: random.Random, entries: int) -> dict:
+    """Synthetic standards split 30/50/20 between restricted, allergens and phototoxics."""
+    def cas():
+        return f"{rng.randint(100, 99999)}-{rng.randint(10, 99)}-{rng.randint(0, 9)}"
+
+    n_restricted = entries * 3 // 10
+    n_phototox = entries // 5
+    n_allergens = entries - n_restricted - n_phototox
+    return {
+        "restricted_substances": [
+            {"name": make_name(rng), "cas": cas(), "max_concentration_cat1": rng.choice([0, 0.1, 0.5, 2.0]),
+             "reason": "Synthetic"}
+            for _ in range(n_restricted)
+        ],
+        "allergens_declaration_required": [
+            {"name": make_name(rng), "cas": cas(), "threshold_cat1": rng.choice([0, 0.001, 0.01])}
+            for _ in range(n_allergens)
+        ],
+        "phototoxicity_limits": [
+            {"name": f"{make_name(rng)} oil", "max_concentration_cat1": rng.choice([0.4, 0.7, 2.0]),
+             "reason": "Synthetic"}
+            for _ in range(n_phototox)
+        ],
+        "total_allergen_limits": {"cat1_leave_on": {"max_total_percentage": 1.0}},
+    }
+
+
+def make_formulas(rng: random.Random, standards: dict, count: int, size: int) -> list[list[dict]]:
+    names = [entry["name"] for key in ("restricted_substances", "allergens_declaration_required",
+                                       "phototoxicity_limits") for entry in standards[key]]
+
+    def ingredient_name() -> str:
+        roll = rng.random()
+        if roll < 0.3:
+            return rng.choice(names)  # Exact
+        if roll < 0.5:
+            return f"{rng.choice(names)} absolute"  # Standard inside the name
+        if roll < 0.6:
+            name = rng.choice(names)
+            return name[: max(3, len(name) // 2)]  # Name inside a standard
+        return make_name(rng) + " extract"
+
+    return [
+        [{"name": ingredient_name(), "concentration": round(rng.uniform(0.0005, 5.0), 4)} for _ in range(size)]
+        for _ in range(count)
+    ]
+
+
+def legacy_validate(standards: dict, ingredients: list[dict]) -> tuple:
+    """The original validator loop: maps rebuilt per call, two-way substring scans."""
+    violations = []
+    allergens_to_declare = []
+    total_allergen_load = 0.0
+
+    restricted_map = {s['name'].lower(): s for s in standards.get('restricted_substances', [])}
+    allergen_map = {a['name'].lower(): a for a in standards.get('allergens_declaration_required', [])}
+    phototox_map = {p['name'].lower(): p for p in standards.get('phototoxicity_limits', [])}
+
+    for ing in ingredients:
+        name = ing.get('name', '')
+        name_lower = name.lower()
+        concentration = ing.get('concentration', 0)
+
+        if name_lower in restricted_map:
+            max_conc = restricted_map[name_lower].get('max_concentration_cat1', 0)
+            if max_conc == 0:
+                violations.append((name, "banned", concentration, 0))
+            elif concentration > max_conc:
+                violations.append((name, "over_limit", concentration, max_conc))
+
+        for phototox_name, phototox in phototox_map.items():
+            if phototox_name in name_lower or name_lower in phototox_name:
+                max_conc = phototox.get('max_concentration_cat1', 100)
+                if concentration > max_conc:
+                    violations.append((name, "phototoxicity", concentration, max_conc))
+
+        for allergen_name, allergen in allergen_map.items():
+            if allergen_name in name_lower or name_lower in allergen_name:
+                threshold = allergen.get('threshold_cat1', 0.001)
+                if threshold == 0:
+                    violations.append((name, "banned", concentration, 0))
+                elif concentration >= threshold:
+                    allergens_to_declare.append({
+                        "name": name, "cas": allergen.get('cas'),
+                        "concentration": concentration, "threshold": threshold
+                    })
+                    total_allergen_load += concentration
+
+    return violations, allergens_to_declare, total_allergen_load
+
+
+def report_key(report) -> tuple:
+    violations = [
+        (v["ingredient_name"], v["violation_type"], v["current_concentration"], v["max_allowed"])
+        for v in map(asdict, report.violations) if v["violation_type"] != "allergen_load"
+    ]
+    return violations, report.allergens_to_declare, report.total_allergen_load
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--formulas", type=int, default=500)
+    parser.add_argument("--size", type=int, default=20, help="Ingredients per formula")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    standards = make_standards(rng, args.entries)
+    formulas = make_formulas(rng, standards, args.formulas, args.size)
+
+    start = time.perf_counter()
+    snapshot = StandardsSnapshot.build(standards, version="synthetic")
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    validator = IFRAValidator()
+    validator.install(snapshot)
+
+    start = time.perf_counter()
+    legacy = [legacy_validate(standards, formula) for formula in formulas]
+    legacy_us = (time.perf_counter() - start) / len(formulas) * 1e6
+
+    # Cold pass (empty name cache) then warm pass
+    start = time.perf_counter()
+    reports = [validator.validate_formula(formula) for formula in formulas]
+    cold_us = (time.perf_counter() - start) / len(formulas) * 1e6
+    start = time.perf_counter()
+    for formula in formulas:
+        validator.validate_formula(formula)
+    warm_us = (time.perf_counter() - start) / len(formulas) * 1e6
+
+    mismatches = sum(report_key(r) != l for r, l in zip(reports, legacy))
+
+    print(f"Standards entries: {args.entries}, formulas: {args.formulas} x {args.size} ingredients")
+    print(f"compile:        {compile_ms:9.1f} ms (once per dataset version)")
+    print(f"legacy:         {legacy_us:9.1f} us/formula")
+    print(f"compiled cold:  {cold_us:9.1f} us/formula ({legacy_us / cold_us:5.1f}x)")
+    print(f"compiled warm:  {warm_us:9.1f} us/formula ({legacy_us / warm_us:5.1f}x)")
+    print(f"report mismatches: {mismatches}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Benchmark: indexed physio rule matching vs a linear scan.
+
+Builds a synthetic rule base (5,000 rules by default) over the profile
+parameters used by physio_rules.json, a share of them with compound
+conditions, and a set of random profiles. Reports index build time,
+per-profile matching time for the index and for a per-rule scan (the
+original loop, with a recursive interpreter for compound conditions), and
+checks that they return the same rules in the same order.
+
+Usage (from backend/):
+    python benchmarks/physio_rules.py [--rules 5000] [--profiles 2000] [--compound 0.5]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add backend root to path for imports
+backend_root = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_root))
+
+from app.core.physio_rag import PhysioRule
+from app.core.rule_index import RuleIndex
+
+SKIN_TYPES = ["Dry", "Oily", "Normal", "Combination", "Sensitive"]
+ALLERGENS = ["linalool", "citral", "limonene", "geraniol", "eugenol", "coumarin", "farnesol", "citronellol"]
+
+
+def make_comparison(rng: random.Random, extended: bool = False) -> dict:
+    """One comparison; extended adds the operators only compound rule sets use."""
+    roll = rng.random()
+    if roll < 0.35:
+        param, low, high = ("ph", 4.0, 7.0) if rng.random() < 0.5 else ("temperature", 35.0, 38.5)
+        if extended and rng.random() < 0.3:
+            a, b = sorted(round(rng.uniform(low, high), 1) for _ in range(2))
+            return {"parameter": param, "operator": "between", "value": [a, b]}
+        operators = ["<", ">", "<=", ">="] if extended else ["<", ">"]
+        return {"parameter": param, "operator": rng.choice(operators), "value": round(rng.uniform(low, high), 1)}
+    if roll < 0.7:
+        if extended and rng.random() < 0.3:
+            return {"parameter": "skin_type", "operator": "in", "value": rng.sample(SKIN_TYPES, 2)}
+        operator = rng.choice(["==", "!="]) if extended else "=="
+        return {"parameter": "skin_type", "operator": operator, "value": rng.choice(SKIN_TYPES)}
+    return {"parameter": "allergies", "operator": "contains", "value": rng.choice(ALLERGENS)}
+
+
+def make_condition(rng: random.Random, depth: int = 0) -> dict:
+    """Random all/any/not tree of two or three comparisons or subtrees."""
+    roll = rng.random()
+    if depth >= 2 or roll < 0.3:
+        return make_comparison(rng, extended=True)
+    if roll < 0.4:
+        return {"not": make_condition(rng, depth + 1)}
+    combinator = "all" if roll < 0.8 else "any"
+    return {combinator: [make_condition(rng, depth + 1) for _ in range(rng.randint(2, 3))]}
+
+
+def make_rules(rng: random.Random, count: int, compound: float) -> list[PhysioRule]:
+    """Synthetic rules: single comparisons, and a share of compound conditions."""
+    rules = []
+    for i in range(count):
+        if rng.random() < compound:
+            condition = {rng.choice(["all", "any"]): [make_condition(rng, 1) for _ in range(rng.randint(2, 3))]}
+        else:
+            condition = make_comparison(rng)
+        rules.append(PhysioRule(id=f"rule_{i}", condition=condition, target="Formula", action="noop"))
+    return rules
+
+
+def make_profiles(rng: random.Random, count: int) -> list[dict]:
+    return [
+        {
+            "ph": round(rng.uniform(4.0, 7.0), 1),
+            "temperature": round(rng.uniform(35.0, 38.5), 1),
+            "skin_type": rng.choice(SKIN_TYPES),
+            "allergies": rng.sample(ALLERGENS, rng.randint(0, 2)),
+        }
+        for _ in range(count)
+    ]
+
+
+def evaluate(condition: dict, user_profile: dict) -> bool:
+    """Direct recursive interpretation of a compound condition."""
+    if "all" in condition:
+        return all(evaluate(child, user_profile) for child in condition["all"])
+    if "any" in condition:
+        return any(evaluate(child, user_profile) for child in condition["any"])
+    if "not" in condition:
+        return not evaluate(condition["not"], user_profile)
+
+    param, operator, value = condition["parameter"], condition["operator"], condition.get("value")
+    if param not in user_profile:
+        return False
+    user_value = user_profile[param]
+    if operator in ("<", "<=", ">", ">=", "between"):
+        if not isinstance(user_value, (int, float)):
+            return False
+        if operator == "between":
+            return value[0] <= user_value <= value[1]
+        return {"<": user_value < value, "<=": user_value <= value,
+                ">": user_value > value, ">=": user_value >= value}[operator]
+    if operator == "==":
+        return user_value == value
+    if operator == "!=":
+        return user_value != value
+    if operator == "in":
+        return user_value in value
+    return operator == "contains" and isinstance(user_value, list) and value in user_value
+
+
+def legacy_match(rules: list[PhysioRule], user_profile: dict) -> list[PhysioRule]:
+    """The original get_applicable_rules loop, interpreting compound conditions."""
+    applicable = []
+    for rule in rules:
+        condition = rule.condition
+        if "parameter" not in condition:
+            if evaluate(condition, user_profile):
+                applicable.append(rule)
+            continue
+        param = condition.get('parameter', '')
+        operator = condition.get('operator', '')
+        value = condition.get('value')
+
+        if param not in user_profile or value is None:
+            continue
+
+        user_value = user_profile[param]
+
+        if operator == '<' and isinstance(user_value, (int, float)) and isinstance(value, (int, float)):
+            if user_value < value:
+                applicable.append(rule)
+        elif operator == '>' and isinstance(user_value, (int, float)) and isinstance(value, (int, float)):
+            if user_value > value:
+                applicable.append(rule)
+        elif operator == '==' and user_value == value:
+            applicable.append(rule)
+        elif operator == 'contains' and isinstance(user_value, list) and value in user_value:
+            applicable.append(rule)
+    return applicable
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rules", type=int, default=5000)
+    parser.add_argument("--profiles", type=int, default=2000)
+    parser.add_argument("--compound", type=float, default=0.5, help="Share of rules with compound conditions")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rules = make_rules(rng, args.rules, args.compound)
+    profiles = make_profiles(rng, args.profiles)
+
+    start = time.perf_counter()
+    index = RuleIndex(rules)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    legacy = [legacy_match(rules, profile) for profile in profiles]
+    legacy_us = (time.perf_counter() - start) / len(profiles) * 1e6
+
+    start = time.perf_counter()
+    indexed = [index.match(profile) for profile in profiles]
+    indexed_us = (time.perf_counter() - start) / len(profiles) * 1e6
+
+    mismatches = sum(a != b for a, b in zip(indexed, legacy))
+    matched = sum(map(len, indexed)) / len(profiles)
+
+    print(f"Rules: {args.rules} ({args.compound:.0%} compound, {index.comparison_count} distinct comparisons), "
+          f"profiles: {args.profiles} ({matched:.0f} matching rules per profile)")
+    print(f"index build:    {build_ms:9.1f} ms (once per rule set version)")
+    print(f"linear scan:    {legacy_us:9.1f} us/profile")
+    print(f"indexed:        {indexed_us:9.1f} us/profile ({legacy_us / indexed_us:5.1f}x)")
+    print(f"result mismatches: {mismatches}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark: NumPy vector index (float32 and int8) vs a ChromaDB collection.
+
+Generates clustered synthetic embeddings (384 dimensions, as
+all-MiniLM-L6-v2) for a rule base and nearby queries, then runs each
+backend in a fresh interpreter and reports build time, resident memory
+added by importing the backend and indexing, per-query latency, and
+recall@k against exact float64 search. The Chroma row is skipped when
+chromadb is not installed.
+
+Usage (from backend/):
+    python benchmarks/vector_index.py [--documents 5000] [--queries 500] [--k 5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Add backend root to path for imports
+backend_root = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_root))
+
+import numpy as np
+
+BACKENDS = ("numpy", "numpy-int8", "chroma")
+
+
+def make_data(documents: int, queries: int, dimensions: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """Documents around 50 topic centers; queries are perturbed documents."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(50, dimensions))
+    docs = centers[rng.integers(0, 50, documents)] + 0.6 * rng.normal(size=(documents, dimensions))
+    picks = rng.integers(0, documents, queries)
+    query = docs[picks] + 0.4 * rng.normal(size=(queries, dimensions))
+    return docs.astype(np.float32), query.astype(np.float32)
+
+
+def rss_mb() -> float:
+    """Current resident set size."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_backend(backend: str, args) -> dict:
+    """Build one backend and query it; runs inside a child interpreter."""
+    docs, queries = make_data(args.documents, args.queries, args.dimensions, args.seed)
+    ids = [f"rule_{i}" for i in range(len(docs))]
+    metadatas = [{"target": f"family_{i % 7}"} for i in range(len(docs))]
+    rss_before = rss_mb()
+
+    start = time.perf_counter()
+    if backend == "chroma":
+        try:
+            import chromadb
+            from chromadb.config import Settings as ChromaSettings
+        except ImportError:
+            return {"skipped": "chromadb not installed"}
+        client = chromadb.Client(ChromaSettings(anonymized_telemetry=False, is_persistent=False))
+        collection = client.create_collection("bench")
+        for offset in range(0, len(docs), 5000):
+            collection.add(ids=ids[offset:offset + 5000], embeddings=docs[offset:offset + 5000].tolist(),
+                           metadatas=metadatas[offset:offset + 5000])
+
+        def search(query):
+            result = collection.query(query_embeddings=[query.tolist()], n_results=args.k)
+            return [int(rule_id[5:]) for rule_id in result["ids"][0]]
+    else:
+        from app.core.vector_index import NumpyVectorIndex
+        index = NumpyVectorIndex("bench", ids, docs, metadatas, quantize=backend == "numpy-int8")
+
+        def search(query):
+            rows, _ = index.search(query, args.k)
+            return rows[0].tolist()
+    build_ms = (time.perf_counter() - start) * 1000
+    rss = rss_mb() - rss_before
+
+    start = time.perf_counter()
+    results = [search(query) for query in queries]
+    query_us = (time.perf_counter() - start) / len(queries) * 1e6
+    return {"build_ms": build_ms, "rss_mb": rss, "query_us": query_us, "results": results}
+
+
+def exact_top_k(args) -> list[set[int]]:
+    docs, queries = make_data(args.documents, args.queries, args.dimensions, args.seed)
+    docs = docs.astype(np.float64)
+    docs /= np.linalg.norm(docs, axis=1, keepdims=True)
+    scores = queries.astype(np.float64) @ docs.T
+    return [set(row) for row in np.argsort(-scores, axis=1)[:, :args.k].tolist()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--child", choices=BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_backend(args.child, args)))
+        return
+
+    truth = exact_top_k(args)
+    print(f"Documents: {args.documents} x {args.dimensions} dims, queries: {args.queries}, k={args.k}")
+    print(f"{'backend':12} {'build ms':>10} {'+RSS MB':>9} {'us/query':>10} {'recall@k':>9}")
+    for backend in BACKENDS:
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", backend] + sys.argv[1:],
+            cwd=backend_root, capture_output=True, text=True, check=True
+        )
+        stats = json.loads(out.stdout.strip().splitlines()[-1])
+        if "skipped" in stats:
+            print(f"{backend:12} skipped: {stats['skipped']}")
+            continue
+        recall = np.mean([len(set(found) & expected) / args.k for found, expected in zip(stats["results"], truth)])
+        print(f"{backend:12} {stats['build_ms']:10.1f} {stats['rss_mb']:9.1f} {stats['query_us']:10.1f} {recall:9.3f}")
+
+
+if __name__ == "__main__":
+    main()